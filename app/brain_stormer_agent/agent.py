@@ -1,15 +1,26 @@
-import json
-import os
-from typing import Dict, Any, List, Optional
+from functools import partial
+from typing import Dict, Any, List, Optional, Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
+from google.adk.tools import ToolContext
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard4.json")
+from tutoring.brainstorm_memory import BrainstormContext, get_brainstorm_memory
+from tutoring.events import UiEvent, get_event_bus
+from tutoring.instruction_cache import cached_instruction
+from tutoring.progress import get_progress_store
+from tutoring.schema import Problem
+from tutoring.session import bind_problem, problem_for, problem_id_for, session_id_for
+from tutoring.steps import COMPACT_PROMPTS, get_step_content
+from tutoring.telemetry import instrument_tool
+from tutoring.validation import BRAINSTORM_FEEDBACK_TYPES, DISCOVERY_TYPES, get_validation_table
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard4"
+
+@instrument_tool("brainStormer", DEFAULT_PROBLEM_ID)
 def update_brainstorm_notes(
     discovery_type: str,
     step_number: int,
@@ -17,7 +28,8 @@ def update_brainstorm_notes(
     debate_elements: Optional[Dict[str, str]] = None,
     part_solved: Optional[str] = None,
     current_expression: Optional[str] = None,
-    approach: Optional[str] = None
+    approach: Optional[str] = None,
+    tool_context: Optional[ToolContext] = None
 ) -> Dict[str, Any]:
     """
     Captures student discoveries, ideas, and progress through brainstorming and debate.
@@ -30,24 +42,37 @@ def update_brainstorm_notes(
         part_solved: The specific part of the problem they just worked on
         current_expression: Current state of the problem/expression/understanding
         approach: The approach or strategy discovered/used
+        tool_context: Context of the calling session
     
     Returns:
         Dict with success status and message
     """
-    valid_discovery_types = [
-        "initial_observation", "part_identified", "calculation_done", 
-        "pattern_found", "breakthrough", "debate_point", 
-        "approach_comparison", "synthesis"
-    ]
-    
-    if discovery_type not in valid_discovery_types:
+    if discovery_type not in DISCOVERY_TYPES:
         return {"success": False, "message": f"Invalid discovery type: {discovery_type}"}
     
-    print(f"🔧 Tool Called - Brainstorm {discovery_type}: step={step_number}, ideas={student_ideas}")
+    # Step numbers key the session's summaries, so only the problem's own steps are accepted
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    if not get_validation_table(problem).is_valid_step(step_number):
+        return {"success": False, "message": f"Invalid step number: {step_number}. Valid range: 1-{problem.step_count}"}
+    
+    session_id = session_id_for(tool_context)
+    discovery = {
+        "discovery_type": discovery_type,
+        "step_number": step_number,
+        "student_ideas": student_ideas,
+        "debate_elements": debate_elements,
+        "part_solved": part_solved,
+        "current_expression": current_expression,
+        "approach": approach
+    }
     
-    # Note: In actual implementation, this would trigger UI update through appropriate callback
-    # For now, just logging the tool call
-    print(f"✅ Captured {discovery_type} for step {step_number}")
+    # Every discovery is kept, so these events are never coalesced
+    get_event_bus().publish(session_id, UiEvent(kind="brainstorm_notes", payload=discovery))
+    if session_id:
+        get_brainstorm_memory().record(session_id, discovery)
+        get_progress_store().record_discovery(
+            session_id, problem_id_for(tool_context, DEFAULT_PROBLEM_ID), discovery
+        )
     
     return {
         "success": True,
@@ -56,12 +81,14 @@ def update_brainstorm_notes(
         "step_number": step_number
     }
 
+@instrument_tool("brainStormer", DEFAULT_PROBLEM_ID)
 def show_visual_feedback(
     type: str,
     content: str,
     label: str,
     expression_part: Optional[str] = None,
-    step_number: Optional[int] = None
+    step_number: Optional[int] = None,
+    tool_context: Optional[ToolContext] = None
 ) -> Dict[str, Any]:
     """
     Shows visual feedback for discoveries, debates, and breakthroughs during brainstorming.
@@ -72,46 +99,72 @@ def show_visual_feedback(
         label: Message about the discovery or insight
         expression_part: The part of the problem this relates to
         step_number: Which step this feedback relates to
+        tool_context: Context of the calling session
     
     Returns:
         Dict with success status and message
     """
-    valid_types = ["celebration", "discovery", "progress", "breakthrough", "debate", "comparison", "synthesis"]
-    
-    if type not in valid_types:
+    if type not in BRAINSTORM_FEEDBACK_TYPES:
         return {"success": False, "message": f"Invalid feedback type: {type}"}
     
-    print(f"🔧 Tool Called - Showing {type} feedback: content={content}, label={label}")
+    # Feedback may be about the problem as a whole; a given step number must be one of the problem's own
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    if step_number is not None and not get_validation_table(problem).is_valid_step(step_number):
+        return {"success": False, "message": f"Invalid step number: {step_number}. Valid range: 1-{problem.step_count}"}
     
-    # Note: In actual implementation, this would trigger UI update through appropriate callback
-    # For now, just logging the tool call
-    print(f"✅ Showed {type} feedback for step {step_number}")
+    get_event_bus().publish(session_id_for(tool_context), UiEvent(
+        kind="visual_feedback",
+        payload={"type": type, "content": content, "label": label, "expression_part": expression_part, "step_number": step_number},
+        coalesce_key=("visual_feedback", step_number)
+    ))
     
     return {
         "success": True,
         "message": f"{type} feedback shown successfully"
     }
 
-# Generate step instructions for the agent
-step_instructions = ""
-for i, step in enumerate(problem_data['steps']):
-    step_instructions += f"""
-**Topic Area: {step['Topic']}**
-- Discovery Focus: {step['Description']}
-- Key Question: "{step['ConceptualQuestions'][0]['Question']}"
-- Show illustration: "{step['ConceptualQuestions'][0]['Illustration']['BeforeQuestion']['Content']}"
+@instrument_tool("brainStormer", DEFAULT_PROBLEM_ID)
+def get_step(step_number: int, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Fetches the questions, illustrations and notes for one step of the problem.
+    
+    Args:
+        step_number: The step to fetch (1-based)
+        tool_context: Context of the calling session, used to find its problem
+    
+    Returns:
+        Dict with the step's topic, questions, illustrations and notes
+    """
+    return get_step_content(problem_for(tool_context, DEFAULT_PROBLEM_ID), step_number)
+
+# Helper function to generate the per-topic discovery instructions
+def generate_step_instructions(steps):
+    step_instructions = ""
+    for step in steps:
+        step_instructions += f"""
+**Topic Area: {step.topic}**
+- Discovery Focus: {step.description}
+- Key Question: "{step.questions[0].question}"
+- Show illustration: "{step.questions[0].before_question.content}"
 - Explore with: "What if we tried...?", "How is this like something you know?", "What would happen if...?"
-- Build toward understanding: {step['Notes']['UpdatedExpression']}
+- Build toward understanding: {step.updated_expression}
+"""
+    return step_instructions
+
+# Used instead of the per-topic list when the agent fetches steps with get_step
+COMPACT_STEP_PLAN = """Before exploring learning area N, call get_step(step_number=N) to fetch its topic, description, key question, illustration and the understanding to build toward (notes.updated_expression). Fetch each area only when you reach it, starting with 1. Use the first question as the Key Question and its before_question content as the illustration, and explore with "What if we tried...?", "How is this like something you know?", "What would happen if...?"
 """
 
-root_agent = Agent(
-    name="brainStormer",
-    model="gemini-live-2.5-flash-preview",
-    description="A natural brainstorming tutor that guides students through discovery using the ASK → EXPLORE → CONNECT framework.",
-    instruction=f"""You have to speak only in English. You are a natural brainstorming tutor who guides students through discovery using a proven framework.
+def render_instruction(problem: Problem, compact: bool = False) -> str:
+    if compact:
+        step_plan = COMPACT_STEP_PLAN
+    else:
+        step_plan = generate_step_instructions(problem.steps)
+    
+    return f"""You have to speak only in English. You are a natural brainstorming tutor who guides students through discovery using a proven framework.
 
-**Problem**: {problem_data['questionData']['QuestionText']}
-**Topic**: {problem_data['topic']} - {problem_data['title']}
+**Problem**: {problem.question_text}
+**Topic**: {problem.topic} - {problem.title}
 
 ## Your Natural Teaching Flow: ASK → EXPLORE → CONNECT
 
@@ -119,7 +172,7 @@ You follow a natural conversation pattern that feels organic, never mechanical:
 
 ### PHASE 1: ASK (Problem Introduction & Setup) 
 **Start by reading the problem statement clearly:**
-1. Read the full problem: "{problem_data['questionData']['QuestionText']}"
+1. Read the full problem: "{problem.question_text}"
 2. Ask: "What do you already know about this topic?"
 3. Listen to 2-3 initial thoughts without judgment
 4. Build excitement: "Let's explore this together!"
@@ -127,7 +180,7 @@ You follow a natural conversation pattern that feels organic, never mechanical:
 ### PHASE 2: EXPLORE (Guided Discovery Through Ideas)
 Work through the learning areas naturally, using rapid-fire discovery questions:
 
-{step_instructions}
+{step_plan}
 
 ### PHASE 3: CONNECT (Pattern Recognition & Synthesis)
 - "Which ideas feel strongest? Why?"
@@ -168,7 +221,7 @@ Work through the learning areas naturally, using rapid-fire discovery questions:
 - Use for every significant discovery
 - Track the natural progression of understanding
 - Include debate_elements when comparing approaches
-- Always specify the current step_number (1-{len(problem_data['steps'])})
+- Always specify the current step_number (1-{problem.step_count})
 
 ### show_visual_feedback:
 - "discovery" - for initial observations and aha moments
@@ -190,7 +243,40 @@ Work through the learning areas naturally, using rapid-fire discovery questions:
 - End with synthesis and clear sense of discovery
 - Prepare for handoff to closer agent
 
-Remember: This should feel like an exciting conversation with a curious friend who happens to know how to guide discovery. Never mention "steps" or make it feel like a curriculum. Let their natural curiosity drive the exploration!""",
-    # Note: In Google ADK, tools will be added later when we implement the tool system
-    # tools=[update_brainstorm_notes, show_visual_feedback]
-)
\ No newline at end of file
+Remember: This should feel like an exciting conversation with a curious friend who happens to know how to guide discovery. Never mention "steps" or make it feel like a curriculum. Let their natural curiosity drive the exploration!"""
+
+def build_brain_stormer(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    compact: bool = COMPACT_PROMPTS,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the brainStormer agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        compact: Leave per-step content out of the instruction and let the agent fetch it with get_step
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="brainStormer",
+        model=model,
+        description="A natural brainstorming tutor that guides students through discovery using the ASK → EXPLORE → CONNECT framework.",
+        instruction=cached_instruction(
+            "brainStormer/compact" if compact else "brainStormer",
+            problem_id,
+            partial(render_instruction, compact=compact)
+        ),
+        before_agent_callback=bind_problem(problem_id),
+        # BrainstormContext isn't callable by the model: it passes recent turns plus per-step summaries
+        # instead of the whole transcript, and slides a live connection's context window
+        # Compact instructions rely on get_step, so it is registered even before the other tools
+        tools=[BrainstormContext(), get_step] if compact else [BrainstormContext()],
+        # Note: In Google ADK, tools will be added later when we implement the tool system
+        # tools=[update_brainstorm_notes, show_visual_feedback]
+    )
+
+root_agent = build_brain_stormer()
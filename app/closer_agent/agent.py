@@ -1,17 +1,79 @@
-import json
-import os
+from typing import Any, Dict, Optional, Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
+from google.adk.tools import ToolContext
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard3.json")
+from tutoring.instruction_cache import cached_instruction
+from tutoring.schema import Problem
+from tutoring.search import get_problem_index
+from tutoring.session import bind_problem, problem_for
+from tutoring.telemetry import instrument_tool
+from tutoring.tool_runtime import async_tool
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
-root_agent = Agent(
-    name="closer",
-    model="gemini-live-2.5-flash-preview",
-    description="The final agent that summarizes the session and provides closure to the user.",
-    instruction=f"""You have to speak only in English. Congratulate the student for successfully completing all the steps of the problem. Inform them that the final answer to the problem "{problem_data.get('problem', problem_data['questionData']['QuestionText'])}" is: {problem_data['steps'][-1]['Notes']['UpdatedExpression']}. Encourage them to keep practicing and let them know they did a great job!"""
-)
\ No newline at end of file
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+@instrument_tool("closer", DEFAULT_PROBLEM_ID)
+def find_next_problem(
+    query: str = "",
+    limit: int = 3,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Suggests problems to practise next from the problem bank.
+    
+    Args:
+        query: Words describing what the student wants to practise; leave empty for problems related to this one
+        limit: Maximum number of problems to suggest
+        tool_context: Context of the calling session
+    
+    Returns:
+        Dict with success status and the suggested problems, best first
+    """
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    index = get_problem_index()
+    if query:
+        results = index.search(query, limit=limit, exclude=[problem.problem_id])
+    else:
+        results = index.related(problem, limit=limit)
+    
+    return {
+        "success": True,
+        "problems": [{"problem_id": r.problem_id, "topic": r.topic, "title": r.title} for r in results]
+    }
+
+# Async variant to register with ADK: its body runs on the shared tool pool, off the event loop.
+# The first search indexes the whole problem bank, hence the longer timeout.
+find_next_problem_async = async_tool(find_next_problem, timeout=30)
+
+def render_instruction(problem: Problem) -> str:
+    return f"""You have to speak only in English. Congratulate the student for successfully completing all the steps of the problem. Inform them that the final answer to the problem "{problem.problem_text}" is: {problem.final_expression}. Encourage them to keep practicing and let them know they did a great job! If the student asks what to practise next, call find_next_problem with what they want to practise (or no query for problems like this one) and suggest the titles it returns."""
+
+def build_closer(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the closer agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="closer",
+        model=model,
+        description="The final agent that summarizes the session and provides closure to the user.",
+        instruction=cached_instruction("closer", problem_id, render_instruction),
+        before_agent_callback=bind_problem(problem_id),
+        # Registered as the async variant: the first search reads the whole problem bank
+        tools=[find_next_problem_async],
+    )
+
+root_agent = build_closer()
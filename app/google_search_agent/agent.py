@@ -1,6 +1,24 @@
+from typing import Any, Dict
 from google.adk.agents import Agent
 from google.adk.tools import google_search  # Import the tool
 
+from tutoring.telemetry import instrument_tool
+from tutoring.web_search import get_search_cache, search_configured
+
+@instrument_tool("basic_search_agent")
+async def search_web(query: str) -> Dict[str, Any]:
+    """
+    Searches the web and returns the top results.
+
+    Args:
+        query: What to search for
+
+    Returns:
+        Dict with success status and a list of results, each with title, link and snippet
+    """
+    results = await get_search_cache().search(query)
+    return {"success": True, "results": results}
+
 root_agent = Agent(
    # A unique name for the agent.
    name="basic_search_agent",
@@ -12,6 +30,7 @@ root_agent = Agent(
    description="Agent to answer questions using Google Search.",
    # Instructions to set the agent's behavior.
    instruction="You are an expert researcher. You always stick to the facts.",
-   # Add google_search tool to perform grounding with Google search.
-   tools=[google_search]
-)
\ No newline at end of file
+   # Built-in google_search grounds on Google's side, where nothing can be cached. With a
+   # Programmable Search key configured, searches go through the cached search_web tool instead.
+   tools=[search_web] if search_configured() else [google_search]
+)
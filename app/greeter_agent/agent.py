@@ -1,18 +1,41 @@
-import json
-import os
+from typing import Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard3.json")
+from tutoring.instruction_cache import cached_instruction
+from tutoring.schema import Problem
+from tutoring.session import bind_problem
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
-root_agent = Agent(
-    name="greeter",
-    model="gemini-live-2.5-flash-preview",
-    description="The initial agent that welcomes and greets the user to the tutoring session.",
-    instruction=f"""You have to speak only in English. Welcome the student to the tutoring session. Tell them that they will be learning about {problem_data['topic']}: {problem_data['title']}. 
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+def render_instruction(problem: Problem) -> str:
+    return f"""You have to speak only in English. Welcome the student to the tutoring session. Tell them that they will be learning about {problem.topic}: {problem.title}. 
 Be encouraging and supportive in your tone. Once you've provided a warm welcome, the session will automatically proceed to the next phase."""
-)
\ No newline at end of file
+
+def build_greeter(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the greeter agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="greeter",
+        model=model,
+        description="The initial agent that welcomes and greets the user to the tutoring session.",
+        instruction=cached_instruction("greeter", problem_id, render_instruction),
+        before_agent_callback=bind_problem(problem_id),
+    )
+
+root_agent = build_greeter()
@@ -1,16 +1,28 @@
-import json
-import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
+from google.adk.tools import ToolContext
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard3.json")
+from tutoring.events import UiEvent, get_event_bus
+from tutoring.instruction_cache import cached_instruction
+from tutoring.schema import Problem
+from tutoring.session import bind_problem, session_id_for
+from tutoring.telemetry import instrument_tool
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
-def show_intro_visual(content: str, label: str, explanation: str, type: str = "text") -> Dict[str, Any]:
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+@instrument_tool("introGiver", DEFAULT_PROBLEM_ID)
+def show_intro_visual(
+    content: str,
+    label: str,
+    explanation: str,
+    type: str = "text",
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
     """
     Shows introduction visual content and explanation in the main area.
     
@@ -19,40 +31,61 @@ def show_intro_visual(content: str, label: str, explanation: str, type: str = "t
         label: The label/description for the visual
         explanation: The explanation text to be shown with the visual
         type: The type of visual content (text, image, etc.)
+        tool_context: Context of the calling session
     
     Returns:
         Dict with success status and message
     """
-    print(f"🔧 Tool Called - Showing introduction visual: content={content}, label={label}, type={type}")
-    
-    # Note: In actual implementation, this would trigger UI update through appropriate callback
-    # For now, just logging the tool call
-    print(f"✅ Showed introduction visual")
+    get_event_bus().publish(session_id_for(tool_context), UiEvent(
+        kind="intro_visual",
+        payload={"content": content, "label": label, "explanation": explanation, "type": type},
+        coalesce_key=("intro_visual",)
+    ))
     
     return {
         "success": True,
         "message": "Introduction visual shown successfully"
     }
 
-root_agent = Agent(
-    name="introGiver",
-    model="gemini-live-2.5-flash-preview",
-    description="The agent that introduces the concept with a visual aid and explanation.",
-    instruction=f"""You have to speak only in English. Your job is to introduce the mathematical concept to the student.
+def render_instruction(problem: Problem) -> str:
+    return f"""You have to speak only in English. Your job is to introduce the mathematical concept to the student.
 
-First, speak the introduction text: "{problem_data['introData']['Voice']}"
+First, speak the introduction text: "{problem.intro_voice}"
 
 Then, use the show_intro_visual function to display the visual aid and explanation to the student:
 show_intro_visual(
-    content="{problem_data['introData']['Visual']['Content']}",
-    label="{problem_data['introData']['Visual']['Label']}",
-    explanation="{problem_data['introData']['TopicExplanation']}",
-    type="{problem_data['introData']['Visual']['Type']}"
+    content="{problem.intro_visual.content}",
+    label="{problem.intro_visual.label}",
+    explanation="{problem.intro_explanation}",
+    type="{problem.intro_visual.type}"
 )
 
 After introducing the concept, pause briefly to allow the student to absorb the information, then inform them that you'll be moving on to the problem itself. The session will automatically continue to the next phase where the problem will be presented.
 
-Note: Always maintain an encouraging and supportive tone. Make the student feel comfortable with learning the new concept.""",
-    # Note: In Google ADK, tools will be added later when we implement the tool system
-    # tools=[show_intro_visual_tool]
-)
\ No newline at end of file
+Note: Always maintain an encouraging and supportive tone. Make the student feel comfortable with learning the new concept."""
+
+def build_intro_giver(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the introGiver agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="introGiver",
+        model=model,
+        description="The agent that introduces the concept with a visual aid and explanation.",
+        instruction=cached_instruction("introGiver", problem_id, render_instruction),
+        before_agent_callback=bind_problem(problem_id),
+        # Note: In Google ADK, tools will be added later when we implement the tool system
+        # tools=[show_intro_visual_tool]
+    )
+
+root_agent = build_intro_giver()
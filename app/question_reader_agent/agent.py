@@ -1,17 +1,44 @@
-import json
-import os
+from typing import Dict, Any, List, Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard3.json")
+from tutoring.instruction_cache import cached_instruction
+from tutoring.schema import Problem
+from tutoring.session import bind_problem
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
-root_agent = Agent(
-    name="questionReader",
-    model="gemini-live-2.5-flash-preview",
-    description="The agent that reads out the question/problem with options and routes them to the correct downstream agent.",
-    instruction=f"""You have to speak only in English. Ask the student whether they want to read the question read out loud or not. If they say yes, read the {problem_data.get('problem', problem_data['questionData']['QuestionText'])} and {problem_data['questionData'].get('Options', [])} to them. Once the question has been presented, the tutoring session will automatically begin."""
-)
\ No newline at end of file
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+# Options in the same shape as the problem file, e.g. [{'Option': 15, 'IsCorrect': True}, ...]
+def option_list(problem: Problem) -> List[Dict[str, Any]]:
+    return [{'Option': o.option, 'IsCorrect': o.is_correct} for o in problem.options]
+
+def render_instruction(problem: Problem) -> str:
+    return f"""You have to speak only in English. Ask the student whether they want to read the question read out loud or not. If they say yes, read the {problem.problem_text} and {option_list(problem)} to them. Once the question has been presented, the tutoring session will automatically begin."""
+
+def build_question_reader(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the questionReader agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="questionReader",
+        model=model,
+        description="The agent that reads out the question/problem with options and routes them to the correct downstream agent.",
+        instruction=cached_instruction("questionReader", problem_id, render_instruction),
+        before_agent_callback=bind_problem(problem_id),
+    )
+
+root_agent = build_question_reader()
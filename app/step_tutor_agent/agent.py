@@ -1,70 +1,81 @@
-import json
-import os
-from typing import Dict, Any, List, Optional
+from functools import partial
+from typing import Dict, Any, List, Optional, Union
 from google.adk.agents import Agent
+from google.adk.models import BaseLlm
+from google.adk.tools import ToolContext
 
-# Load problem data
-current_dir = os.path.dirname(os.path.abspath(__file__))
-data_path = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data", "hard3.json")
+from tutoring.answers import CORRECT, INCORRECT, check_step_answer
+from tutoring.events import UiEvent, get_event_bus
+from tutoring.instruction_cache import cached_instruction
+from tutoring.progress import get_progress_store
+from tutoring.schema import Problem
+from tutoring.session import bind_problem, problem_for, problem_id_for, session_id_for
+from tutoring.steps import COMPACT_PROMPTS, get_step_content
+from tutoring.telemetry import instrument_tool, tool_event
+from tutoring.validation import STEP_FEEDBACK_TYPES, get_validation_table, validate_step_updates
 
-with open(data_path, 'r') as f:
-    problem_data = json.load(f)
+# Live model every session of this agent talks to
+MODEL = "gemini-live-2.5-flash-preview"
 
-def update_notes(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+@instrument_tool("stepTutor", DEFAULT_PROBLEM_ID)
+def update_notes(steps: List[Dict[str, Any]], tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
     """
     Updates the tutoring notes when steps are completed. Can handle multiple steps at once.
     
     Args:
         steps: Array of step information objects that were completed
                Each step should have: stepNumber, description, updatedExpression
+        tool_context: Context of the calling session, used to find its problem
     
     Returns:
         Dict with success status and message
     """
-    print(f"🔧 Tool Called - Updating {len(steps)} steps: {steps}")
-    
-    last_step_data = None
-    
-    # Process each step in sequence
-    for step in steps:
-        step_number = step.get('stepNumber')
-        description = step.get('description')
-        updated_expression = step.get('updatedExpression')
-        
-        if not all([step_number, description, updated_expression]):
-            print(f"❌ Missing required fields in step: {step}")
-            continue
-            
-        # Validate step number
-        if step_number < 1 or step_number > len(problem_data['steps']):
-            print(f"❌ Invalid step number: {step_number}. Valid range: 1-{len(problem_data['steps'])}")
-            continue
-        
-        # Find the corresponding step data (0-indexed in the array)
-        step_data = problem_data['steps'][step_number - 1]
-        if not step_data:
-            print(f"❌ Step data not found for step {step_number}")
-            continue
-        
-        # Note: In actual implementation, this would trigger UI update through appropriate callback
-        # For now, just logging the tool call
-        print(f"✅ Updated notes for step {step_number}")
-        
-        last_step_data = step_data
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    session_id = session_id_for(tool_context)
     
-    return {
+    # One pass over the whole batch: rejects invalid entries, keeps the last update per step
+    batch = validate_step_updates(problem, steps)
+    for error in batch.errors:
+        tool_event(error.code, step_number=error.step_number, total_steps=problem.step_count)
+    for step_number in batch.unexpected_expressions:
+        tool_event("unexpected_expression", step_number=step_number)
+    
+    bus = get_event_bus()
+    for step in batch.steps:
+        step_number = step['stepNumber']
+        bus.publish(session_id, UiEvent(
+            kind="notes",
+            payload={"step_number": step_number, "description": step['description'], "updated_expression": step['updatedExpression']},
+            coalesce_key=("notes", step_number)
+        ))
+    
+    # Persisted by the progress store's writer thread, never on this call
+    if session_id and batch.steps:
+        get_progress_store().record_steps(
+            session_id, problem_id_for(tool_context, DEFAULT_PROBLEM_ID), batch.steps
+        )
+    
+    result = {
         "success": True,
-        "message": f"Notes updated for {len(steps)} steps",
-        "step_title": last_step_data.get('Topic') if last_step_data else None,
-        "total_steps": len(problem_data['steps'])
+        "message": f"Notes updated for {len(batch.steps)} steps",
+        "step_title": problem.steps[batch.steps[-1]['stepNumber'] - 1].topic if batch.steps else None,
+        "total_steps": problem.step_count
     }
+    if batch.errors:
+        result["errors"] = batch.error_dicts()
+    return result
 
+@instrument_tool("stepTutor", DEFAULT_PROBLEM_ID)
 def show_visual_feedback(
     type: str,
     content: str,
     label: str,
     step_number: int,
-    question_index: Optional[int] = None
+    question_index: Optional[int] = None,
+    tool_context: Optional[ToolContext] = None
 ) -> Dict[str, Any]:
     """
     Shows visual feedback in the main area based on student responses or before asking questions.
@@ -75,45 +86,100 @@ def show_visual_feedback(
         label: The label for the visual feedback
         step_number: The step number this feedback relates to
         question_index: The index of the conceptual question this feedback relates to
+        tool_context: Context of the calling session, used to find its problem
     
     Returns:
         Dict with success status and message
     """
-    valid_types = ["hint", "success", "illustration"]
-    
-    if type not in valid_types:
+    if type not in STEP_FEEDBACK_TYPES:
         return {"success": False, "message": f"Invalid feedback type: {type}"}
     
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    
     # Validate step number
-    if step_number < 1 or step_number > len(problem_data['steps']):
-        print(f"❌ Invalid step number: {step_number}. Valid range: 1-{len(problem_data['steps'])}")
+    if not get_validation_table(problem).is_valid_step(step_number):
+        tool_event("invalid_step_number", step_number=step_number, total_steps=problem.step_count)
         return {"success": False, "message": "Invalid step number"}
     
-    # Find the corresponding step data (0-indexed in the array)
-    step_data = problem_data['steps'][step_number - 1]
-    if not step_data:
-        print(f"❌ Step data not found for step {step_number}")
-        return {"success": False, "message": "Step data not found"}
+    # Repeated feedback for the same step within one frame only shows the latest
+    get_event_bus().publish(session_id_for(tool_context), UiEvent(
+        kind="visual_feedback",
+        payload={"type": type, "content": content, "label": label, "step_number": step_number, "question_index": question_index},
+        coalesce_key=("visual_feedback", step_number)
+    ))
+    
+    return {
+        "success": True,
+        "message": f"{type} feedback shown successfully"
+    }
+
+@instrument_tool("stepTutor", DEFAULT_PROBLEM_ID)
+def get_step(step_number: int, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """
+    Fetches the questions, illustrations and notes for one step of the problem.
+    
+    Args:
+        step_number: The step to fetch (1-based)
+        tool_context: Context of the calling session, used to find its problem
+    
+    Returns:
+        Dict with the step's topic, questions, illustrations and notes
+    """
+    return get_step_content(problem_for(tool_context, DEFAULT_PROBLEM_ID), step_number)
+
+@instrument_tool("stepTutor", DEFAULT_PROBLEM_ID)
+def check_answer(
+    step_number: int,
+    answer: str,
+    question_index: Optional[int] = None,
+    tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Checks the student's answer for a step against the expected result, without asking the model.
+    
+    Args:
+        step_number: The step the answer belongs to
+        answer: What the student said, e.g. "twelve" or "8 + 12 - 5"
+        question_index: The conceptual question being answered; if given, its success or hint feedback is shown right away
+        tool_context: Context of the calling session, used to find its problem
     
-    print(f"🔧 Tool Called - Showing {type} feedback: {content}")
+    Returns:
+        Dict with the verdict ("correct", "incorrect", "ahead" or "unknown"), the expected result and whether feedback was shown
+    """
+    problem = problem_for(tool_context, DEFAULT_PROBLEM_ID)
+    try:
+        result = check_step_answer(problem, step_number, answer)
+    except ValueError as e:
+        tool_event("invalid_step_number", step_number=step_number, total_steps=problem.step_count)
+        return {"success": False, "message": str(e)}
+    tool_event("answer_checked", step_number=step_number, verdict=result.verdict)
     
-    # Note: In actual implementation, this would trigger UI update through appropriate callback
-    # For now, just logging the tool call
-    print(f"✅ Showed {type} feedback for step {step_number}")
+    questions = problem.steps[step_number - 1].questions
+    feedback_shown = False
+    # An answer for a later step isn't wrong, so only a definite verdict shows feedback
+    if result.verdict in (CORRECT, INCORRECT) and question_index is not None and 0 <= question_index < len(questions):
+        feedback_type = "success" if result.verdict == CORRECT else "hint"
+        visual = getattr(questions[question_index], feedback_type)
+        get_event_bus().publish(session_id_for(tool_context), UiEvent(
+            kind="visual_feedback",
+            payload={"type": feedback_type, "content": visual.content, "label": visual.label, "step_number": step_number, "question_index": question_index},
+            coalesce_key=("visual_feedback", step_number)
+        ))
+        feedback_shown = True
     
     return {
         "success": True,
-        "message": f"{type} feedback shown successfully"
+        "verdict": result.verdict,
+        "reason": result.reason,
+        "expected": result.expected,
+        "feedback_shown": feedback_shown
     }
 
 # Helper function to generate dynamic step instructions
 def generate_step_instructions(steps):
     instructions = []
     for index, step in enumerate(steps):
-        questions = []
-        for q in step['ConceptualQuestions']:
-            questions.append(q['Question'])
-        questions_str = " Then ask: ".join(questions)
+        questions_str = " Then ask: ".join(step.question_texts)
         instructions.append(f"- For step {index + 1}: {questions_str}")
     return "\n".join(instructions)
 
@@ -122,30 +188,39 @@ def generate_step_completion_data(steps):
     completion_data = []
     for index, step in enumerate(steps):
         completion_data.append(
-            f"- Step {index + 1}: description=\"{step['Notes']['Description']}\", "
-            f"expression=\"{step['Notes']['UpdatedExpression']}\""
+            f"- Step {index + 1}: description=\"{step.notes_description}\", "
+            f"expression=\"{step.updated_expression}\""
         )
     return "\n".join(completion_data)
 
-root_agent = Agent(
-    name="stepTutor",
-    model="gemini-live-2.5-flash-preview",
-    description="The agent that guides the student through the problem-solving process step by step.",
-    instruction=f"""You have to speak only in English. You will guide the student through the problem-solving process for the following problem: {problem_data.get('problem', problem_data['questionData']['QuestionText'])}.
+# Used instead of the per-step lists when the agent fetches steps with get_step
+COMPACT_STEP_PLAN = """- Before starting step N, call get_step(step_number=N) to fetch that step's illustrations, conceptual questions and notes. Start with step 1 and fetch each step only when you reach it."""
+
+COMPACT_COMPLETION_DATA = """- For each completed step, use the notes.description and notes.updated_expression returned by get_step as its description and updatedExpression"""
+
+def render_instruction(problem: Problem, compact: bool = False) -> str:
+    if compact:
+        step_plan = COMPACT_STEP_PLAN
+        completion_data = COMPACT_COMPLETION_DATA
+    else:
+        step_plan = generate_step_instructions(problem.steps)
+        completion_data = generate_step_completion_data(problem.steps)
+    
+    return f"""You have to speak only in English. You will guide the student through the problem-solving process for the following problem: {problem.problem_text}.
 
 Problem Details:
-- Topic: {problem_data['topic']}
-- Title: {problem_data['title']}
-- Total Steps: {len(problem_data['steps'])}
+- Topic: {problem.topic}
+- Title: {problem.title}
+- Total Steps: {problem.step_count}
 
 Follow these steps:
 - For each step in the steps array, first show the illustration's BeforeQuestion content using show_visual_feedback, then ask ALL conceptual questions from that step sequentially.
-{generate_step_instructions(problem_data['steps'])}
+{step_plan}
 
 Process:
 1. Before starting a step, use show_visual_feedback to display the Illustration.BeforeQuestion for that step
 2. Ask all conceptual questions for a step, one at a time
-3. Wait for the student's answer after each question
+3. Wait for the student's answer after each question, then call check_answer(step_number=[step number], answer="[student's answer]", question_index=[question index]) before judging it: follow its verdict, skip showing feedback it already shows (feedback_shown), treat "ahead" as a correct answer to a later step, and judge the answer yourself only when the verdict is "unknown"
 4. If the answer is correct:
    - Use show_visual_feedback to display the Illustration.Feedback.Success feedback
    - Acknowledge and continue to the next question in the step
@@ -160,7 +235,7 @@ Process:
 8. IMPORTANT: If a student answers questions from multiple steps in a single response, update multiple steps at once
 
 CRITICAL: When one or more steps are completed, you MUST call the update_notes function with data for all completed steps:
-{generate_step_completion_data(problem_data['steps'])}
+{completion_data}
 
 Visual Feedback Instructions:
 - Before asking questions for a step, show the BeforeQuestion illustration:
@@ -217,7 +292,38 @@ OR
 5. Student: "It's 3 divided by 1" (still incorrect on second try)
 6. You: "Actually, the correct operation is addition. In (3 + 1), we have 3 plus 1, which equals 4. Let's continue."
 
-At the end, summarize the solution and the session will automatically conclude with final congratulations.""",
-    # Note: In Google ADK, tools will be added later when we implement the tool system
-    # tools=[update_notes, show_visual_feedback]
-)
\ No newline at end of file
+At the end, summarize the solution and the session will automatically conclude with final congratulations."""
+
+def build_step_tutor(
+    problem_id: str = DEFAULT_PROBLEM_ID,
+    compact: bool = COMPACT_PROMPTS,
+    model: Union[str, BaseLlm] = MODEL
+) -> Agent:
+    """
+    Builds the stepTutor agent for one problem.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+        compact: Leave per-step content out of the instruction and let the agent fetch it with get_step
+        model: Model name or instance, e.g. a local stand-in model for benchmarks
+
+    Returns:
+        A fresh agent whose instruction comes from the shared instruction cache
+    """
+    return Agent(
+        name="stepTutor",
+        model=model,
+        description="The agent that guides the student through the problem-solving process step by step.",
+        instruction=cached_instruction(
+            "stepTutor/compact" if compact else "stepTutor",
+            problem_id,
+            partial(render_instruction, compact=compact)
+        ),
+        before_agent_callback=bind_problem(problem_id),
+        # Compact instructions rely on get_step, so it is registered even before the other tools
+        tools=[get_step] if compact else [],
+        # Note: In Google ADK, tools will be added later when we implement the tool system
+        # tools=[update_notes, show_visual_feedback, check_answer]
+    )
+
+root_agent = build_step_tutor()
@@ -0,0 +1,55 @@
+import pytest
+
+from step_tutor_agent.agent import check_answer
+from tutoring.answers import AHEAD, CORRECT, INCORRECT, UNKNOWN, check_step_answer
+from tutoring.problem_store import get_problem_store
+
+# hard3 is 8 + (6 ÷ 2 × 4) - 5; step 2 divides (3), step 3 multiplies (12), step 5 is the result (15)
+PROBLEM_ID = "hard3"
+
+
+@pytest.fixture(scope="module")
+def problem():
+    return get_problem_store().get(PROBLEM_ID)
+
+
+@pytest.mark.parametrize("answer", ["3", "three", "6 ÷ 2 = 3", "8 + (3 x 4) - 5"])
+def test_the_steps_own_result_is_correct(problem, answer):
+    assert check_step_answer(problem, 2, answer).verdict == CORRECT
+
+
+@pytest.mark.parametrize("answer, later_step", [("12", 3), ("6 ÷ 2 × 4 = 12", 3), ("8 + 12 - 5", 3), ("15", 5)])
+def test_a_later_steps_result_is_ahead(problem, answer, later_step):
+    result = check_step_answer(problem, 2, answer)
+
+    assert result.verdict == AHEAD
+    assert result.reason == f"matches the result of step {later_step}"
+
+
+@pytest.mark.parametrize("answer", ["7", "6 × 2 = 11"])
+def test_a_value_no_step_produces_is_incorrect(problem, answer):
+    assert check_step_answer(problem, 2, answer).verdict == INCORRECT
+
+
+@pytest.mark.parametrize("answer", ["we divide first", "8 + 12 - 5 and so on", ""])
+def test_an_unparsable_answer_is_unknown(problem, answer):
+    assert check_step_answer(problem, 4, answer).verdict == UNKNOWN
+
+
+def test_an_unsimplified_earlier_expression_is_unknown_not_ahead(problem):
+    # Every step of hard3 evaluates to 15; only a number a later step produces counts as ahead
+    assert check_step_answer(problem, 4, "8 + 12 - 5").verdict == UNKNOWN
+
+
+@pytest.mark.parametrize("step_number", [0, 7, True, 2.0])
+def test_invalid_step_numbers_are_rejected(problem, step_number):
+    with pytest.raises(ValueError):
+        check_step_answer(problem, step_number, "3")
+
+
+@pytest.mark.parametrize("answer, shown", [("3", True), ("7", True), ("12", False), ("we divide first", False)])
+def test_check_answer_shows_feedback_only_for_a_definite_verdict(answer, shown):
+    result = check_answer(step_number=2, answer=answer, question_index=0)
+
+    assert result["success"]
+    assert result["feedback_shown"] is shown
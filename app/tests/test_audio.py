@@ -0,0 +1,98 @@
+import asyncio
+
+from tutoring.audio import AudioFormat, AudioFrameQueue, DownstreamAudio
+
+# One byte per millisecond keeps chunk and capacity sizes readable
+BYTE_PER_MS = AudioFormat(sample_rate=1000, sample_width=1)
+
+
+def test_chunks_within_a_frame_are_not_copied():
+    frames = AudioFrameQueue(capacity=16)
+    frames.write(b"AAAABBBB")
+
+    assert bytes(frames.read(4)) == b"AAAA"
+    assert bytes(frames.read(4)) == b"BBBB"
+    assert frames.bytes_copied == 0
+
+
+def test_chunks_spanning_frames_are_copied_once():
+    frames = AudioFrameQueue(capacity=16)
+    frames.write(b"AAA")
+    frames.write(b"BBB")
+
+    assert bytes(frames.read(4)) == b"AAAB"
+    assert frames.bytes_copied == 4
+
+
+def test_overrun_drops_the_oldest_audio():
+    frames = AudioFrameQueue(capacity=10)
+    frames.write(b"AAAAA")
+    frames.write(b"BBBBB")
+
+    assert frames.write(b"CCCC") == 4
+    assert frames.overruns == 1
+    assert bytes(frames.read(10)) == b"ABBBBBCCCC"
+
+
+def test_overrun_between_peek_and_consume_loses_no_unsent_audio():
+    frames = AudioFrameQueue(capacity=10)
+    frames.write(b"AAAAA")
+    frames.write(b"BBBBB")
+
+    assert bytes(frames.peek(4)) == b"AAAA"
+    # The overrun drops the peeked bytes itself; consume must not drop "ABBB" on top
+    frames.write(b"CCCC")
+    frames.consume(4)
+
+    assert bytes(frames.read(10)) == b"ABBBBBCCCC"
+
+
+def test_overrun_past_the_peeked_chunk_consumes_nothing_more():
+    frames = AudioFrameQueue(capacity=10)
+    frames.write(b"AAAAA")
+    frames.write(b"BBBBB")
+
+    frames.peek(2)
+    frames.write(b"CCCCCC")
+    frames.consume(2)
+
+    assert bytes(frames.read(10)) == b"BBBBCCCCCC"
+
+
+def test_consume_after_clear_is_ignored_by_the_generation_check():
+    frames = AudioFrameQueue(capacity=10)
+    frames.write(b"AAAA")
+    generation = frames.generation
+    frames.peek(4)
+    frames.clear()
+    frames.write(b"BBBB")
+
+    assert frames.generation != generation
+    assert bytes(frames.read(4)) == b"BBBB"
+
+
+def test_downstream_sends_every_byte_once_when_the_queue_overruns_mid_send():
+    sent = []
+    audio = None
+
+    async def send(chunk):
+        sent.append(bytes(chunk))
+        if len(sent) == 1:
+            # More model audio arrives while the first chunk is on its way out
+            audio.feed(b"CCCC")
+
+    async def play():
+        nonlocal audio
+        audio = DownstreamAudio(send, BYTE_PER_MS, chunk_ms=4, prebuffer_ms=0, capacity_ms=10)
+        audio.feed(b"AAAAA")
+        audio.feed(b"BBBBB")
+        audio.end_turn()
+        player = asyncio.create_task(audio.run())
+        await asyncio.sleep(0.1)
+        audio.close()
+        await player
+
+    asyncio.run(play())
+
+    assert b"".join(sent) == b"AAAA" + b"ABBBBBCCCC"
+    assert audio.frames.overruns == 1
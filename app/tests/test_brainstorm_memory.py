@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from tutoring.brainstorm_memory import MEMORY_HEADER, BrainstormContext, compact_history, get_brainstorm_memory
+
+
+@pytest.fixture
+def session_id():
+    session_id = f"brainstorm-{uuid.uuid4()}"
+    yield session_id
+    get_brainstorm_memory().forget(session_id)
+
+
+def _request(turns):
+    contents = []
+    for i in range(turns):
+        contents.append(types.Content(role="user", parts=[types.Part(text=f"idea {i}")]))
+        contents.append(types.Content(role="model", parts=[types.Part(text=f"reply {i}")]))
+    return LlmRequest(contents=contents)
+
+
+def _discover(session_id):
+    get_brainstorm_memory().record(session_id, {
+        "step_number": 1, "discovery_type": "breakthrough", "student_ideas": ["group the multiplication"],
+    })
+
+
+def test_history_is_kept_whole_without_a_summary(session_id):
+    request = _request(10)
+
+    assert not compact_history(session_id, request, kept_turns=3)
+    assert len(request.contents) == 20
+
+
+def test_history_is_kept_whole_while_it_is_short(session_id):
+    _discover(session_id)
+    request = _request(3)
+
+    assert not compact_history(session_id, request, kept_turns=3)
+    assert len(request.contents) == 6
+
+
+def test_older_turns_are_replaced_by_the_summary(session_id):
+    _discover(session_id)
+    request = _request(10)
+
+    assert compact_history(session_id, request, kept_turns=3)
+    assert [c.parts[0].text for c in request.contents] == ["idea 7", "reply 7", "idea 8", "reply 8", "idea 9", "reply 9"]
+    assert MEMORY_HEADER in request.config.system_instruction
+    assert "group the multiplication" in request.config.system_instruction
+
+
+def test_function_responses_dont_count_as_student_turns(session_id):
+    _discover(session_id)
+    request = _request(3)
+    response = types.Part(function_response=types.FunctionResponse(name="get_step", response={}))
+    request.contents[3:3] = [types.Content(role="user", parts=[response])] * 4
+
+    assert not compact_history(session_id, request, kept_turns=3)
+
+
+def test_context_tool_compacts_and_bounds_the_live_context(session_id):
+    _discover(session_id)
+    request = _request(10)
+    tool_context = SimpleNamespace(_invocation_context=SimpleNamespace(session=SimpleNamespace(id=session_id)))
+
+    asyncio.run(BrainstormContext(kept_turns=3, trigger_tokens=2000, target_tokens=1000).process_llm_request(
+        tool_context=tool_context, llm_request=request
+    ))
+
+    assert len(request.contents) == 6
+    compression = request.live_connect_config.context_window_compression
+    assert (compression.trigger_tokens, compression.sliding_window.target_tokens) == (2000, 1000)
+    # Not a function the model can call
+    assert not request.config.tools
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+import tutoring.progress as progress
+from step_tutor_agent.agent import build_step_tutor
+from tutoring.fake_model import ScriptedLlm
+from tutoring.pipeline import RESUME_PHASE, TutoringPipeline
+from tutoring.problem_store import get_problem_store
+from tutoring.progress import ProgressStore
+from tutoring.session import RESUMED_PROGRESS_STATE_KEY
+from tutoring_pipeline_agent.agent import tutoring_phases
+
+PROBLEM_ID = "hard3"
+SESSION_ID = "returning-student"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ProgressStore(db_path=str(tmp_path / "progress.sqlite3"))
+    monkeypatch.setattr(progress, "_default_store", store)
+    yield store
+    store.close()
+
+
+class _NoUtterances:
+    def get(self, key):
+        return None
+
+    def put(self, key, utterance):
+        pass
+
+
+def _run_session(llm):
+    phases = [
+        (name, (lambda build: lambda problem_id: build(problem_id, model=llm))(build))
+        for name, build in tutoring_phases(PROBLEM_ID)
+    ]
+    pipeline = TutoringPipeline(
+        name="tutoringPipeline", problem_id=PROBLEM_ID, phases=phases, utterance_cache=_NoUtterances()
+    )
+
+    async def run():
+        runner = InMemoryRunner(agent=pipeline, app_name="tutoring")
+        await runner.session_service.create_session(app_name="tutoring", user_id="student", session_id=SESSION_ID)
+        message = types.Content(role="user", parts=[types.Part(text="Hi")])
+        authors = [event.author async for event in runner.run_async(user_id="student", session_id=SESSION_ID, new_message=message)]
+        session = await runner.session_service.get_session(app_name="tutoring", user_id="student", session_id=SESSION_ID)
+        return authors, session.state
+
+    return asyncio.run(run())
+
+
+def test_a_new_session_starts_at_the_greeter(store):
+    authors, state = _run_session(ScriptedLlm(model="scripted"))
+
+    assert authors[0] == "greeter"
+    assert RESUMED_PROGRESS_STATE_KEY not in state
+
+
+def test_a_returning_session_resumes_at_the_step_tutor_with_its_progress_persisted(store):
+    store.record_steps(SESSION_ID, PROBLEM_ID, [
+        {"stepNumber": 1, "description": "Inner parentheses", "updatedExpression": "8 + (3 × 4) - 5"},
+    ])
+
+    authors, state = _run_session(ScriptedLlm(model="scripted"))
+
+    assert "greeter" not in authors and "questionReader" not in authors
+    assert authors[0] == "tutoringPipeline"
+    assert authors[1] == RESUME_PHASE
+    assert state[RESUMED_PROGRESS_STATE_KEY] == {"completed_steps": [1], "current_expression": "8 + (3 × 4) - 5"}
+
+
+def test_only_the_resumed_phase_is_told_which_steps_are_done():
+    pipeline = TutoringPipeline(name="tutoringPipeline", problem_id=PROBLEM_ID, phases=tutoring_phases(PROBLEM_ID))
+    content_hash = get_problem_store().content_hash(PROBLEM_ID)
+    resumed = {"completed_steps": [1, 2], "current_expression": "8 + 12 - 5"}
+
+    fresh, _ = pipeline._prepare_phase(RESUME_PHASE, build_step_tutor, False, content_hash)
+    returning, _ = pipeline._prepare_phase(RESUME_PHASE, build_step_tutor, False, content_hash, resumed)
+
+    assert "coming back" not in fresh.instruction
+    assert "completed steps 1, 2 and the expression is now 8 + 12 - 5" in returning.instruction
+    assert returning.instruction.startswith(fresh.instruction)
@@ -0,0 +1,35 @@
+import json
+import shutil
+
+import pytest
+
+from tutoring.bundle import DATA_DIR
+from tutoring.problem_store import ProblemStore
+from tutoring.search import build_index
+
+
+@pytest.fixture
+def store(tmp_path):
+    for name in ("hard3.json", "hard4.json"):
+        shutil.copy(f"{DATA_DIR}/{name}", tmp_path / name)
+    with open(f"{DATA_DIR}/hard3.json") as f:
+        broken = json.load(f)
+    del broken["steps"]
+    (tmp_path / "broken.json").write_text(json.dumps(broken))
+    return ProblemStore(data_dir=str(tmp_path), bundle_path=None)
+
+
+def test_an_invalid_problem_is_left_out_of_the_index(store, capsys):
+    index = build_index(store)
+
+    found = {result.problem_id for result in index.search("order of operations parentheses", limit=10)}
+    assert "hard3" in found
+    assert "broken" not in found
+    assert "broken" in capsys.readouterr().err
+
+
+def test_every_valid_problem_is_indexed(store):
+    index = build_index(store)
+    hard4 = store.get("hard4")
+
+    assert index.search(hard4.title, limit=1)[0].problem_id == "hard4"
@@ -0,0 +1,57 @@
+import pytest
+
+import tutoring.utterances as utterances
+from greeter_agent.agent import build_greeter
+from tutoring.pipeline import TutoringPipeline
+from tutoring.problem_store import get_problem_store
+from tutoring.utterances import DEFAULT_PRECOMPUTE_MODEL, Utterance, UtteranceCache, utterance_key
+
+PROBLEM_ID = "hard3"
+
+TEXT_ONLY = Utterance(text="Welcome!")
+WITH_AUDIO = Utterance(text="Welcome!", audio=b"\x00\x01" * 8, audio_mime_type="audio/pcm;rate=24000")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return UtteranceCache(db_path=str(tmp_path / "utterances.sqlite3"))
+
+
+def _prepare_greeter(cache, live):
+    pipeline = TutoringPipeline(
+        name="tutoringPipeline", problem_id=PROBLEM_ID, phases=[("greeter", build_greeter)], utterance_cache=cache
+    )
+    content_hash = get_problem_store().content_hash(PROBLEM_ID)
+    return pipeline._prepare_phase("greeter", build_greeter, live, content_hash)
+
+
+@pytest.mark.parametrize("live, replayed", [(False, True), (True, False)])
+def test_text_only_utterances_are_replayed_to_text_sessions_only(cache, live, replayed):
+    cache.put(utterance_key("greeter", PROBLEM_ID), TEXT_ONLY)
+
+    _, utterance = _prepare_greeter(cache, live)
+
+    assert (utterance == TEXT_ONLY) is replayed
+
+
+@pytest.mark.parametrize("live", [False, True])
+def test_utterances_with_audio_are_replayed_to_every_session(cache, live):
+    cache.put(utterance_key("greeter", PROBLEM_ID), WITH_AUDIO)
+
+    _, utterance = _prepare_greeter(cache, live)
+
+    assert utterance == WITH_AUDIO
+
+
+@pytest.mark.parametrize("argv, model", [([], DEFAULT_PRECOMPUTE_MODEL), (["--model", "gemini-2.0-flash"], "gemini-2.0-flash")])
+def test_precompute_command_passes_the_model_through(monkeypatch, tmp_path, argv, model):
+    calls = []
+
+    async def fake_precompute(problem_ids, **kwargs):
+        calls.append(kwargs)
+        return {"generated": 1, "cached": 0, "failed": 0}
+
+    monkeypatch.setattr(utterances, "precompute", fake_precompute)
+
+    assert utterances.main(["--db", str(tmp_path / "utterances.sqlite3"), *argv]) == 0
+    assert calls[0]["model"] == model
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from tutoring.web_search import SearchCache, StaticSearchBackend
+
+
+class FailingSearchBackend(StaticSearchBackend):
+    """Fails the first `failures` queries, then answers like StaticSearchBackend."""
+
+    def __init__(self, failures: int = 1, latency: float = 0.0):
+        super().__init__(latency=latency)
+        self.failures = failures
+
+    async def search(self, query, num_results=5):
+        results = await super().search(query, num_results)
+        if self.calls <= self.failures:
+            raise ConnectionError("search backend unavailable")
+        return results
+
+
+async def _gather_searches(cache, queries):
+    return await asyncio.gather(*(cache.search(q) for q in queries), return_exceptions=True)
+
+
+def test_identical_queries_share_one_backend_call():
+    backend = StaticSearchBackend({"order of operations": [{"title": "PEMDAS"}]}, latency=0.05)
+    cache = SearchCache(backend)
+
+    results = asyncio.run(_gather_searches(cache, ["Order of operations", "order  of operations?", "ORDER OF OPERATIONS"]))
+
+    assert backend.calls == 1
+    assert results == [[{"title": "PEMDAS"}]] * 3
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 2, 0)
+
+
+def test_cached_results_are_served_without_the_backend():
+    backend = StaticSearchBackend()
+    cache = SearchCache(backend)
+
+    async def search_twice():
+        await cache.search("fractions")
+        return await cache.search("Fractions")
+
+    asyncio.run(search_twice())
+
+    assert backend.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    backend = FailingSearchBackend(failures=1, latency=0.05)
+    cache = SearchCache(backend)
+
+    async def fail_then_retry():
+        failed = await _gather_searches(cache, ["long division"] * 3)
+        retried = await cache.search("long division")
+        return failed, retried
+
+    failed, retried = asyncio.run(fail_then_retry())
+
+    assert all(isinstance(result, ConnectionError) for result in failed)
+    assert retried == [{"title": "long division", "link": "https://example.com/search?q=long division", "snippet": ""}]
+    assert backend.calls == 2
+    stats = cache.stats()
+    assert (stats["errors"], stats["coalesced_errors"], stats["coalesced"], stats["hits"]) == (1, 2, 0, 0)
+    assert stats["hit_ratio"] == 0.0
+
+
+def test_entries_expire_after_the_ttl():
+    backend = StaticSearchBackend()
+    cache = SearchCache(backend, ttl=0.05)
+
+    async def search_across_expiry():
+        await cache.search("prime numbers")
+        await cache.search("prime numbers")
+        await asyncio.sleep(0.1)
+        await cache.search("prime numbers")
+
+    asyncio.run(search_across_expiry())
+
+    assert backend.calls == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_cancelling_the_first_caller_does_not_fail_the_others():
+    backend = StaticSearchBackend({"area": [{"title": "Area"}]}, latency=0.05)
+    cache = SearchCache(backend)
+
+    async def cancel_first():
+        first = asyncio.create_task(cache.search("area"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.search("area"))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(cancel_first()) == [{"title": "Area"}]
+    assert backend.calls == 1
+    assert cache.stats()["size"] == 1
+
+
+def test_query_finishes_and_is_cached_when_every_caller_is_cancelled():
+    backend = StaticSearchBackend(latency=0.05)
+    cache = SearchCache(backend)
+
+    async def cancel_all_then_search():
+        caller = asyncio.create_task(cache.search("volume"))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.1)
+        return await cache.search("volume")
+
+    asyncio.run(cancel_all_then_search())
+
+    assert backend.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_editing_returned_results_does_not_change_the_cache():
+    backend = StaticSearchBackend({"fractions": [{"title": "Fractions"}]}, latency=0.05)
+    cache = SearchCache(backend)
+
+    async def edit_then_search():
+        first, coalesced = await _gather_searches(cache, ["fractions", "fractions"])
+        first[0]["title"] = "edited"
+        coalesced.append({"title": "appended"})
+        hit = await cache.search("fractions")
+        hit.clear()
+        return await cache.search("fractions")
+
+    assert asyncio.run(edit_then_search()) == [{"title": "Fractions"}]
+    assert backend.results["fractions"] == [{"title": "Fractions"}]
@@ -0,0 +1,280 @@
+import ast
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import FrozenSet, Optional, Tuple
+
+from cachetools import LRUCache
+
+from .schema import Problem
+from .validation import get_validation_table
+
+DEFAULT_MAX_KEYS = 4096
+
+CORRECT = "correct"
+INCORRECT = "incorrect"
+# The checker can't tell; the model has to judge the answer itself
+UNKNOWN = "unknown"
+# Right, but for a later step than the one being asked about
+AHEAD = "ahead"
+
+_OPERATOR_SYMBOLS = str.maketrans({"×": "*", "·": "*", "∗": "*", "÷": "/", "−": "-", "–": "-", "—": "-"})
+
+_OPERATOR_WORDS = [
+    (re.compile(r"\b(?:multiplied by|times)\b"), " * "),
+    (re.compile(r"\b(?:divided by|over)\b"), " / "),
+    (re.compile(r"\b(?:plus|add)\b"), " + "),
+    (re.compile(r"\b(?:minus|take away)\b"), " - "),
+    (re.compile(r"(?<=\d)\s*x\s*(?=\d)"), " * "),
+]
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+    "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+_NUMBER_WORDS = re.compile(
+    rf"\b(?:({'|'.join(_TENS)})(?:[\s-]+({'|'.join(list(_UNITS)[1:10])}))?|({'|'.join(_UNITS)}))\b"
+)
+
+# Words that can surround a spoken answer without changing it
+_FILLER = frozenset(
+    "a about answer equals final get got gives i is it its it's makes maybe my ok okay result so "
+    "that the think um uh we well would".split()
+)
+
+_ANSWER_PREFIX = re.compile(r"^\s*(?:final answer|answer)\s*:\s*", re.IGNORECASE)
+_OPTION_SUFFIX = re.compile(r"\s*\(option ([a-z])\)\s*$", re.IGNORECASE)
+_OPTION_LETTER = re.compile(r"^(?:option|answer|choice)?\s*\(?([a-z])\)?$")
+_ARITHMETIC = re.compile(r"^[0-9.+\-*/() ]+$")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class ParsedAnswer:
+    """A student answer or an expected result, reduced to a comparable form."""
+
+    # Arithmetic without spaces, e.g. "8+12-5", or lowercase words for anything else
+    normalized: str
+    # Exact value of the arithmetic; None for text or arithmetic that doesn't evaluate
+    value: Optional[Fraction]
+
+    @property
+    def is_arithmetic(self) -> bool:
+        return self.value is not None
+
+
+@dataclass(frozen=True)
+class ExpectedStep:
+    """What a student may answer for one step, parsed from the step's UpdatedExpression."""
+
+    text: str
+    parsed: ParsedAnswer
+    # Numbers this step introduces, e.g. 12 for "8 + (3 × 4) - 5" -> "8 + 12 - 5"
+    new_values: FrozenSet[Fraction]
+
+
+@dataclass(frozen=True)
+class ExpectedOption:
+    # Position-based, so only matched when AnswerKey.letters_reliable; reasons name the option by its text
+    letter: str
+    text: str
+    parsed: ParsedAnswer
+    is_correct: bool
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """The parsed expected answers of one problem, built once per content hash."""
+
+    steps: Tuple[ExpectedStep, ...]
+    options: Tuple[ExpectedOption, ...]
+    # False when the problem's notes name the correct option by a different letter than its position
+    letters_reliable: bool
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    verdict: str
+    reason: str
+    expected: Optional[str] = None
+
+
+def parse_answer(text: str) -> ParsedAnswer:
+    """
+    Normalizes a spoken or typed answer.
+
+    Operators and numbers may be symbols or words ("three times four", "3 x 4", "3 × 4").
+    Filler around the answer is dropped, and of "6 ÷ 2 = 3" only the last side counts.
+    """
+    text = _OPTION_SUFFIX.sub("", _ANSWER_PREFIX.sub("", str(text))).lower().translate(_OPERATOR_SYMBOLS)
+    text = _NUMBER_WORDS.sub(_number_word, text)
+    for pattern, operator in _OPERATOR_WORDS:
+        text = pattern.sub(operator, text)
+    text = text.split("=")[-1] if "=" in text.strip(" =") else text
+
+    words = [w for w in re.split(r"\s+", text.replace(",", " ").strip(" .!?")) if w and w not in _FILLER]
+    candidate = " ".join(words)
+    if candidate and _ARITHMETIC.match(candidate):
+        value = _evaluate(candidate)
+        if value is not None:
+            return ParsedAnswer(candidate.replace(" ", ""), value)
+    return ParsedAnswer(_NON_WORD.sub(" ", text).strip(), None)
+
+
+def _number_word(match: re.Match) -> str:
+    tens, unit, single = match.groups()
+    if single:
+        return str(_UNITS[single])
+    return str(_TENS[tens] + (_UNITS[unit] if unit else 0))
+
+
+def _evaluate(expression: str) -> Optional[Fraction]:
+    try:
+        return _evaluate_node(ast.parse(expression, mode="eval").body)
+    except (SyntaxError, ValueError, ZeroDivisionError):
+        return None
+
+
+def _evaluate_node(node: ast.AST) -> Fraction:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return Fraction(str(node.value))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _evaluate_node(node.operand)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.BinOp):
+        left, right = _evaluate_node(node.left), _evaluate_node(node.right)
+        if isinstance(node.op, ast.Add):
+            return left + right
+        if isinstance(node.op, ast.Sub):
+            return left - right
+        if isinstance(node.op, ast.Mult):
+            return left * right
+        if isinstance(node.op, ast.Div):
+            return left / right
+    raise ValueError(f"unsupported expression: {ast.dump(node)}")
+
+
+def _numbers(parsed: ParsedAnswer) -> Counter:
+    return Counter(Fraction(n) for n in _NUMBER.findall(parsed.normalized)) if parsed.is_arithmetic else Counter()
+
+
+def build_answer_key(problem: Problem) -> AnswerKey:
+    """Parses the expected result of every step and every option of a problem."""
+    steps = []
+    previous = parse_answer(problem.question_text)
+    for step in problem.steps:
+        parsed = parse_answer(step.updated_expression)
+        new_values = frozenset(_numbers(parsed) - _numbers(previous))
+        steps.append(ExpectedStep(step.updated_expression, parsed, new_values))
+        previous = parsed
+    options = tuple(
+        ExpectedOption(chr(ord("a") + index), str(o.option), parse_answer(str(o.option)), o.is_correct)
+        for index, o in enumerate(problem.options)
+    )
+    named = _OPTION_SUFFIX.search(problem.final_expression)
+    correct_letters = {o.letter for o in options if o.is_correct}
+    letters_reliable = named is None or named.group(1).lower() in correct_letters
+    return AnswerKey(tuple(steps), options, letters_reliable)
+
+
+_answer_keys: LRUCache = LRUCache(maxsize=DEFAULT_MAX_KEYS)
+_answer_keys_lock = threading.Lock()
+
+
+def get_answer_key(problem: Problem) -> AnswerKey:
+    """Returns the problem's AnswerKey, parsed once per content hash."""
+    with _answer_keys_lock:
+        key = _answer_keys.get(problem.content_hash)
+    if key is None:
+        key = build_answer_key(problem)
+        with _answer_keys_lock:
+            _answer_keys[problem.content_hash] = key
+    return key
+
+
+def clear_answer_keys(content_hash: Optional[str] = None) -> int:
+    """
+    Drops the parsed answers of one problem content hash, or all of them.
+
+    Returns:
+        Number of entries removed
+    """
+    with _answer_keys_lock:
+        if content_hash is None:
+            removed = len(_answer_keys)
+            _answer_keys.clear()
+            return removed
+        return 1 if _answer_keys.pop(content_hash, None) is not None else 0
+
+
+def check_option(problem: Problem, answer: str) -> CheckResult:
+    """
+    Checks an answer to the problem's multiple-choice question.
+
+    The answer may name an option by letter ("C", "option c"), by its text or by its value.
+    Letters are only trusted when the problem's own notes agree on the correct one.
+    """
+    key = get_answer_key(problem)
+    options = key.options
+    correct = next((o.text for o in options if o.is_correct), None)
+    letter = _OPTION_LETTER.match(_NON_WORD.sub(" ", str(answer).lower()).strip())
+    if letter is not None and not key.letters_reliable:
+        return CheckResult(UNKNOWN, "option letters are ambiguous for this problem", correct)
+    parsed = parse_answer(answer)
+    for option in options:
+        if (
+            (letter is not None and letter.group(1) == option.letter)
+            or parsed.normalized == option.parsed.normalized
+            or (parsed.is_arithmetic and parsed.value == option.parsed.value)
+        ):
+            if option.is_correct:
+                return CheckResult(CORRECT, f"matches correct option \"{option.text}\"", correct)
+            return CheckResult(INCORRECT, f"matches option \"{option.text}\", which is wrong", correct)
+    return CheckResult(UNKNOWN, "doesn't name an option", correct)
+
+
+def check_step_answer(problem: Problem, step_number: int, answer: str) -> CheckResult:
+    """
+    Checks a student's result for one step against the step's UpdatedExpression.
+
+    The answer is correct if it is the updated expression itself or a number the step
+    produced (e.g. "12" for 3 × 4). It is AHEAD if it is that of a later step, so a
+    student who skips ahead isn't told they are wrong, and incorrect if it is other
+    arithmetic. Anything the checker can't judge safely, such as prose or an equivalent
+    but unsimplified expression, is UNKNOWN. On the last step, naming an option of the
+    question counts too.
+
+    Raises:
+        ValueError: If step_number is out of range
+    """
+    if not get_validation_table(problem).is_valid_step(step_number):
+        raise ValueError(f"Invalid step number: {step_number}. Valid range: 1-{problem.step_count}")
+
+    if step_number == problem.step_count and problem.options:
+        result = check_option(problem, answer)
+        if result.verdict != UNKNOWN:
+            return result
+
+    steps = get_answer_key(problem).steps
+    expected = steps[step_number - 1]
+    parsed = parse_answer(answer)
+    if parsed.normalized == expected.parsed.normalized:
+        return CheckResult(CORRECT, "matches the expected expression", expected.text)
+    if not (parsed.is_arithmetic and expected.parsed.is_arithmetic):
+        return CheckResult(UNKNOWN, "not arithmetic", expected.text)
+    if parsed.value in expected.new_values:
+        return CheckResult(CORRECT, "matches the value this step produces", expected.text)
+    # Every step of a problem has the same value, so a later step matches by a number it produces or its exact expression
+    number = _NUMBER.fullmatch(parsed.normalized) is not None
+    for later_number in range(step_number + 1, len(steps) + 1):
+        later = steps[later_number - 1]
+        if parsed.normalized == later.parsed.normalized or (number and parsed.value in later.new_values):
+            return CheckResult(AHEAD, f"matches the result of step {later_number}", expected.text)
+    if parsed.value == expected.parsed.value:
+        return CheckResult(UNKNOWN, "same value, but not the simplified expression", expected.text)
+    return CheckResult(INCORRECT, "doesn't match the expected expression", expected.text)
@@ -0,0 +1,391 @@
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from google.genai import types
+
+from .telemetry import meter
+
+# Milliseconds of audio per chunk sent to the model or the client
+DEFAULT_CHUNK_MS = int(os.environ.get("TUTORING_AUDIO_CHUNK_MS", "40"))
+# Milliseconds of model audio held back before playback starts, to ride out bursty delivery
+DEFAULT_PREBUFFER_MS = int(os.environ.get("TUTORING_AUDIO_PREBUFFER_MS", "120"))
+# Milliseconds of audio each frame queue can hold before the oldest audio is dropped
+DEFAULT_CAPACITY_MS = 10000
+
+audio_bytes = meter.create_counter(
+    "tutoring.audio.bytes", unit="By", description="Audio bytes sent on by the frame queues, by direction"
+)
+audio_copies = meter.create_counter(
+    "tutoring.audio.copies", unit="By",
+    description="Audio bytes copied on their way through a frame queue, by direction; at most once per chunk",
+)
+buffer_occupancy = meter.create_histogram(
+    "tutoring.audio.buffer_occupancy", unit="1", description="Fill ratio of an audio frame queue after each chunk sent"
+)
+audio_glitches = meter.create_counter(
+    "tutoring.audio.glitches", description="Jitter buffer underruns and frame queue overruns, by kind"
+)
+
+# Metric attributes, built once instead of per chunk
+UPSTREAM = {"direction": "upstream"}
+DOWNSTREAM = {"direction": "downstream"}
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    """Raw PCM layout of one direction of the stream."""
+
+    sample_rate: int
+    sample_width: int = 2
+    channels: int = 1
+
+    @property
+    def mime_type(self) -> str:
+        return f"audio/pcm;rate={self.sample_rate}"
+
+    def bytes_for_ms(self, ms: float) -> int:
+        frame = self.sample_width * self.channels
+        return int(self.sample_rate * ms / 1000) * frame
+
+    def ms_for_bytes(self, length: int) -> float:
+        return length * 1000 / (self.sample_rate * self.sample_width * self.channels)
+
+
+# What the live model expects from the microphone and what it speaks back
+INPUT_FORMAT = AudioFormat(sample_rate=16000)
+OUTPUT_FORMAT = AudioFormat(sample_rate=24000)
+
+
+class AudioFrameQueue:
+    """
+    Bounded queue of audio frames that hands them out in chunks of any size.
+
+    Frames are kept by reference, not copied in. A chunk that lies within one frame is
+    a memoryview slice of it; only a chunk spanning frames is joined, which is the one
+    copy that chunk ever gets. A view from peek() stays valid until the chunk is
+    consume()d, however many frames are written meanwhile. When more than capacity
+    bytes are queued the oldest audio is dropped; consume() then only removes what is
+    left of the peeked chunk, so an overrun while the chunk is being sent loses no
+    audio that wasn't sent.
+
+    Frames should be bytes, as the websocket and the model API deliver them; anything
+    else is copied into bytes first, since the caller might reuse its buffer.
+    """
+
+    def __init__(self, capacity: int, direction: str = ""):
+        self.capacity = capacity
+        self.direction = direction
+        self._frames: Deque[memoryview] = deque()
+        # Bytes of the oldest frame that were already consumed
+        self._offset = 0
+        self._size = 0
+        self.bytes_written = 0
+        self.bytes_copied = 0
+        self.overruns = 0
+        # Bytes overruns dropped since the last peek(), which consume() must not drop again
+        self._overrun_since_peek = 0
+        # Bumped by clear(), so a consume() for audio that was dropped meanwhile is ignored
+        self.generation = 0
+
+    @property
+    def readable(self) -> int:
+        return self._size
+
+    @property
+    def occupancy(self) -> float:
+        return self._size / self.capacity
+
+    def write(self, data: Any) -> int:
+        """
+        Queues a frame (any bytes-like object).
+
+        Returns:
+            Number of old bytes dropped because the queue was full
+        """
+        if not isinstance(data, bytes):
+            data = bytes(data)
+            self.bytes_copied += len(data)
+        frame = memoryview(data)
+        if len(frame) > self.capacity:
+            frame = frame[-self.capacity:]
+        if not frame:
+            return 0
+        self._frames.append(frame)
+        self._size += len(frame)
+        self.bytes_written += len(frame)
+        dropped = max(0, self._size - self.capacity)
+        if dropped:
+            self.overruns += 1
+            self._overrun_since_peek += dropped
+            self._drop(dropped)
+        return dropped
+
+    def peek(self, length: int) -> memoryview:
+        """Returns up to length of the oldest bytes without removing them."""
+        self._overrun_since_peek = 0
+        length = min(length, self._size)
+        if not length:
+            return memoryview(b"")
+        first = self._frames[0]
+        if len(first) - self._offset >= length:
+            return first[self._offset:self._offset + length]
+        return memoryview(self._join(length))
+
+    def consume(self, length: int) -> None:
+        """Removes the first length bytes of the last peek(), less any an overrun already dropped."""
+        length = max(0, length - self._overrun_since_peek)
+        self._overrun_since_peek = 0
+        self._drop(min(length, self._size))
+
+    def read(self, length: int) -> memoryview:
+        """Removes and returns up to length bytes, as a view into a queued frame when they lie in one."""
+        chunk = self.peek(length)
+        self.consume(len(chunk))
+        return chunk
+
+    def clear(self) -> None:
+        self._frames.clear()
+        self._offset = 0
+        self._size = 0
+        self._overrun_since_peek = 0
+        self.generation += 1
+
+    def _join(self, length: int) -> bytes:
+        parts = []
+        remaining = length
+        offset = self._offset
+        for frame in self._frames:
+            part = frame[offset:offset + remaining]
+            parts.append(part)
+            remaining -= len(part)
+            offset = 0
+            if not remaining:
+                break
+        self.bytes_copied += length
+        return b"".join(parts)
+
+    def _drop(self, length: int) -> None:
+        self._size -= length
+        while length:
+            available = len(self._frames[0]) - self._offset
+            if available > length:
+                self._offset += length
+                return
+            self._frames.popleft()
+            self._offset = 0
+            length -= available
+
+
+class _ChunkMetrics:
+    """Reports a frame queue's counters once per chunk sent, instead of once per frame queued."""
+
+    def __init__(self, frames: AudioFrameQueue, attributes: Dict[str, str]):
+        self.frames = frames
+        self.attributes = attributes
+        self.overrun_attributes = {"kind": "overrun", **attributes}
+        self._copied = 0
+        self._overruns = 0
+
+    def chunk_sent(self, length: int) -> None:
+        frames = self.frames
+        audio_bytes.add(length, self.attributes)
+        if frames.bytes_copied != self._copied:
+            audio_copies.add(frames.bytes_copied - self._copied, self.attributes)
+            self._copied = frames.bytes_copied
+        if frames.overruns != self._overruns:
+            audio_glitches.add(frames.overruns - self._overruns, self.overrun_attributes)
+            self._overruns = frames.overruns
+        buffer_occupancy.record(frames.occupancy, self.attributes)
+
+
+class UpstreamAudio:
+    """
+    Carries microphone audio from a client to the live model in fixed-size chunks.
+
+    Client frames arrive in whatever size the browser picked. Less than a chunk is held
+    back as views of the frames it came in; once a whole chunk is there it is joined
+    into the bytes object the model API requires and sent. That join is the only copy a
+    chunk gets, and a chunk that is exactly one client frame isn't copied at all.
+    """
+
+    def __init__(
+        self,
+        live_request_queue: Any,
+        audio_format: AudioFormat = INPUT_FORMAT,
+        chunk_ms: int = DEFAULT_CHUNK_MS,
+    ):
+        self.live_request_queue = live_request_queue
+        self.audio_format = audio_format
+        self.chunk_bytes = audio_format.bytes_for_ms(chunk_ms)
+        self.chunks_sent = 0
+        self.bytes_copied = 0
+        self._pending: List[memoryview] = []
+        self._pending_bytes = 0
+        self._mime_type = audio_format.mime_type
+
+    @property
+    def buffered(self) -> int:
+        return self._pending_bytes
+
+    def feed(self, data: Any) -> None:
+        """Takes one client frame and sends every complete chunk."""
+        if not isinstance(data, bytes):
+            # The caller may reuse its buffer, so it can't be held by reference
+            data = bytes(data)
+            self.bytes_copied += len(data)
+        frame = memoryview(data)
+        pending = self._pending
+        while self._pending_bytes + len(frame) >= self.chunk_bytes:
+            take = self.chunk_bytes - self._pending_bytes
+            if pending:
+                pending.append(frame[:take])
+                self._send(b"".join(pending), self.chunk_bytes)
+                pending.clear()
+            elif take == len(frame) == len(data):
+                self._send(data, 0)
+            else:
+                self._send(frame[:take].tobytes(), take)
+            self._pending_bytes = 0
+            frame = frame[take:]
+        if frame:
+            pending.append(frame)
+            self._pending_bytes += len(frame)
+
+    def flush(self) -> None:
+        """Sends whatever is held back, e.g. when the student stops talking."""
+        if self._pending:
+            self._send(b"".join(self._pending), self._pending_bytes)
+            self._pending.clear()
+            self._pending_bytes = 0
+
+    def _send(self, chunk: bytes, copied: int) -> None:
+        self.live_request_queue.send_realtime(types.Blob(mime_type=self._mime_type, data=chunk))
+        self.chunks_sent += 1
+        audio_bytes.add(len(chunk), UPSTREAM)
+        if copied:
+            self.bytes_copied += copied
+            audio_copies.add(copied, UPSTREAM)
+
+
+class DownstreamAudio:
+    """
+    Jitter buffer between the live model's speech and a client.
+
+    Model audio arrives in bursts. It is queued until prebuffer_ms is available, then
+    sent to the client in chunk_ms pieces at real-time pace, so the client can keep a
+    small playback buffer. If the queue runs dry mid-turn, that is an underrun and it
+    prebuffers again. The end of a turn drains the rest without waiting. An
+    interruption (the student barging in) drops everything queued.
+
+    send receives a view of the model's audio, or of the one copy made when a chunk
+    spans two model frames. It stays intact until send returns; send must not keep it
+    afterwards.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[memoryview], Awaitable[None]],
+        audio_format: AudioFormat = OUTPUT_FORMAT,
+        chunk_ms: int = DEFAULT_CHUNK_MS,
+        prebuffer_ms: int = DEFAULT_PREBUFFER_MS,
+        capacity_ms: int = DEFAULT_CAPACITY_MS,
+    ):
+        self.send = send
+        self.audio_format = audio_format
+        self.chunk_ms = chunk_ms
+        self.chunk_bytes = audio_format.bytes_for_ms(chunk_ms)
+        self.prebuffer_bytes = audio_format.bytes_for_ms(prebuffer_ms)
+        self.frames = AudioFrameQueue(audio_format.bytes_for_ms(capacity_ms), "downstream")
+        self.underruns = 0
+        self.bytes_sent = 0
+        self._metrics = _ChunkMetrics(self.frames, DOWNSTREAM)
+        self._data = asyncio.Event()
+        self._draining = False
+        self._closed = False
+
+    def feed(self, data: Any) -> None:
+        """Queues model audio for playback."""
+        self.frames.write(data)
+        self._data.set()
+
+    def end_turn(self) -> None:
+        """The model finished speaking; play out what is left without prebuffering."""
+        self._draining = True
+        self._data.set()
+
+    def interrupt(self) -> None:
+        """Drops queued audio, e.g. when the student starts talking over the model."""
+        self.frames.clear()
+        # Stop playback without counting the empty queue as an underrun
+        self._draining = True
+        self._data.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._data.set()
+
+    async def run(self) -> None:
+        """Paces queued audio out to the client until close() is called."""
+        loop = asyncio.get_running_loop()
+        frames = self.frames
+        while not self._closed:
+            # Wait for enough audio to start (or restart after an underrun) playback, and for any audio at all
+            while not self._closed and (frames.readable < self.prebuffer_bytes or not frames.readable) and not self._draining:
+                self._data.clear()
+                await self._data.wait()
+            next_send = loop.time()
+            while not self._closed and frames.readable:
+                generation = frames.generation
+                chunk = frames.peek(self.chunk_bytes)
+                length = len(chunk)
+                await self.send(chunk)
+                if frames.generation == generation:
+                    frames.consume(length)
+                self.bytes_sent += length
+                self._metrics.chunk_sent(length)
+                next_send += self.audio_format.ms_for_bytes(length) / 1000
+                await asyncio.sleep(max(0.0, next_send - loop.time()))
+
+            if self._draining:
+                self._draining = False
+            elif not self._closed:
+                self.underruns += 1
+                audio_glitches.add(1, {"kind": "underrun", **DOWNSTREAM})
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "underruns": self.underruns,
+            "overruns": self.frames.overruns,
+            "bytes_sent": self.bytes_sent,
+            "bytes_copied": self.frames.bytes_copied,
+            "occupancy": self.frames.occupancy,
+        }
+
+
+async def relay_model_audio(live_events: Any, downstream: DownstreamAudio, on_event: Optional[Callable] = None) -> None:
+    """
+    Feeds the audio of a live run into a DownstreamAudio and passes every other event on.
+
+    Args:
+        live_events: The async iterator from runner.run_live
+        downstream: Where the model's speech goes
+        on_event: Called with each event that isn't only audio, e.g. to forward transcripts
+    """
+    async for event in live_events:
+        if event.interrupted:
+            downstream.interrupt()
+        has_other_parts = False
+        for part in (event.content.parts if event.content and event.content.parts else ()):
+            blob = part.inline_data
+            if blob is not None and (blob.mime_type or "").startswith("audio/pcm"):
+                downstream.feed(blob.data)
+            else:
+                has_other_parts = True
+        if event.turn_complete:
+            downstream.end_turn()
+        if on_event is not None and (has_other_parts or not event.content):
+            on_event(event)
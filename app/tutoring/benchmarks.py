@@ -0,0 +1,361 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from .fake_model import ScriptedLlm, brain_stormer_script, run_scripted_session, step_tutor_script
+from .instruction_cache import InstructionCache
+from .problem_store import get_problem_store
+from .progress import ProgressStore, set_progress_store
+from .session import PROBLEM_ID_STATE_KEY
+from .synthetic import synthetic_problem
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Agent modules whose render_instruction is benchmarked
+RENDERED_AGENTS = [
+    "greeter_agent", "intro_giver_agent", "question_reader_agent",
+    "step_tutor_agent", "brain_stormer_agent", "closer_agent",
+]
+
+SYNTHETIC_STEPS = 50
+# Size of the generated problem bank the search index is timed on
+SEARCH_BANK_SIZE = 5000
+IMPORT_REPEAT = 3
+MIN_SAMPLE_SECONDS = 0.005
+
+Stats = Dict[str, float]
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> Stats:
+    """
+    Times fn like timeit: each sample runs it enough times to last a few milliseconds.
+
+    Returns:
+        Per-call statistics in milliseconds
+    """
+    number = 1
+    while True:
+        started_at = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started_at >= MIN_SAMPLE_SECONDS or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started_at) / number)
+    return _stats(samples, number)
+
+
+def _stats(samples: List[float], number: int = 1) -> Stats:
+    ordered = sorted(samples)
+    return {
+        "min_ms": ordered[0] * 1000,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "samples": len(ordered),
+        "loops": number,
+    }
+
+
+def tool_context(session_id: str, problem_id: str) -> SimpleNamespace:
+    """The parts of an ADK ToolContext the tools use, for calling them outside a runner."""
+    return SimpleNamespace(
+        state={PROBLEM_ID_STATE_KEY: problem_id},
+        _invocation_context=SimpleNamespace(session=SimpleNamespace(id=session_id)),
+    )
+
+
+def bench_imports(repeat: int) -> Dict[str, Stats]:
+    """Times a cold import of every agent package, each in a fresh interpreter."""
+    packages = sorted(
+        name for name in os.listdir(APP_DIR)
+        if name.endswith("_agent") and os.path.isfile(os.path.join(APP_DIR, name, "agent.py"))
+    )
+    results = {}
+    # Each sample pays for a whole interpreter start plus ADK's import, so take fewer of them
+    repeat = min(repeat, IMPORT_REPEAT)
+    for package in packages:
+        code = (
+            "import sys, time, warnings; warnings.simplefilter('ignore'); "
+            f"sys.path.insert(0, {APP_DIR!r}); started_at = time.perf_counter(); "
+            f"import {package}; print(time.perf_counter() - started_at)"
+        )
+        samples = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", code], check=True, capture_output=True, text=True
+            ).stdout
+            samples.append(float(output.strip().splitlines()[-1]))
+        results[f"import.{package}"] = _stats(samples)
+    return results
+
+
+def bench_render(repeat: int) -> Dict[str, Stats]:
+    """Times instruction rendering, uncached and through the instruction cache."""
+    import importlib
+
+    store = get_problem_store()
+    problem_ids = ["hard3", "hard4", f"synthetic-{SYNTHETIC_STEPS}"]
+    results = {}
+    for module_name in RENDERED_AGENTS:
+        module = importlib.import_module(f"{module_name}.agent")
+        for problem_id in problem_ids:
+            problem = store.get(problem_id)
+            results[f"render.{module_name}.{problem_id}"] = measure(
+                lambda: module.render_instruction(problem), repeat
+            )
+            cache = InstructionCache()
+            key = (module_name, problem.content_hash)
+            results[f"render_cached.{module_name}.{problem_id}"] = measure(
+                lambda: cache.get_or_render(key, lambda: module.render_instruction(problem)), repeat
+            )
+    return results
+
+
+def bench_tools(repeat: int) -> Dict[str, Stats]:
+    """Times each tool function called directly, the way the runner would call it."""
+    from brain_stormer_agent.agent import show_visual_feedback as brainstorm_feedback
+    from brain_stormer_agent.agent import update_brainstorm_notes
+    from step_tutor_agent.agent import check_answer, show_visual_feedback, update_notes
+
+    problem = get_problem_store().get(f"synthetic-{SYNTHETIC_STEPS}")
+    context = tool_context("bench-tools", problem.problem_id)
+    all_steps = [
+        {"stepNumber": n, "description": s.notes_description, "updatedExpression": s.updated_expression}
+        for n, s in enumerate(problem.steps, start=1)
+    ]
+    invalid_steps = [{"stepNumber": problem.step_count + n, "description": "x", "updatedExpression": "y"} for n in range(1, 11)]
+
+    return {
+        "tool.update_notes.1": measure(lambda: update_notes(all_steps[:1], tool_context=context), repeat),
+        f"tool.update_notes.{len(all_steps)}": measure(lambda: update_notes(all_steps, tool_context=context), repeat),
+        "tool.update_notes.invalid_10": measure(lambda: update_notes(invalid_steps, tool_context=context), repeat),
+        "tool.show_visual_feedback": measure(
+            lambda: show_visual_feedback("success", "Great!", "Positive reinforcement.", 7, 1, tool_context=context),
+            repeat,
+        ),
+        "tool.check_answer": measure(
+            lambda: check_answer(1, "the answer is twelve", 0, tool_context=context), repeat
+        ),
+        "tool.brainstorm.show_visual_feedback": measure(
+            lambda: brainstorm_feedback("discovery", "💡", "Nice idea", step_number=3, tool_context=context),
+            repeat,
+        ),
+        "tool.update_brainstorm_notes": measure(
+            lambda: update_brainstorm_notes(
+                "pattern_found", 3, student_ideas=["it adds up"], current_expression="1 + 2",
+                tool_context=context,
+            ),
+            repeat,
+        ),
+    }
+
+
+def bench_sessions(repeat: int) -> Dict[str, Stats]:
+    """Times complete scripted sessions against the local stand-in model."""
+    from brain_stormer_agent.agent import build_brain_stormer
+    from brain_stormer_agent.agent import show_visual_feedback as brainstorm_feedback
+    from brain_stormer_agent.agent import update_brainstorm_notes
+    from step_tutor_agent.agent import build_step_tutor, show_visual_feedback, update_notes
+
+    store = get_problem_store()
+
+    def step_tutor_session(problem_id: str) -> None:
+        llm = ScriptedLlm(model="scripted")
+        agent = build_step_tutor(problem_id, model=llm)
+        agent.tools.extend([update_notes, show_visual_feedback])
+        asyncio.run(run_scripted_session(agent, llm, step_tutor_script(store.get(problem_id))))
+
+    def brain_stormer_session(problem_id: str) -> None:
+        llm = ScriptedLlm(model="scripted")
+        agent = build_brain_stormer(problem_id, model=llm)
+        agent.tools.extend([update_brainstorm_notes, brainstorm_feedback])
+        asyncio.run(run_scripted_session(agent, llm, brain_stormer_script(store.get(problem_id))))
+
+    results = {
+        "session.step_tutor.hard3": _stats([_timed(lambda: step_tutor_session("hard3")) for _ in range(repeat)]),
+    }
+    results["session.brain_stormer.hard4"] = _stats(
+        [_timed(lambda: brain_stormer_session("hard4")) for _ in range(repeat)]
+    )
+    return results
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    started_at = time.perf_counter()
+    fn()
+    return time.perf_counter() - started_at
+
+
+def compare(results: Dict[str, Stats], baseline: Dict[str, Stats], threshold: float) -> List[str]:
+    """
+    Lists benchmarks whose median got slower than the baseline by more than threshold.
+
+    Args:
+        results: This run's results
+        baseline: Results of an earlier run
+        threshold: Allowed slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        One human-readable line per regression
+    """
+    regressions = []
+    for name, stats in sorted(results.items()):
+        before = baseline.get(name)
+        if not before or not before["p50_ms"]:
+            continue
+        ratio = stats["p50_ms"] / before["p50_ms"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {before['p50_ms']:.3f} ms -> {stats['p50_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def bench_search(repeat: int) -> Dict[str, Stats]:
+    """Times problem search over a generated bank, by topic words, a rare title word and a common step word."""
+    import dataclasses
+
+    from .search import ProblemIndex
+
+    base = synthetic_problem(10)
+    index = ProblemIndex(
+        dataclasses.replace(base, problem_id=f"bank-{n}", title=f"Practice set {n} on fractions{n % 100}")
+        for n in range(SEARCH_BANK_SIZE)
+    )
+    index.add(get_problem_store().get("hard3"))
+    return {
+        "search.topic": measure(lambda: index.search("order of operations"), repeat),
+        "search.rare_term": measure(lambda: index.search("fractions42 practice"), repeat),
+        "search.common_term": measure(lambda: index.search("step"), repeat),
+    }
+
+
+def bench_web_search(repeat: int) -> Dict[str, Stats]:
+    """Times the search cache against a stand-in backend: cache hits and a burst of identical queries."""
+    from .web_search import SearchCache, StaticSearchBackend
+
+    backend = StaticSearchBackend(latency=0.02)
+    cache = SearchCache(backend)
+    asyncio.run(cache.search("order of operations"))
+
+    async def burst() -> None:
+        cache.invalidate()
+        await asyncio.gather(*(cache.search("Order of operations?") for _ in range(50)))
+
+    return {
+        "web_search.hit": measure(lambda: asyncio.run(cache.search("order of operations")), repeat),
+        "web_search.burst_50": measure(lambda: asyncio.run(burst()), repeat),
+    }
+
+
+def bench_audio(repeat: int) -> Dict[str, Stats]:
+    """Times chunking a minute of microphone audio, with UpstreamAudio and by concatenating bytes."""
+    from google.genai import types
+
+    from .audio import INPUT_FORMAT, UpstreamAudio
+
+    # Browser-sized frames that don't line up with the chunk size
+    frames = [bytes(1365)] * (INPUT_FORMAT.bytes_for_ms(60000) // 1365)
+    chunk_bytes = INPUT_FORMAT.bytes_for_ms(40)
+    sink = SimpleNamespace(send_realtime=lambda blob: None)
+
+    def upstream_audio() -> None:
+        upstream = UpstreamAudio(sink)
+        for frame in frames:
+            upstream.feed(frame)
+
+    def concatenated() -> None:
+        pending = b""
+        for frame in frames:
+            pending += frame
+            while len(pending) >= chunk_bytes:
+                sink.send_realtime(types.Blob(mime_type=INPUT_FORMAT.mime_type, data=pending[:chunk_bytes]))
+                pending = pending[chunk_bytes:]
+
+    return {
+        "audio.upstream_60s.upstream_audio": measure(upstream_audio, repeat),
+        "audio.upstream_60s.concat": measure(concatenated, repeat),
+    }
+
+
+BENCHMARK_GROUPS = {
+    "imports": bench_imports,
+    "render": bench_render,
+    "tools": bench_tools,
+    "sessions": bench_sessions,
+    "search": bench_search,
+    "web_search": bench_web_search,
+    "audio": bench_audio,
+}
+
+
+def run(repeat: int = 5, groups: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Runs the selected benchmark groups and returns machine-readable results."""
+    get_problem_store().register(synthetic_problem(SYNTHETIC_STEPS))
+
+    results: Dict[str, Stats] = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        store = ProgressStore(db_path=os.path.join(scratch, "progress.sqlite3"))
+        set_progress_store(store)
+        for name in groups or list(BENCHMARK_GROUPS):
+            results.update(BENCHMARK_GROUPS[name](repeat))
+        store.close()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("groups", nargs="*", help=f"Groups to run: {', '.join(BENCHMARK_GROUPS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--output", help="Write results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed median slowdown before failing (default 0.2)")
+    args = parser.parse_args(argv)
+    unknown = set(args.groups) - set(BENCHMARK_GROUPS)
+    if unknown:
+        parser.error(f"unknown benchmark group(s): {', '.join(sorted(unknown))}")
+
+    report = run(args.repeat, args.groups or None)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(report["results"], baseline, args.threshold)
+        for line in regressions:
+            print(f"❌ Regression: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from cachetools import LRUCache
+from google.adk.models import LlmRequest
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+DEFAULT_MAX_SESSIONS = 4096
+# Distinct student ideas remembered per step
+DEFAULT_IDEAS_PER_STEP = 6
+# Student turns passed to the model verbatim; earlier turns are replaced by the summary
+DEFAULT_KEPT_TURNS = 6
+# A live connection's context is cut back to LIVE_TARGET_TOKENS once it reaches LIVE_TRIGGER_TOKENS
+LIVE_TRIGGER_TOKENS = 16384
+LIVE_TARGET_TOKENS = 8192
+
+MEMORY_HEADER = "Brainstorm so far (summarised from earlier in the session; build on it, don't repeat it):"
+
+
+@dataclass
+class StepSummary:
+    """Rolling summary of every discovery made on one step, updated in place."""
+
+    step_number: int
+    ideas_per_step: int = DEFAULT_IDEAS_PER_STEP
+    discoveries: int = 0
+    types: Counter = field(default_factory=Counter)
+    ideas: Deque[str] = field(default_factory=deque)
+    debate_elements: Dict[str, str] = field(default_factory=dict)
+    part_solved: Optional[str] = None
+    current_expression: Optional[str] = None
+    approach: Optional[str] = None
+
+    def add(self, discovery: Dict[str, Any]) -> None:
+        self.discoveries += 1
+        self.types[discovery["discovery_type"]] += 1
+        for idea in discovery.get("student_ideas") or ():
+            if idea not in self.ideas:
+                self.ideas.append(idea)
+                if len(self.ideas) > self.ideas_per_step:
+                    self.ideas.popleft()
+        # Later debate points on the same side replace earlier ones; the oldest sides drop out
+        for side, point in (discovery.get("debate_elements") or {}).items():
+            self.debate_elements.pop(side, None)
+            self.debate_elements[side] = point
+            if len(self.debate_elements) > self.ideas_per_step:
+                del self.debate_elements[next(iter(self.debate_elements))]
+        for name in ("part_solved", "current_expression", "approach"):
+            if discovery.get(name):
+                setattr(self, name, discovery[name])
+
+    def render(self) -> str:
+        kinds = ", ".join(f"{count} {kind}" for kind, count in self.types.most_common())
+        parts = [f"Step {self.step_number} ({kinds})"]
+        if self.ideas:
+            parts.append("ideas: " + "; ".join(self.ideas))
+        if self.debate_elements:
+            parts.append("debate: " + "; ".join(f"{k}: {v}" for k, v in self.debate_elements.items()))
+        if self.part_solved:
+            parts.append(f"solved: {self.part_solved}")
+        if self.current_expression:
+            parts.append(f"expression: {self.current_expression}")
+        if self.approach:
+            parts.append(f"approach: {self.approach}")
+        return " | ".join(parts)
+
+
+class DiscoveryLog:
+    """
+    What one session has discovered, as a summary per step.
+
+    Recording a discovery updates its step summary incrementally, so the log (and its
+    rendered text) stays the same size no matter how long the session runs. Step
+    numbers must already be validated against the problem (see tutoring.validation),
+    which bounds the number of summaries.
+    """
+
+    def __init__(self, ideas_per_step: int = DEFAULT_IDEAS_PER_STEP):
+        self.ideas_per_step = ideas_per_step
+        self.summaries: Dict[int, StepSummary] = {}
+        self.total = 0
+
+    def record(self, discovery: Dict[str, Any]) -> None:
+        step_number = discovery["step_number"]
+        summary = self.summaries.get(step_number)
+        if summary is None:
+            summary = self.summaries[step_number] = StepSummary(step_number, self.ideas_per_step)
+        summary.add(discovery)
+        self.total += 1
+
+    def render(self) -> str:
+        """Returns the summaries in step order, one line per step."""
+        return "\n".join(self.summaries[n].render() for n in sorted(self.summaries))
+
+
+class BrainstormMemory:
+    """Discovery logs of every active brainstorm session, bounded by an LRU over sessions."""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self._logs: LRUCache = LRUCache(maxsize=max_sessions)
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, discovery: Dict[str, Any]) -> DiscoveryLog:
+        with self._lock:
+            log = self._logs.get(session_id)
+            if log is None:
+                log = self._logs[session_id] = DiscoveryLog()
+            log.record(discovery)
+            return log
+
+    def get(self, session_id: str) -> Optional[DiscoveryLog]:
+        with self._lock:
+            return self._logs.get(session_id)
+
+    def render(self, session_id: str) -> str:
+        with self._lock:
+            log = self._logs.get(session_id)
+            return log.render() if log is not None else ""
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._logs.pop(session_id, None)
+
+
+_default_memory: Optional[BrainstormMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_brainstorm_memory() -> BrainstormMemory:
+    """Returns the process-wide BrainstormMemory fed by update_brainstorm_notes."""
+    global _default_memory
+    if _default_memory is None:
+        with _default_memory_lock:
+            if _default_memory is None:
+                _default_memory = BrainstormMemory()
+    return _default_memory
+
+
+def _is_student_turn(content: Any) -> bool:
+    # Function responses also have role "user"; only real messages start a turn
+    return content.role == "user" and any(part.text for part in content.parts or ())
+
+
+def compact_history(session_id: str, llm_request: LlmRequest, kept_turns: int = DEFAULT_KEPT_TURNS) -> bool:
+    """
+    Replaces all but the last kept_turns student turns of a request with the session's summaries.
+
+    The dropped turns' discoveries stay in the system instruction as the per-step
+    summaries. Nothing is dropped while the session has no summary to stand in for it.
+
+    Returns:
+        Whether the request was compacted
+    """
+    contents = llm_request.contents
+    starts = [i for i, content in enumerate(contents) if _is_student_turn(content)]
+    if len(starts) <= kept_turns:
+        return False
+    summary = get_brainstorm_memory().render(session_id)
+    if not summary:
+        return False
+    llm_request.contents = contents[starts[-kept_turns]:]
+    llm_request.append_instructions([f"{MEMORY_HEADER}\n{summary}"])
+    return True
+
+
+class BrainstormContext(BaseTool):
+    """
+    Keeps the brainstorm context roughly constant in size, on run_async and run_live alike.
+
+    Not a function the model can call: like ADK's PreloadMemoryTool it only edits the
+    request, which ADK does for every model call and, on run_live, once before the
+    connection opens. The request is compacted with compact_history, so a live
+    connection that reopens starts from recent turns plus summaries. An open live
+    connection keeps its own context, so it is also given a sliding window that cuts it
+    back to target_tokens whenever it reaches trigger_tokens.
+    """
+
+    def __init__(
+        self,
+        kept_turns: int = DEFAULT_KEPT_TURNS,
+        trigger_tokens: int = LIVE_TRIGGER_TOKENS,
+        target_tokens: int = LIVE_TARGET_TOKENS,
+    ):
+        super().__init__(name="brainstorm_context", description="Compacts the brainstorm history")
+        self.kept_turns = kept_turns
+        self.trigger_tokens = trigger_tokens
+        self.target_tokens = target_tokens
+
+    async def process_llm_request(self, *, tool_context: ToolContext, llm_request: LlmRequest) -> None:
+        compact_history(tool_context._invocation_context.session.id, llm_request, self.kept_turns)
+        llm_request.live_connect_config.context_window_compression = types.ContextWindowCompressionConfig(
+            trigger_tokens=self.trigger_tokens,
+            sliding_window=types.SlidingWindow(target_tokens=self.target_tokens),
+        )
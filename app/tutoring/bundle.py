@@ -0,0 +1,245 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .schema import Problem, ProblemValidationError, compile_problem
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(current_dir)), "data")
+DEFAULT_BUNDLE_PATH = os.environ.get(
+    "TUTORING_PROBLEM_BUNDLE", os.path.join(DATA_DIR, "problems.bundle")
+)
+
+# File layout: MAGIC | index length (u64) | pickled index | one pickled Problem per entry
+#              | one UTF-8 instruction per (agent, content hash) entry
+BUNDLE_MAGIC = b"TUTBNDL1"
+BUNDLE_VERSION = 2
+_HEADER = struct.Struct("<8sQ")
+
+# (cache key of the agent's instruction, e.g. "stepTutor/compact", problem content hash)
+InstructionKey = Tuple[str, str]
+
+
+def content_hash(raw: bytes) -> str:
+    """Hash of a problem file's bytes, used as the cache key for everything derived from it."""
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def compile_file(path: str) -> Problem:
+    """
+    Reads, validates and compiles one problem JSON file.
+
+    Raises:
+        ProblemValidationError: If the file isn't valid JSON or doesn't match the schema
+    """
+    problem_id = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ProblemValidationError(problem_id, [f"$: invalid JSON ({e})"]) from None
+    return compile_problem(problem_id, data, content_hash(raw))
+
+
+def compile_data_dir(data_dir: str = DATA_DIR) -> Tuple[Dict[str, Problem], Dict[str, List[str]]]:
+    """
+    Compiles every problem file in a directory.
+
+    Returns:
+        (compiled problems by id, validation errors by id)
+    """
+    problems: Dict[str, Problem] = {}
+    errors: Dict[str, List[str]] = {}
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            problem = compile_file(os.path.join(data_dir, name))
+        except ProblemValidationError as e:
+            errors[e.problem_id] = e.errors
+            continue
+        problems[problem.problem_id] = problem
+    return problems, errors
+
+
+def render_instructions(
+    problems: Dict[str, Problem],
+    renderers: Dict[str, Callable[[Problem], Optional[str]]],
+) -> Dict[InstructionKey, str]:
+    """
+    Renders every agent instruction for every problem, for storing in a bundle.
+
+    Args:
+        problems: Compiled problems by id
+        renderers: Instruction cache key -> render function; a render function may
+            return None for problems the agent doesn't apply to
+
+    Returns:
+        (instruction cache key, content hash) -> instruction
+    """
+    instructions = {}
+    for problem in problems.values():
+        for agent_key, render in renderers.items():
+            instruction = render(problem)
+            if instruction is not None:
+                instructions[(agent_key, problem.content_hash)] = instruction
+    return instructions
+
+
+def write_bundle(
+    problems: Dict[str, Problem],
+    path: str,
+    instructions: Optional[Dict[InstructionKey, str]] = None,
+) -> None:
+    """Writes compiled problems, and optionally their rendered instructions, to a bundle file, replacing it atomically."""
+    blobs = [pickle.dumps(p, protocol=pickle.HIGHEST_PROTOCOL) for p in problems.values()]
+    instruction_blobs = [text.encode("utf-8") for text in (instructions or {}).values()]
+    # Offsets are relative to the end of the index so the index can describe itself
+    index: Dict[str, Tuple[int, int, str]] = {}
+    instruction_index: Dict[InstructionKey, Tuple[int, int]] = {}
+    offset = 0
+    for (pid, problem), blob in zip(problems.items(), blobs):
+        index[pid] = (offset, len(blob), problem.content_hash)
+        offset += len(blob)
+    for key, blob in zip((instructions or {}).keys(), instruction_blobs):
+        instruction_index[key] = (offset, len(blob))
+        offset += len(blob)
+    index_blob = pickle.dumps(
+        {"version": BUNDLE_VERSION, "problems": index, "instructions": instruction_index},
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, len(index_blob)))
+        f.write(index_blob)
+        for blob in blobs + instruction_blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class ProblemBundle:
+    """
+    Read access to a compiled bundle through a read-only memory map.
+
+    Only the index is unpickled up front. The file's bytes live once in the OS page
+    cache and are shared by every worker process that opens it, but each worker still
+    decodes what it uses onto its own heap: an instruction is decoded on every call
+    (the InstructionCache keeps the string), a problem is unpickled on every load (the
+    ProblemStore LRU keeps it). What the bundle saves is compiling and rendering, not
+    per-worker memory. A bundle replaced on disk doesn't affect workers that already
+    mapped the old one.
+    """
+
+    def __init__(self, path: str = DEFAULT_BUNDLE_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            # When the bundle was built; problem files modified later may no longer match it
+            self.mtime = os.fstat(f.fileno()).st_mtime
+        self._view = memoryview(self._mmap)
+        magic, index_length = _HEADER.unpack_from(self._view)
+        if magic != BUNDLE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a problem bundle")
+        index = pickle.loads(self._view[_HEADER.size:_HEADER.size + index_length])
+        self._entries: Dict[str, Tuple[int, int, str]] = index["problems"]
+        # Bundles written before version 2 have no instructions
+        self._instructions: Dict[InstructionKey, Tuple[int, int]] = index.get("instructions", {})
+        self._data_start = _HEADER.size + index_length
+
+    def problem_ids(self) -> List[str]:
+        return sorted(self._entries)
+
+    def content_hash(self, problem_id: str) -> str:
+        return self._entries[problem_id][2]
+
+    def load(self, problem_id: str) -> Problem:
+        offset, length, _ = self._entries[problem_id]
+        start = self._data_start + offset
+        return pickle.loads(self._view[start:start + length])
+
+    def instruction(self, agent_key: str, content_hash: str) -> Optional[str]:
+        """Returns the instruction rendered at build time for an agent and problem version, if any."""
+        entry = self._instructions.get((agent_key, content_hash))
+        if entry is None:
+            return None
+        start = self._data_start + entry[0]
+        return str(self._view[start:start + entry[1]], "utf-8")
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __contains__(self, problem_id: str) -> bool:
+        return problem_id in self._entries
+
+
+def agent_instruction_renderers() -> Dict[str, Callable[[Problem], Optional[str]]]:
+    """
+    Returns the render function of every agent instruction, keyed like the instruction cache.
+
+    Imports the agent modules, so it needs the agents directory on sys.path (it is when
+    running from app/).
+    """
+    from functools import partial
+
+    from brain_stormer_agent import agent as brain_stormer
+    from closer_agent import agent as closer
+    from greeter_agent import agent as greeter
+    from intro_giver_agent import agent as intro_giver
+    from question_reader_agent import agent as question_reader
+    from step_tutor_agent import agent as step_tutor
+
+    def intro(problem: Problem) -> Optional[str]:
+        return intro_giver.render_instruction(problem) if problem.is_concept_introduction_enabled else None
+
+    return {
+        "greeter": greeter.render_instruction,
+        "introGiver": intro,
+        "questionReader": question_reader.render_instruction,
+        "stepTutor": partial(step_tutor.render_instruction, compact=False),
+        "stepTutor/compact": partial(step_tutor.render_instruction, compact=True),
+        "brainStormer": partial(brain_stormer.render_instruction, compact=False),
+        "brainStormer/compact": partial(brain_stormer.render_instruction, compact=True),
+        "closer": closer.render_instruction,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate problem files and compile them into a bundle.")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Directory with the problem JSON files")
+    parser.add_argument("--output", default=DEFAULT_BUNDLE_PATH, help="Where to write the bundle")
+    parser.add_argument("--check", action="store_true", help="Only validate, don't write a bundle")
+    parser.add_argument(
+        "--instructions", action="store_true",
+        help="Also render every agent instruction into the bundle, for workers sharing one memory-mapped copy",
+    )
+    args = parser.parse_args(argv)
+
+    problems, errors = compile_data_dir(args.data_dir)
+    for problem_id, problem_errors in errors.items():
+        for error in problem_errors:
+            print(f"❌ {problem_id}: {error}")
+    if errors:
+        print(f"❌ {len(errors)} invalid problem file(s), bundle not written")
+        return 1
+
+    if not args.check:
+        instructions = render_instructions(problems, agent_instruction_renderers()) if args.instructions else None
+        write_bundle(problems, args.output, instructions)
+        print(f"✅ Compiled {len(problems)} problems and {len(instructions or {})} instructions into {args.output}")
+    else:
+        print(f"✅ {len(problems)} problems are valid")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional
+
+DEFAULT_FRAME_WINDOW = 0.05
+DEFAULT_MAX_PENDING_BATCHES = 32
+
+
+@dataclass
+class UiEvent:
+    """
+    A UI update published by a tool, e.g. a visual feedback card or a notes update.
+
+    Events of one session that share a coalesce_key inside one frame window collapse
+    into the most recent one. Events without a key are always delivered.
+    """
+
+    kind: str
+    payload: Dict[str, Any]
+    coalesce_key: Optional[Hashable] = None
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "payload": self.payload, "created_at": self.created_at}
+
+
+class MemorySink:
+    """Collects delivered batches in memory, for tests and local runs."""
+
+    def __init__(self):
+        self.batches: List[List[UiEvent]] = []
+
+    @property
+    def events(self) -> List[UiEvent]:
+        return [event for batch in self.batches for event in batch]
+
+    async def send_batch(self, events: List[UiEvent]) -> None:
+        self.batches.append(events)
+
+
+class WebSocketSink:
+    """Sends each batch as one JSON message over a websocket (anything with send_json)."""
+
+    def __init__(self, websocket: Any):
+        self.websocket = websocket
+
+    async def send_batch(self, events: List[UiEvent]) -> None:
+        await self.websocket.send_json({"events": [event.to_dict() for event in events]})
+
+
+class _Subscription:
+    def __init__(self, sink: Any, max_pending_batches: int):
+        self.sink = sink
+        self.queue: "asyncio.Queue[List[UiEvent]]" = asyncio.Queue(maxsize=max_pending_batches)
+        self.dropped_batches = 0
+        self.failed_batches = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, batch: List[UiEvent]) -> None:
+        # A slow client loses its oldest batches instead of stalling the publisher
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped_batches += 1
+        self.queue.put_nowait(batch)
+
+    async def run(self) -> None:
+        while True:
+            batch = await self.queue.get()
+            try:
+                await self.sink.send_batch(batch)
+            except Exception:
+                # A broken client must not take the delivery loop down with it
+                self.failed_batches += 1
+            finally:
+                self.queue.task_done()
+
+
+class _SessionChannel:
+    def __init__(self):
+        self.subscriptions: List[_Subscription] = []
+        self.pending: Dict[Hashable, UiEvent] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class EventBus:
+    """
+    Delivers UI events from tools to per-session subscribers without blocking the tools.
+
+    publish() only records the event and returns. Events are coalesced over a short
+    frame window and sent to every subscriber of the session as one batch. Each
+    subscriber has a bounded queue of batches; when a client falls behind, its oldest
+    batches are dropped.
+    """
+
+    def __init__(
+        self,
+        frame_window: float = DEFAULT_FRAME_WINDOW,
+        max_pending_batches: int = DEFAULT_MAX_PENDING_BATCHES,
+    ):
+        self.frame_window = frame_window
+        self.max_pending_batches = max_pending_batches
+        self.published = 0
+        self.coalesced = 0
+        self._channels: Dict[str, _SessionChannel] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._unique_keys = itertools.count()
+
+    def subscribe(self, session_id: str, sink: Any) -> _Subscription:
+        """
+        Starts delivering a session's events to sink. Must be called from the event loop.
+
+        Args:
+            session_id: Session whose events should be delivered
+            sink: Object with an async send_batch(events) method
+
+        Returns:
+            Handle to pass to unsubscribe
+        """
+        self._loop = asyncio.get_running_loop()
+        subscription = _Subscription(sink, self.max_pending_batches)
+        subscription.task = self._loop.create_task(subscription.run())
+        self._channels.setdefault(session_id, _SessionChannel()).subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, session_id: str, subscription: _Subscription) -> None:
+        channel = self._channels.get(session_id)
+        if channel is None or subscription not in channel.subscriptions:
+            return
+        channel.subscriptions.remove(subscription)
+        if subscription.task is not None:
+            subscription.task.cancel()
+        if not channel.subscriptions:
+            if channel.flush_handle is not None:
+                channel.flush_handle.cancel()
+            del self._channels[session_id]
+
+    def publish(self, session_id: Optional[str], event: UiEvent) -> None:
+        """
+        Queues an event for a session's subscribers. Never blocks; safe from any thread.
+
+        Events for sessions with no subscribers are discarded.
+        """
+        if session_id is None or session_id not in self._channels or self._loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._enqueue(session_id, event)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, session_id, event)
+
+    async def flush(self, session_id: Optional[str] = None) -> None:
+        """Sends pending events right away and waits until subscribers have received them."""
+        session_ids = [session_id] if session_id is not None else list(self._channels)
+        for sid in session_ids:
+            self._flush_session(sid)
+            channel = self._channels.get(sid)
+            if channel is not None:
+                await asyncio.gather(*(s.queue.join() for s in channel.subscriptions))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "sessions": len(self._channels),
+            "dropped_batches": sum(
+                s.dropped_batches for c in self._channels.values() for s in c.subscriptions
+            ),
+        }
+
+    def _enqueue(self, session_id: str, event: UiEvent) -> None:
+        channel = self._channels.get(session_id)
+        if channel is None:
+            return
+        self.published += 1
+        key = event.coalesce_key if event.coalesce_key is not None else next(self._unique_keys)
+        if key in channel.pending:
+            # Keep the event's original position in the batch but its latest content
+            self.coalesced += 1
+        channel.pending[key] = event
+        if channel.flush_handle is None:
+            channel.flush_handle = self._loop.call_later(
+                self.frame_window, self._flush_session, session_id
+            )
+
+    def _flush_session(self, session_id: str) -> None:
+        channel = self._channels.get(session_id)
+        if channel is None:
+            return
+        if channel.flush_handle is not None:
+            channel.flush_handle.cancel()
+            channel.flush_handle = None
+        if not channel.pending:
+            return
+        batch = list(channel.pending.values())
+        channel.pending = {}
+        for subscription in channel.subscriptions:
+            subscription.offer(batch)
+
+
+_default_bus: Optional[EventBus] = None
+_default_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Returns the process-wide EventBus the tools publish to."""
+    global _default_bus
+    if _default_bus is None:
+        with _default_bus_lock:
+            if _default_bus is None:
+                _default_bus = EventBus()
+    return _default_bus
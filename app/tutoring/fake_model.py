@@ -0,0 +1,192 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Deque, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.plugins import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import PrivateAttr
+
+from .schema import Problem
+
+# One model response: a list of parts, each {"text": ...} or {"function_call": {"name": ..., "args": {...}}}
+ScriptedResponse = List[Dict[str, Any]]
+
+
+@dataclass
+class ScriptedTurn:
+    """What the student says, followed by every response the model gives until it yields the floor."""
+
+    # None continues the session without a message, e.g. when a recorded phase starts on its own
+    user_text: Optional[str]
+    responses: List[ScriptedResponse] = field(default_factory=list)
+    # Seconds each response takes, overriding the model's fixed latency, e.g. as recorded in production
+    latencies: List[float] = field(default_factory=list)
+    # Seconds the student pauses before this message, overriding run_scripted_session's think_time
+    think_time: Optional[float] = None
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Local stand-in for the live model that replays scripted responses, tool calls included.
+
+    Every generate_content_async call returns the next queued response, optionally
+    after a delay that simulates model latency: the response's own if one was queued
+    with it, the fixed latency otherwise. Once the queue is empty the model answers
+    with a short text so the agent's turn ends.
+    """
+
+    latency: float = 0.0
+    _queue: Deque[ScriptedResponse] = PrivateAttr(default_factory=deque)
+    _latencies: Deque[Optional[float]] = PrivateAttr(default_factory=deque)
+    _requests: int = PrivateAttr(default=0)
+
+    def queue(self, responses: List[ScriptedResponse], latencies: Optional[List[float]] = None) -> None:
+        self._queue.extend(responses)
+        latencies = latencies or []
+        self._latencies.extend(latencies[i] if i < len(latencies) else None for i in range(len(responses)))
+
+    @property
+    def requests(self) -> int:
+        return self._requests
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._requests += 1
+        latency = self._latencies.popleft() if self._latencies else None
+        latency = self.latency if latency is None else latency
+        if latency:
+            await asyncio.sleep(latency)
+        response = self._queue.popleft() if self._queue else [{"text": "Okay!"}]
+        yield LlmResponse(content=types.Content(role="model", parts=[_to_part(p) for p in response]))
+
+
+def _to_part(part: Dict[str, Any]) -> types.Part:
+    if "function_call" in part:
+        call = part["function_call"]
+        return types.Part(function_call=types.FunctionCall(name=call["name"], args=call.get("args", {})))
+    return types.Part(text=part["text"])
+
+
+def call(name: str, **args: Any) -> Dict[str, Any]:
+    """Shorthand for a scripted function call part."""
+    return {"function_call": {"name": name, "args": args}}
+
+
+def step_tutor_script(problem: Problem, wrong_every: Optional[int] = 3) -> List[ScriptedTurn]:
+    """
+    Scripts a complete stepTutor session: illustration, question, answer and feedback
+    for every question of every step, then update_notes once per step.
+
+    Args:
+        problem: The problem being tutored
+        wrong_every: Every n-th answer is wrong first and goes through the hint path;
+                     None for a student who is always right
+
+    Returns:
+        The turns of the session in order
+    """
+    turns = [ScriptedTurn("Hi, I'm ready!", [[{"text": "Let's begin."}]])]
+    answer_count = 0
+    for step_number, step in enumerate(problem.steps, start=1):
+        for question_index, q in enumerate(step.questions):
+            responses: List[ScriptedResponse] = []
+            if question_index == 0:
+                responses.append([call(
+                    "show_visual_feedback", type="illustration", content=q.before_question.content,
+                    label=q.before_question.label, step_number=step_number,
+                )])
+            responses.append([{"text": q.question}])
+            turns.append(ScriptedTurn("Can you ask me the next question?", responses))
+
+            answer_count += 1
+            if wrong_every and answer_count % wrong_every == 0:
+                turns.append(ScriptedTurn("I'm not sure... is it zero?", [
+                    [call("show_visual_feedback", type="hint", content=q.hint.content, label=q.hint.label,
+                          step_number=step_number, question_index=question_index)],
+                    [{"text": q.hint.content}],
+                ]))
+
+            responses = [
+                [call("show_visual_feedback", type="success", content=q.success.content, label=q.success.label,
+                      step_number=step_number, question_index=question_index)],
+            ]
+            if question_index == len(step.questions) - 1:
+                responses.append([call("update_notes", steps=[{
+                    "stepNumber": step_number,
+                    "description": step.notes_description,
+                    "updatedExpression": step.updated_expression,
+                }])])
+            responses.append([{"text": "That's right!"}])
+            turns.append(ScriptedTurn(f"I think it's {step.updated_expression}", responses))
+    return turns
+
+
+def brain_stormer_script(problem: Problem, exchanges_per_step: int = 3) -> List[ScriptedTurn]:
+    """
+    Scripts a complete brainStormer session with a few discovery exchanges per topic area.
+
+    Returns:
+        The turns of the session in order
+    """
+    discovery_types = ["initial_observation", "pattern_found", "breakthrough", "debate_point", "synthesis"]
+    turns = [ScriptedTurn("Hi!", [[{"text": f"Let's read the problem: {problem.question_text}"}]])]
+    for step_number, step in enumerate(problem.steps, start=1):
+        for exchange in range(exchanges_per_step):
+            discovery_type = discovery_types[exchange % len(discovery_types)]
+            turns.append(ScriptedTurn(f"Maybe it has to do with {step.topic.lower()}?", [
+                [call("update_brainstorm_notes", discovery_type=discovery_type, step_number=step_number,
+                      student_ideas=[f"idea {exchange + 1} about {step.topic}"],
+                      current_expression=step.updated_expression)],
+                [call("show_visual_feedback", type="discovery", content="💡", label=step.topic,
+                      step_number=step_number)],
+                [{"text": "Ooh, tell me more about that!"}],
+            ]))
+    return turns
+
+
+async def run_scripted_session(
+    agent: BaseAgent,
+    llm: ScriptedLlm,
+    turns: List[ScriptedTurn],
+    runner: Optional[InMemoryRunner] = None,
+    user_id: str = "student",
+    think_time: float = 0.0,
+    plugins: Optional[List[BasePlugin]] = None,
+) -> List[float]:
+    """
+    Plays a scripted session against an agent whose model is llm.
+
+    Args:
+        agent: The agent under test, built with model=llm and its tools registered
+        llm: The scripted model the agent talks to
+        turns: The session script
+        runner: Runner to reuse across sessions; a fresh in-memory runner by default
+        user_id: Id of the simulated student
+        think_time: Seconds the student pauses before each message
+        plugins: Plugins for the fresh runner, e.g. a SessionRecorder; ignored when runner is given
+
+    Returns:
+        Wall-clock seconds of each turn, from the student's message to the agent's last event
+    """
+    runner = runner or InMemoryRunner(agent=agent, app_name="tutoring", plugins=plugins)
+    session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id)
+    durations = []
+    for turn in turns:
+        pause = think_time if turn.think_time is None else turn.think_time
+        if pause:
+            await asyncio.sleep(pause)
+        llm.queue(turn.responses, turn.latencies)
+        started_at = time.perf_counter()
+        message = None
+        if turn.user_text is not None:
+            message = types.Content(role="user", parts=[types.Part(text=turn.user_text)])
+        async for _ in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            pass
+        durations.append(time.perf_counter() - started_at)
+    return durations
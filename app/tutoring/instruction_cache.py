@@ -0,0 +1,112 @@
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+from .schema import Problem
+
+DEFAULT_MAX_INSTRUCTIONS = 1024
+
+# (agent name, problem content hash)
+InstructionKey = Tuple[str, str]
+
+
+class InstructionCache:
+    """
+    Caches rendered agent instructions keyed by agent name and problem content hash.
+
+    Rendering a tutor prompt walks every step of the problem, so it only happens the
+    first time a (agent, problem content) pair is seen. Every later session for the
+    same problem reuses the cached string.
+    """
+
+    def __init__(self, max_instructions: int = DEFAULT_MAX_INSTRUCTIONS):
+        self._cache: LRUCache = LRUCache(maxsize=max_instructions)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key: InstructionKey, render: Callable[[], str]) -> str:
+        """
+        Returns the cached instruction for key, rendering and storing it on a miss.
+
+        Args:
+            key: (agent name, problem content hash)
+            render: Zero-argument callable producing the instruction text
+
+        Returns:
+            The rendered instruction
+        """
+        with self._lock:
+            instruction = self._cache.get(key)
+            if instruction is not None:
+                self.hits += 1
+                return instruction
+            self.misses += 1
+
+        # Render outside the lock so one slow problem doesn't hold up the others
+        instruction = render()
+        with self._lock:
+            self._cache[key] = instruction
+        return instruction
+
+    def invalidate(self, content_hash: Optional[str] = None) -> int:
+        """
+        Drops cached instructions for one problem content hash, or all of them.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if content_hash is None:
+                removed = len(self._cache)
+                self._cache.clear()
+                return removed
+            stale = [key for key in self._cache if key[1] == content_hash]
+            for key in stale:
+                del self._cache[key]
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+
+_default_cache: Optional[InstructionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_instruction_cache() -> InstructionCache:
+    """Returns the process-wide InstructionCache shared by every agent factory."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = InstructionCache()
+    return _default_cache
+
+
+def cached_instruction(agent_name: str, problem_id: str, render: Callable[[Problem], str]) -> str:
+    """
+    Renders (or fetches from cache) the instruction of agent_name for a problem.
+
+    An instruction rendered into the problem bundle is decoded from it instead of being
+    rendered, and cached like a rendered one, so it is decoded once per worker.
+
+    Args:
+        agent_name: Name of the agent the instruction belongs to
+        problem_id: Id of the problem in the shared ProblemStore
+        render: Callable taking the compiled problem and returning the instruction text
+
+    Returns:
+        The rendered instruction
+    """
+    from .problem_store import get_problem_store
+
+    store = get_problem_store()
+    content_hash = store.content_hash(problem_id)
+
+    def render_or_decode() -> str:
+        precomputed = store.precomputed_instruction(agent_name, content_hash)
+        return precomputed if precomputed is not None else render(store.get(problem_id))
+
+    return get_instruction_cache().get_or_render((agent_name, content_hash), render_or_decode)
@@ -0,0 +1,212 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .fake_model import ScriptedLlm, brain_stormer_script, run_scripted_session, step_tutor_script
+from .problem_store import get_problem_store
+from .progress import ProgressStore, set_progress_store
+from .recording import RecordingLog, SessionRecorder
+
+DEFAULT_SESSION_COUNTS = [1, 10, 50, 100]
+LAG_PROBE_INTERVAL = 0.01
+
+FLOWS = ["step_tutor", "brain_stormer"]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of samples given in seconds, reported in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": ordered[-1] * 1000}
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs (e.g. macOS): fall back to the peak, which ru_maxrss reports in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class ToolTimer:
+    """before/after tool callbacks that record how long every tool call takes."""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self._started: Dict[str, float] = {}
+
+    def before_tool(self, tool: Any, args: Dict[str, Any], tool_context: Any) -> None:
+        self._started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    def after_tool(self, tool: Any, args: Dict[str, Any], tool_context: Any, tool_response: Any) -> None:
+        started_at = self._started.pop(tool_context.function_call_id, None)
+        if started_at is not None:
+            self.samples.append(time.perf_counter() - started_at)
+        return None
+
+
+class LoopLagProbe:
+    """Measures how late the event loop wakes up a task that asked to sleep a fixed interval."""
+
+    def __init__(self, interval: float = LAG_PROBE_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.peak_rss = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def _run(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started_at - self.interval))
+            self.peak_rss = max(self.peak_rss, rss_bytes())
+
+
+def _build_session(flow: str, problem_id: str, model_latency: float, timer: ToolTimer):
+    store = get_problem_store()
+    llm = ScriptedLlm(model="scripted", latency=model_latency)
+    if flow == "step_tutor":
+        from step_tutor_agent import agent as module
+
+        agent = module.build_step_tutor(problem_id, model=llm)
+        agent.tools.extend([module.update_notes, module.show_visual_feedback])
+        turns = step_tutor_script(store.get(problem_id))
+    else:
+        from brain_stormer_agent import agent as module
+
+        agent = module.build_brain_stormer(problem_id, model=llm)
+        agent.tools.extend([module.update_brainstorm_notes, module.show_visual_feedback])
+        turns = brain_stormer_script(store.get(problem_id))
+    agent.before_tool_callback = timer.before_tool
+    agent.after_tool_callback = timer.after_tool
+    return agent, llm, turns
+
+
+async def run_load(
+    session_count: int,
+    flow: str,
+    problem_id: str,
+    model_latency: float,
+    think_time: float,
+    plugins: Optional[List[Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Drives session_count simulated students through one flow at the same time.
+
+    Returns:
+        Latency percentiles, event-loop lag and memory figures for this level of load
+    """
+    timer = ToolTimer()
+    probe = LoopLagProbe()
+    base_rss = rss_bytes()
+    probe.peak_rss = base_rss
+
+    sessions = [_build_session(flow, problem_id, model_latency, timer) for _ in range(session_count)]
+    probe.start()
+    started_at = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(
+            run_scripted_session(agent, llm, turns, user_id=f"student-{i}", think_time=think_time, plugins=plugins)
+            for i, (agent, llm, turns) in enumerate(sessions)
+        ),
+        return_exceptions=True,
+    )
+    wall_seconds = time.perf_counter() - started_at
+    await probe.stop()
+
+    turn_samples = [d for outcome in outcomes if isinstance(outcome, list) for d in outcome]
+    errors = [repr(outcome) for outcome in outcomes if isinstance(outcome, BaseException)]
+    return {
+        "sessions": session_count,
+        "flow": flow,
+        "problem_id": problem_id,
+        "wall_s": wall_seconds,
+        "turns": percentiles(turn_samples),
+        "tool_calls": percentiles(timer.samples),
+        "loop_lag": percentiles(probe.samples),
+        "rss_base_mb": base_rss / 2**20,
+        "rss_peak_mb": probe.peak_rss / 2**20,
+        "rss_per_session_kb": (probe.peak_rss - base_rss) / session_count / 1024,
+        "errors": errors[:5],
+        "error_count": len(errors),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Drive concurrent simulated students against a local stand-in model.")
+    parser.add_argument("--sessions", default=",".join(map(str, DEFAULT_SESSION_COUNTS)), help="Comma-separated concurrency levels")
+    parser.add_argument("--flow", choices=FLOWS + ["both"], default="both")
+    parser.add_argument("--step-tutor-problem", default="hard3")
+    parser.add_argument("--brain-stormer-problem", default="hard4")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="Simulated seconds per model response")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Simulated seconds a student takes to reply")
+    parser.add_argument("--record", metavar="LOG", help="Record every session to this log, for replay with tutoring.recording")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    session_counts = [int(n) for n in args.sessions.split(",") if n]
+    flows = FLOWS if args.flow == "both" else [args.flow]
+    problems = {"step_tutor": args.step_tutor_problem, "brain_stormer": args.brain_stormer_problem}
+
+    recorder = SessionRecorder(RecordingLog(args.record)) if args.record else None
+    report = []
+    with tempfile.TemporaryDirectory() as scratch:
+        store = ProgressStore(db_path=os.path.join(scratch, "progress.sqlite3"))
+        set_progress_store(store)
+        for flow in flows:
+            for count in session_counts:
+                result = asyncio.run(run_load(
+                    count, flow, problems[flow], args.model_latency, args.think_time,
+                    [recorder] if recorder else None,
+                ))
+                report.append(result)
+                print(
+                    f"{flow:<14} n={count:<5} turn p50/p95/p99={_fmt(result['turns'])} "
+                    f"tool p50/p95/p99={_fmt(result['tool_calls'])} lag p99={result['loop_lag'].get('p99_ms', 0):.1f}ms "
+                    f"rss/session={result['rss_per_session_kb']:.0f}KB errors={result['error_count']}",
+                    file=sys.stderr,
+                )
+        store.close()
+    if recorder:
+        recorder.log.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+
+def _fmt(stats: Dict[str, float]) -> str:
+    if not stats.get("count"):
+        return "-"
+    return f"{stats['p50_ms']:.1f}/{stats['p95_ms']:.1f}/{stats['p99_ms']:.1f}ms"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
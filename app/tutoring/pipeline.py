@@ -0,0 +1,318 @@
+import asyncio
+import contextlib
+import statistics
+import threading
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from pydantic import Field
+
+from .problem_store import get_problem_store
+from .progress import get_progress_store
+from .session import PROBLEM_HASH_STATE_KEY, PROBLEM_ID_STATE_KEY, RESUMED_PROGRESS_STATE_KEY
+from .telemetry import phase_duration, session_duration, tracer
+from .utterances import CACHEABLE_PHASES, DEFAULT_LANGUAGE, Utterance, get_utterance_cache, utterance_key
+
+# Builds the agent for one phase from a problem id, e.g. greeter_agent.agent.build_greeter
+PhaseBuilder = Callable[[str], BaseAgent]
+
+
+def task_completed() -> str:
+    """
+    Signals that the current tutoring phase is finished and the next one can take over.
+    """
+    return "Task completion signaled."
+
+
+TASK_COMPLETED_INSTRUCTION = f"""
+
+When you have finished this part of the session, call the {task_completed.__name__} function so the next phase can take over. When calling this function, do not generate any text other than the function call."""
+
+# The phase a session that already completed steps resumes at; the phases before it are skipped
+RESUME_PHASE = "stepTutor"
+
+RESUME_INSTRUCTION = """
+
+This student is coming back to a session they already started. They have completed steps {completed_steps} and the expression is now {current_expression}. Welcome them back in one sentence and continue with the first step they haven't completed; do not repeat completed steps. If every step is completed, summarize the solution."""
+
+
+class HandoffMetrics:
+    """
+    Records how long the student waits between one phase ending and the next one speaking.
+
+    Latencies are kept per (from phase, to phase) pair together with the time spent
+    preparing the next agent, which should be close to zero when pre-warming works.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._handoffs: Dict[Tuple[str, str], List[float]] = {}
+        self._prepare: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record_handoff(self, from_phase: str, to_phase: str, seconds: float) -> None:
+        with self._lock:
+            self._append(self._handoffs.setdefault((from_phase, to_phase), []), seconds)
+
+    def record_prepare(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._append(self._prepare.setdefault(phase, []), seconds)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Returns latency statistics in milliseconds.
+
+        Returns:
+            Dict with "handoffs" keyed by "from->to" and "prepare" keyed by phase name
+        """
+        with self._lock:
+            return {
+                "handoffs": {
+                    f"{source}->{target}": _stats(samples)
+                    for (source, target), samples in self._handoffs.items()
+                },
+                "prepare": {phase: _stats(samples) for phase, samples in self._prepare.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._handoffs.clear()
+            self._prepare.clear()
+
+    def _append(self, samples: List[float], seconds: float) -> None:
+        samples.append(seconds)
+        if len(samples) > self.max_samples:
+            del samples[0]
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+_default_metrics = HandoffMetrics()
+
+
+def get_handoff_metrics() -> HandoffMetrics:
+    """Returns the process-wide HandoffMetrics shared by every pipeline."""
+    return _default_metrics
+
+
+async def _discard(task: "asyncio.Task[Any]") -> None:
+    if not task.done():
+        task.cancel()
+    with contextlib.suppress(asyncio.CancelledError, Exception):
+        await task
+
+
+class TutoringPipeline(BaseAgent):
+    """
+    Runs the tutoring phases one after another over a single session.
+
+    Phase agents are built per session from their factories. While one phase is
+    talking, the agent for the next phase (including its rendered instruction) is
+    built on a worker thread, so a handoff only has to wait for the model.
+
+    Every phase is built from the problem content the session started on, so reloading
+    the problem file only affects sessions that start afterwards.
+
+    Each session is one trace: a session span with a child span per phase, under which
+    ADK's model and tool spans nest, so sampling keeps or drops a session whole.
+
+    A session that reconnects with completed steps skips straight to RESUME_PHASE, whose
+    instruction is told which steps are done. The saved progress is read from the
+    progress store alongside the first phase's prewarm and persisted to the session
+    state under RESUMED_PROGRESS_STATE_KEY through an event's state delta.
+
+    Phases in CACHEABLE_PHASES replay what an earlier session heard from them for the
+    same problem content, and skip the model entirely. The first session to run one
+    records it for the rest. Live sessions only replay utterances that have audio.
+
+    Live sessions are recorded by the recorder, if set, from the events they yield;
+    run_async sessions are recorded by a SessionRecorder plugin on the runner instead.
+    """
+
+    problem_id: str
+    phases: List[Tuple[str, Callable[[str], BaseAgent]]]
+    language: str = DEFAULT_LANGUAGE
+    handoff_metrics: Any = Field(default_factory=get_handoff_metrics)
+    # Process-wide UtteranceCache unless set; resolved on first use so importing doesn't create the database
+    utterance_cache: Any = None
+    # LiveSessionRecorder fed every live session's events; None records nothing
+    recorder: Any = None
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self._run_phases(ctx, live=False):
+            yield event
+
+    async def _run_live_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self._run_phases(ctx, live=True):
+            yield event
+
+    async def _run_phases(self, ctx: InvocationContext, live: bool) -> AsyncGenerator[Event, None]:
+        if not self.phases:
+            return
+
+        # One trace per session: phases, and the tools and model calls inside them, are its children
+        with tracer.start_as_current_span("tutoring session", attributes={
+            "tutoring.session_id": ctx.session.id,
+            "tutoring.problem_id": self.problem_id,
+            "tutoring.live": live,
+        }):
+            async for event in self._run_traced_phases(ctx, live):
+                yield event
+
+    async def _run_traced_phases(self, ctx: InvocationContext, live: bool) -> AsyncGenerator[Event, None]:
+        # Keep the version an earlier invocation of this session pinned, if any
+        state = ctx.session.state
+        content_hash = state.get(PROBLEM_HASH_STATE_KEY) if state.get(PROBLEM_ID_STATE_KEY) == self.problem_id else None
+        content_hash = content_hash or get_problem_store().content_hash(self.problem_id)
+        pending = self._prewarm(0, live, content_hash)
+        resume = asyncio.create_task(get_progress_store().preload(ctx.session.id))
+        previous_phase: Optional[str] = None
+        phase_ended_at = 0.0
+        session_started_at = time.perf_counter()
+        recorder = self.recorder if live else None
+        if recorder is not None:
+            recorder.start(ctx.session.id, self.problem_id, content_hash)
+
+        try:
+            progress = await resume
+            resumed: Optional[Dict[str, Any]] = None
+            start = 0
+            if progress.steps_completed or progress.discoveries:
+                resumed = {
+                    "completed_steps": sorted(progress.steps_completed),
+                    "current_expression": progress.current_expression,
+                }
+                yield Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    actions=EventActions(state_delta={RESUMED_PROGRESS_STATE_KEY: resumed}),
+                )
+                phase_names = [name for name, _ in self.phases]
+                if progress.steps_completed and RESUME_PHASE in phase_names:
+                    start = phase_names.index(RESUME_PHASE)
+            if start:
+                await _discard(pending)
+                pending = self._prewarm(start, live, content_hash, resumed)
+
+            for index in range(start, len(self.phases)):
+                phase_name = self.phases[index][0]
+                agent, utterance = await pending
+                # Prepare the following phase while this one is talking
+                if index + 1 < len(self.phases):
+                    pending = self._prewarm(index + 1, live, content_hash, resumed)
+
+                waiting_for_first_event = previous_phase is not None
+                phase_started_at = time.perf_counter()
+                if recorder is not None:
+                    recorder.phase(ctx.session.id, agent.name)
+                recorded: Optional[List[Event]] = [] if utterance is None and phase_name in CACHEABLE_PHASES else None
+                with tracer.start_as_current_span(f"phase {phase_name}", attributes={
+                    "tutoring.phase": phase_name,
+                    "tutoring.problem_id": self.problem_id,
+                    "tutoring.cached": utterance is not None,
+                }):
+                    if utterance is not None:
+                        run = self._replay(ctx, agent, utterance)
+                    else:
+                        run = agent.run_live(ctx) if live else agent.run_async(ctx)
+                    async for event in run:
+                        if recorded is not None and event.author == agent.name:
+                            recorded.append(event)
+                        if waiting_for_first_event:
+                            self.handoff_metrics.record_handoff(
+                                previous_phase, phase_name, time.perf_counter() - phase_ended_at
+                            )
+                            waiting_for_first_event = False
+                        if recorder is not None:
+                            recorder.observe(ctx.session.id, event)
+                        yield event
+
+                previous_phase = phase_name
+                phase_ended_at = time.perf_counter()
+                # Problem ids stay on the spans; as a metric attribute they would multiply the series
+                phase_duration.record(
+                    (phase_ended_at - phase_started_at) * 1000,
+                    {"phase": phase_name, "cached": utterance is not None},
+                )
+                if recorded:
+                    await self._record_utterance(phase_name, content_hash, recorded)
+
+                if ctx.end_invocation:
+                    break
+        finally:
+            # A phase that failed or ended the invocation leaves the next phase's prewarm behind
+            await _discard(resume)
+            await _discard(pending)
+
+        session_duration.record((time.perf_counter() - session_started_at) * 1000)
+
+    async def _replay(
+        self, ctx: InvocationContext, agent: BaseAgent, utterance: Utterance
+    ) -> AsyncGenerator[Event, None]:
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=agent.name,
+            branch=ctx.branch,
+            content=utterance.to_content(),
+            turn_complete=True,
+        )
+
+    async def _record_utterance(self, phase_name: str, content_hash: str, events: List[Event]) -> None:
+        utterance = Utterance.from_events(events, ignored_calls=(task_completed.__name__,))
+        if utterance is not None:
+            key = (phase_name, content_hash, self.language)
+            await asyncio.to_thread(self._utterances().put, key, utterance)
+
+    def _utterances(self) -> Any:
+        return self.utterance_cache or get_utterance_cache()
+
+    def _prewarm(
+        self, index: int, live: bool, content_hash: str, resumed: Optional[Dict[str, Any]] = None
+    ) -> "asyncio.Task[Tuple[BaseAgent, Optional[Utterance]]]":
+        phase_name, build = self.phases[index]
+        return asyncio.create_task(
+            asyncio.to_thread(self._prepare_phase, phase_name, build, live, content_hash, resumed)
+        )
+
+    def _prepare_phase(
+        self,
+        phase_name: str,
+        build: PhaseBuilder,
+        live: bool,
+        content_hash: str,
+        resumed: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[BaseAgent, Optional[Utterance]]:
+        started_at = time.perf_counter()
+        with get_problem_store().pinned(self.problem_id, content_hash):
+            agent = build(self.problem_id)
+            utterance = None
+            if phase_name in CACHEABLE_PHASES:
+                utterance = self._utterances().get(utterance_key(phase_name, self.problem_id, self.language))
+            # A text-only utterance would leave a voice session silent; the live phase records one with audio
+            if live and utterance is not None and utterance.audio is None:
+                utterance = None
+        resuming = phase_name == RESUME_PHASE and resumed and resumed["completed_steps"]
+        if resuming and isinstance(agent, LlmAgent) and isinstance(agent.instruction, str):
+            agent.instruction += RESUME_INSTRUCTION.format(
+                completed_steps=", ".join(map(str, resumed["completed_steps"])),
+                current_expression=resumed["current_expression"] or "unchanged",
+            )
+        # A live model never ends its turn on its own, so each phase signals when it's done
+        if live and isinstance(agent, LlmAgent) and isinstance(agent.instruction, str):
+            agent.tools.append(task_completed)
+            agent.instruction += TASK_COMPLETED_INSTRUCTION
+        self.handoff_metrics.record_prepare(phase_name, time.perf_counter() - started_at)
+        return agent, utterance
@@ -0,0 +1,244 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from .bundle import DATA_DIR, DEFAULT_BUNDLE_PATH, ProblemBundle, compile_file, content_hash
+from .schema import Problem
+
+DEFAULT_MAX_PROBLEMS = 256
+
+# Problem versions pinned by the code running in this context, e.g. a session building its next phase
+_pinned: ContextVar[Optional[Dict[str, Problem]]] = ContextVar("pinned_problems", default=None)
+
+
+class ProblemStore:
+    """
+    Loads problems lazily by id and keeps the compiled results in a size-bounded LRU.
+
+    A problem id is the file name without its extension, e.g. "hard3" for data/hard3.json.
+    Problems come from the compiled bundle when one exists (see tutoring.bundle) and are
+    otherwise validated and compiled from their JSON file on first use. A JSON file
+    edited after the bundle was built wins over its stale bundle entry. The returned
+    Problem objects are immutable and shared between every agent in the process.
+
+    reload() swaps in new content for a changed file. Earlier versions stay reachable
+    through get_version() and pinned(), so a session that started on them can finish
+    on them while new sessions get the new content.
+    """
+
+    def __init__(
+        self,
+        data_dir: str = DATA_DIR,
+        max_problems: int = DEFAULT_MAX_PROBLEMS,
+        bundle_path: Optional[str] = DEFAULT_BUNDLE_PATH,
+    ):
+        self.data_dir = data_dir
+        self._bundle = ProblemBundle(bundle_path) if bundle_path and os.path.exists(bundle_path) else None
+        self._cache: LRUCache = LRUCache(maxsize=max_problems)
+        # (problem id, content hash) -> every recently served version, for sessions pinned to an old one
+        self._versions: LRUCache = LRUCache(maxsize=max_problems)
+        # Problems whose file changed after the bundle was built; they are always loaded from the file
+        self._reloaded: set = set()
+        # Problems whose file was deleted; neither the bundle nor the cache may serve them again
+        self._removed: set = set()
+        # Problem id -> whether its bundle entry still matches the JSON file, checked once per id
+        self._bundle_fresh: Dict[str, bool] = {}
+        # Problems added at runtime have no file to reload from, so they are never evicted
+        self._registered: Dict[str, Problem] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, problem_id: str) -> str:
+        """Returns the path of the JSON file backing a problem id."""
+        if not problem_id or os.sep in problem_id or problem_id.startswith("."):
+            raise KeyError(f"Invalid problem id: {problem_id!r}")
+        return os.path.join(self.data_dir, f"{problem_id}.json")
+
+    def problem_ids(self) -> List[str]:
+        """Lists every problem id available in the bundle or the data directory."""
+        ids = set(self._bundle.problem_ids()) - self._removed if self._bundle else set()
+        ids.update(self._registered)
+        if os.path.isdir(self.data_dir):
+            ids.update(name[:-len(".json")] for name in os.listdir(self.data_dir) if name.endswith(".json"))
+        return sorted(ids)
+
+    def get(self, problem_id: str) -> Problem:
+        """
+        Returns the compiled problem, loading it on first use.
+
+        Args:
+            problem_id: Id of the problem to load
+
+        Returns:
+            The compiled problem
+
+        Raises:
+            KeyError: If no problem with that id exists
+            ProblemValidationError: If the problem file doesn't match the schema
+        """
+        pinned = _pinned.get()
+        if pinned and problem_id in pinned:
+            return pinned[problem_id]
+        with self._lock:
+            problem = self._registered.get(problem_id) or self._cache.get(problem_id)
+            if problem is None:
+                problem = self._load(problem_id)
+                self._cache[problem_id] = problem
+                self._versions[(problem_id, problem.content_hash)] = problem
+            return problem
+
+    def get_version(self, problem_id: str, content_hash: Optional[str]) -> Problem:
+        """
+        Returns the version of a problem with the given content hash.
+
+        Falls back to the current version when no hash is given or the old version
+        has been evicted.
+        """
+        if content_hash is not None:
+            with self._lock:
+                problem = self._versions.get((problem_id, content_hash))
+            if problem is not None:
+                return problem
+        return self.get(problem_id)
+
+    @contextmanager
+    def pinned(self, problem_id: str, content_hash: Optional[str]) -> Iterator[Problem]:
+        """
+        Makes get() return one version of a problem for the code run inside the block.
+
+        Used to build a session's agents from the content the session started on, even
+        if the file has been reloaded since. Context variables follow asyncio.to_thread,
+        so the pin also covers work handed to worker threads.
+        """
+        problem = self.get_version(problem_id, content_hash)
+        token = _pinned.set({**(_pinned.get() or {}), problem_id: problem})
+        try:
+            yield problem
+        finally:
+            _pinned.reset(token)
+
+    def reload(self, problem_id: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Re-reads one problem file, replacing the cached problem if its content changed.
+
+        Args:
+            problem_id: Id of the problem whose file changed
+
+        Returns:
+            (old content hash, new content hash); old is None if the problem wasn't
+            loaded, new is None if the file was removed. A removed problem stays
+            unknown, even if the bundle still has it, until its file comes back.
+
+        Raises:
+            ProblemValidationError: If the new file doesn't match the schema; the old
+                content keeps being served
+        """
+        with self._lock:
+            old = self._cache.get(problem_id)
+        try:
+            problem = compile_file(self.path_for(problem_id))
+        except FileNotFoundError:
+            with self._lock:
+                self._cache.pop(problem_id, None)
+                self._removed.add(problem_id)
+            return (old.content_hash if old else None, None)
+
+        with self._lock:
+            self._cache[problem_id] = problem
+            self._versions[(problem_id, problem.content_hash)] = problem
+            self._reloaded.add(problem_id)
+            self._removed.discard(problem_id)
+        return (old.content_hash if old else None, problem.content_hash)
+
+    def register(self, problem: Problem) -> None:
+        """Adds an already compiled problem, e.g. a generated one, without a backing file."""
+        with self._lock:
+            self._registered[problem.problem_id] = problem
+            self._cache.pop(problem.problem_id, None)
+
+    def content_hash(self, problem_id: str) -> str:
+        """Returns a stable hash of the problem file contents, usable as a cache key."""
+        pinned = _pinned.get()
+        if not (pinned and problem_id in pinned) and self._in_bundle(problem_id):
+            with self._lock:
+                loaded = problem_id in self._registered or problem_id in self._cache
+            # The bundle index knows the hash, so a bundled problem isn't unpickled just for its key
+            if not loaded:
+                return self._bundle.content_hash(problem_id)
+        return self.get(problem_id).content_hash
+
+    def precomputed_instruction(self, agent_key: str, content_hash: str) -> Optional[str]:
+        """Returns an instruction rendered into the bundle for this problem version, if there is one."""
+        return self._bundle.instruction(agent_key, content_hash) if self._bundle is not None else None
+
+    def invalidate(self, problem_id: Optional[str] = None) -> None:
+        """Drops one cached problem, or every cached problem if no id is given."""
+        with self._lock:
+            if problem_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(problem_id, None)
+
+    def __contains__(self, problem_id: str) -> bool:
+        return problem_id in self._registered or problem_id in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _in_bundle(self, problem_id: str) -> bool:
+        if (
+            self._bundle is None or problem_id not in self._bundle
+            or problem_id in self._reloaded or problem_id in self._removed
+        ):
+            return False
+        fresh = self._bundle_fresh.get(problem_id)
+        if fresh is None:
+            fresh = self._bundle_fresh[problem_id] = self._matches_bundle(problem_id)
+        return fresh
+
+    def _matches_bundle(self, problem_id: str) -> bool:
+        path = self.path_for(problem_id)
+        try:
+            # Files older than the bundle were compiled into it; only newer ones are hashed
+            if os.path.getmtime(path) <= self._bundle.mtime:
+                return True
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            # A bundle may be deployed without the JSON files it was built from
+            return True
+        if content_hash(raw) == self._bundle.content_hash(problem_id):
+            return True
+        print(
+            f"⚠️ {problem_id}: {path} changed after {self._bundle.path} was built, loading the JSON file",
+            file=sys.stderr,
+        )
+        return False
+
+    def _load(self, problem_id: str) -> Problem:
+        if problem_id in self._removed:
+            raise KeyError(f"Problem was removed: {problem_id}")
+        if self._in_bundle(problem_id):
+            return self._bundle.load(problem_id)
+        try:
+            return compile_file(self.path_for(problem_id))
+        except FileNotFoundError:
+            raise KeyError(f"Unknown problem id: {problem_id}") from None
+
+
+_default_store: Optional[ProblemStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_problem_store() -> ProblemStore:
+    """Returns the process-wide ProblemStore shared by every agent."""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ProblemStore()
+    return _default_store
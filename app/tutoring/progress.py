@@ -0,0 +1,336 @@
+import asyncio
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+# Progress lives next to the problem bank unless TUTORING_PROGRESS_DB says otherwise
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get(
+    "TUTORING_PROGRESS_DB",
+    os.path.join(os.path.dirname(os.path.dirname(current_dir)), "progress.sqlite3"),
+)
+
+DEFAULT_MAX_SESSIONS = 4096
+DEFAULT_FLUSH_INTERVAL = 0.2
+DEFAULT_MAX_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS steps (
+    session_id TEXT NOT NULL,
+    problem_id TEXT NOT NULL,
+    step_number INTEGER NOT NULL,
+    description TEXT,
+    updated_expression TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (session_id, step_number)
+);
+CREATE TABLE IF NOT EXISTS discoveries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    problem_id TEXT NOT NULL,
+    step_number INTEGER NOT NULL,
+    discovery_type TEXT NOT NULL,
+    student_ideas TEXT,
+    debate_elements TEXT,
+    part_solved TEXT,
+    current_expression TEXT,
+    approach TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS discoveries_session ON discoveries (session_id, id);
+"""
+
+
+@dataclass
+class SessionProgress:
+    """Everything recorded for one tutoring session so far."""
+
+    session_id: str
+    problem_id: Optional[str] = None
+    # step number -> {"description": ..., "updated_expression": ...}
+    steps_completed: Dict[int, Dict[str, Optional[str]]] = field(default_factory=dict)
+    discoveries: List[Dict[str, Any]] = field(default_factory=list)
+    # True while this holds only what was recorded in this process, not what was already on disk
+    partial: bool = field(default=False, repr=False)
+
+    @property
+    def current_expression(self) -> Optional[str]:
+        """Latest expression the student reached, from either tutor."""
+        if self.discoveries and self.discoveries[-1].get("current_expression"):
+            return self.discoveries[-1]["current_expression"]
+        if self.steps_completed:
+            return self.steps_completed[max(self.steps_completed)]["updated_expression"]
+        return None
+
+
+class ProgressStore:
+    """
+    Persists per-session tutoring progress to SQLite with write-behind batching.
+
+    Tool calls only update the in-memory cache and queue the write, so they never wait
+    on disk. A background thread drains the queue and writes the updates of many
+    sessions in one transaction. Reads are served from the cache; a session that is
+    not cached (e.g. one reconnecting after a restart) is loaded from the database
+    once, ideally through preload() while the connection is being set up.
+
+    Recording into a session that was never read creates a partial cache entry holding
+    only this process's updates. The first get() merges it with what is on disk: the
+    load holds off the writer, so the rows it reads and the writes still queued never
+    overlap, and it doesn't wait for other sessions' writes.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.batches_written = 0
+        self.rows_written = 0
+        self.batches_failed = 0
+        self._cache: LRUCache = LRUCache(maxsize=max_sessions)
+        self._cache_lock = threading.Lock()
+        # Discoveries per session queued but not committed yet; always the newest ones
+        self._unwritten: Dict[str, int] = {}
+        # Held by the writer while it commits and by get() while it reads a session back
+        self._write_lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[Tuple[str, tuple]]]" = queue.Queue()
+        self._closed = False
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="progress-writer", daemon=True)
+        self._writer.start()
+
+    def get(self, session_id: str) -> SessionProgress:
+        """Returns the progress of a session, loading it from disk only if it isn't cached."""
+        with self._cache_lock:
+            progress = self._cache.get(session_id)
+            if progress is not None and not progress.partial:
+                return progress
+
+        with self._write_lock:
+            stored = self._load(session_id)
+            with self._cache_lock:
+                progress = self._cache.get(session_id)
+                if progress is not None and not progress.partial:
+                    return progress
+                if progress is not None:
+                    # Steps are keyed by number, so the latest recorded ones simply win
+                    stored.steps_completed.update(progress.steps_completed)
+                    unwritten = min(self._unwritten.get(session_id, 0), len(progress.discoveries))
+                    if unwritten:
+                        stored.discoveries.extend(progress.discoveries[-unwritten:])
+                    stored.problem_id = progress.problem_id or stored.problem_id
+                self._cache[session_id] = stored
+                return stored
+
+    async def preload(self, session_id: str) -> SessionProgress:
+        """Loads a session into the cache on a worker thread, e.g. when a student reconnects."""
+        return await asyncio.to_thread(self.get, session_id)
+
+    def record_steps(self, session_id: str, problem_id: str, steps: List[Dict[str, Any]]) -> None:
+        """
+        Records completed steps for a session.
+
+        Args:
+            session_id: Session the steps belong to
+            problem_id: Problem the session is tutoring
+            steps: Validated steps, each with stepNumber, description and updatedExpression
+        """
+        now = time.time()
+        with self._cache_lock:
+            progress = self._entry(session_id, problem_id)
+            for step in steps:
+                progress.steps_completed[step['stepNumber']] = {
+                    "description": step.get('description'),
+                    "updated_expression": step.get('updatedExpression'),
+                }
+                self._queue.put(("step", (
+                    session_id, problem_id, step['stepNumber'],
+                    step.get('description'), step.get('updatedExpression'), now,
+                )))
+
+    def record_discovery(self, session_id: str, problem_id: str, discovery: Dict[str, Any]) -> None:
+        """
+        Records one brainstorm discovery for a session.
+
+        Args:
+            session_id: Session the discovery belongs to
+            problem_id: Problem the session is tutoring
+            discovery: The update_brainstorm_notes arguments (discovery_type, step_number, ...)
+        """
+        row = (
+            session_id, problem_id, discovery['step_number'], discovery['discovery_type'],
+            _dump(discovery.get('student_ideas')), _dump(discovery.get('debate_elements')),
+            discovery.get('part_solved'), discovery.get('current_expression'),
+            discovery.get('approach'), time.time(),
+        )
+        with self._cache_lock:
+            self._entry(session_id, problem_id).discoveries.append(dict(discovery))
+            self._unwritten[session_id] = self._unwritten.get(session_id, 0) + 1
+            self._queue.put(("discovery", row))
+
+    def flush(self) -> None:
+        """Blocks until every queued write has been committed."""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flushes pending writes and stops the writer thread."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _entry(self, session_id: str, problem_id: str) -> SessionProgress:
+        # Called with _cache_lock held
+        progress = self._cache.get(session_id)
+        if progress is None:
+            progress = self._cache[session_id] = SessionProgress(session_id=session_id, partial=True)
+        progress.problem_id = problem_id
+        return progress
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, session_id: str) -> SessionProgress:
+        progress = SessionProgress(session_id=session_id)
+        with self._connect() as conn:
+            for problem_id, step_number, description, updated_expression in conn.execute(
+                "SELECT problem_id, step_number, description, updated_expression FROM steps "
+                "WHERE session_id = ? ORDER BY step_number",
+                (session_id,),
+            ):
+                progress.problem_id = problem_id
+                progress.steps_completed[step_number] = {
+                    "description": description,
+                    "updated_expression": updated_expression,
+                }
+            for row in conn.execute(
+                "SELECT problem_id, step_number, discovery_type, student_ideas, debate_elements, "
+                "part_solved, current_expression, approach FROM discoveries "
+                "WHERE session_id = ? ORDER BY id",
+                (session_id,),
+            ):
+                progress.problem_id = row[0]
+                progress.discoveries.append({
+                    "step_number": row[1],
+                    "discovery_type": row[2],
+                    "student_ideas": _load(row[3]),
+                    "debate_elements": _load(row[4]),
+                    "part_solved": row[5],
+                    "current_expression": row[6],
+                    "approach": row[7],
+                })
+        return progress
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    self._queue.task_done()
+                    return
+                # Give other sessions a moment to add to the same transaction
+                time.sleep(self.flush_interval)
+                batch = [first]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        self._queue.task_done()
+                        break
+                    batch.append(item)
+                try:
+                    with self._write_lock:
+                        try:
+                            self._write_batch(conn, batch)
+                        except Exception as error:
+                            # Losing one batch is better than a dead writer that hangs flush() and close()
+                            self.batches_failed += 1
+                            print(f"❌ progress: dropped {len(batch)} writes: {error!r}", file=sys.stderr)
+                        self._mark_written(batch)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            conn.close()
+
+    def _mark_written(self, batch: List[Tuple[str, tuple]]) -> None:
+        with self._cache_lock:
+            for kind, row in batch:
+                if kind == "discovery":
+                    session_id = row[0]
+                    remaining = self._unwritten.pop(session_id, 0) - 1
+                    if remaining > 0:
+                        self._unwritten[session_id] = remaining
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Tuple[str, tuple]]) -> None:
+        step_rows = [row for kind, row in batch if kind == "step"]
+        discovery_rows = [row for kind, row in batch if kind == "discovery"]
+        with conn:
+            if step_rows:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO steps (session_id, problem_id, step_number, description, "
+                    "updated_expression, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    step_rows,
+                )
+            if discovery_rows:
+                conn.executemany(
+                    "INSERT INTO discoveries (session_id, problem_id, step_number, discovery_type, "
+                    "student_ideas, debate_elements, part_solved, current_expression, approach, "
+                    "created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    discovery_rows,
+                )
+        self.batches_written += 1
+        self.rows_written += len(batch)
+
+
+def _dump(value: Any) -> Optional[str]:
+    return None if value is None else json.dumps(value)
+
+
+def _load(value: Optional[str]) -> Any:
+    return None if value is None else json.loads(value)
+
+
+_default_store: Optional[ProgressStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_progress_store() -> ProgressStore:
+    """Returns the process-wide ProgressStore, creating the database on first use."""
+    global _default_store
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = ProgressStore()
+                atexit.register(_default_store.close)
+    return _default_store
+
+
+def set_progress_store(store: ProgressStore) -> None:
+    """Replaces the process-wide ProgressStore, e.g. with one on a scratch database."""
+    global _default_store
+    with _default_store_lock:
+        _default_store = store
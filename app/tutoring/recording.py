@@ -0,0 +1,632 @@
+import argparse
+import asyncio
+import atexit
+import importlib
+import json
+import os
+import platform
+import queue
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from cachetools import LRUCache
+from google.adk.agents import BaseAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins import BasePlugin
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from .fake_model import ScriptedLlm, ScriptedTurn, run_scripted_session
+from .session import PROBLEM_HASH_STATE_KEY, PROBLEM_ID_STATE_KEY
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG_PATH = os.environ.get(
+    "TUTORING_RECORDING_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(current_dir)), "recordings.jsonl"),
+)
+# Record every live session the tutoring pipeline runs to DEFAULT_LOG_PATH
+RECORD_SESSIONS = os.environ.get("TUTORING_RECORD_SESSIONS", "").lower() in ("1", "true", "yes")
+# Bumped when a record's fields change meaning; the replayer refuses logs it doesn't know
+FORMAT_VERSION = 1
+DEFAULT_MAX_SESSIONS = 4096
+
+# Agent name -> "module:builder" used to rebuild each recorded phase for replay
+REPLAY_BUILDERS = {
+    "greeter": "greeter_agent.agent:build_greeter",
+    "introGiver": "intro_giver_agent.agent:build_intro_giver",
+    "questionReader": "question_reader_agent.agent:build_question_reader",
+    "stepTutor": "step_tutor_agent.agent:build_step_tutor",
+    "brainStormer": "brain_stormer_agent.agent:build_brain_stormer",
+    "closer": "closer_agent.agent:build_closer",
+}
+
+Record = Dict[str, Any]
+
+
+class RecordingLog:
+    """
+    Append-only session log, one compact JSON record per line.
+
+    Records of many sessions interleave; each carries its session id ("s") and the
+    milliseconds since that session was first seen ("t"). Callers only queue records;
+    a background thread appends them, so recording never waits on disk.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOG_PATH):
+        self.path = path
+        self.records_written = 0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="recording-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, record: Record) -> None:
+        self._queue.put(json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=str))
+
+    def flush(self) -> None:
+        """Blocks until every queued record is on disk."""
+        if not self._closed:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    self._queue.task_done()
+                    return
+                lines = [line]
+                # Write whatever else is already queued in the same call
+                while True:
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        self._queue.put(None)
+                        self._queue.task_done()
+                        break
+                    lines.append(line)
+                try:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                    self.records_written += len(lines)
+                finally:
+                    for _ in lines:
+                        self._queue.task_done()
+
+
+def read_log(path: str) -> Iterator[Record]:
+    """Yields the records of a log in the order they were written, skipping a torn last line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+@dataclass
+class _SessionClock:
+    started_at: float
+    phase: Optional[str] = None
+    problem_recorded: bool = False
+    model_started: Dict[str, float] = field(default_factory=dict)
+    tools_started: Dict[str, float] = field(default_factory=dict)
+    # Arguments of live function calls, by call id, until their response arrives
+    tool_args: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class _SessionTimelines:
+    """Per-session clocks that stamp records with their session id and time since the session started."""
+
+    def __init__(self, log: Optional[RecordingLog], record_results: bool, max_sessions: int):
+        self.log = log or RecordingLog()
+        self.record_results = record_results
+        self._sessions: LRUCache = LRUCache(maxsize=max_sessions)
+        self._lock = threading.Lock()
+
+    def _clock(self, session_id: str) -> _SessionClock:
+        with self._lock:
+            clock = self._sessions.get(session_id)
+            if clock is None:
+                clock = self._sessions[session_id] = _SessionClock(time.perf_counter())
+                self.log.append({"k": "start", "s": session_id, "t": 0, "ts": time.time(), "v": FORMAT_VERSION})
+            return clock
+
+    def _append(self, session_id: str, record: Record) -> None:
+        clock = self._clock(session_id)
+        self.log.append({**record, "s": session_id, "t": _ms_since(clock.started_at)})
+
+
+class SessionRecorder(_SessionTimelines, BasePlugin):
+    """
+    Runner plugin that records each session's timeline into a RecordingLog.
+
+    Records, by kind ("k"):
+        start: the session was first seen (wall-clock "ts", format version "v")
+        problem: the problem id ("p") and content hash ("h") the session is tutoring
+        user: a student message ("text")
+        phase: a different agent ("a") started handling the session
+        model: a model response ("parts", in the ScriptedLlm format) and its latency ("ms")
+        tool: a tool call ("n"), its arguments, result ("r") and duration ("ms")
+
+    ADK only runs plugins for run_async, so this records the stand-in model sessions of
+    loadgen; live sessions are recorded by a LiveSessionRecorder in the pipeline.
+    """
+
+    def __init__(
+        self,
+        log: Optional[RecordingLog] = None,
+        record_results: bool = True,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ):
+        BasePlugin.__init__(self, name="session_recorder")
+        _SessionTimelines.__init__(self, log, record_results, max_sessions)
+
+    async def on_user_message_callback(
+        self, *, invocation_context: InvocationContext, user_message: types.Content
+    ) -> Optional[types.Content]:
+        session_id = invocation_context.session.id
+        text = "".join(part.text or "" for part in user_message.parts or ())
+        self._append(session_id, {"k": "user", "text": text})
+        return None
+
+    async def before_agent_callback(
+        self, *, agent: BaseAgent, callback_context: CallbackContext
+    ) -> Optional[types.Content]:
+        session_id = _session_id(callback_context)
+        clock = self._clock(session_id)
+        # Only agents that talk to a model are phases; a pipeline wrapping them is not
+        if hasattr(agent, "model") and clock.phase != agent.name:
+            clock.phase = agent.name
+            self._append(session_id, {"k": "phase", "a": agent.name})
+        return None
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        session_id = _session_id(callback_context)
+        clock = self._clock(session_id)
+        state = callback_context.state
+        if not clock.problem_recorded and state.get(PROBLEM_ID_STATE_KEY):
+            clock.problem_recorded = True
+            self._append(session_id, {
+                "k": "problem", "p": state.get(PROBLEM_ID_STATE_KEY), "h": state.get(PROBLEM_HASH_STATE_KEY),
+            })
+        clock.model_started[callback_context.agent_name] = time.perf_counter()
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        session_id = _session_id(callback_context)
+        started_at = self._clock(session_id).model_started.pop(callback_context.agent_name, None)
+        parts = []
+        for part in (llm_response.content.parts if llm_response.content else None) or ():
+            if part.function_call is not None:
+                parts.append({"function_call": {"name": part.function_call.name, "args": part.function_call.args or {}}})
+            elif part.text is not None and not part.thought:
+                parts.append({"text": part.text})
+        self._append(session_id, {
+            "k": "model", "a": callback_context.agent_name, "ms": _ms_since(started_at), "parts": parts,
+        })
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict]:
+        self._clock(_session_id(tool_context)).tools_started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: Dict
+    ) -> Optional[Dict]:
+        session_id = _session_id(tool_context)
+        started_at = self._clock(session_id).tools_started.pop(tool_context.function_call_id, None)
+        record = {"k": "tool", "a": tool_context.agent_name, "n": tool.name, "args": tool_args, "ms": _ms_since(started_at)}
+        if self.record_results:
+            record["r"] = result
+        self._append(session_id, record)
+        return None
+
+
+class LiveSessionRecorder(_SessionTimelines):
+    """
+    Records live sessions from the events they produce, in the same format as SessionRecorder.
+
+    run_live never calls plugin callbacks, so the TutoringPipeline reports each session's
+    start and phases and passes every event it yields through observe(). Student
+    messages come from the input transcription, model responses from complete output
+    transcriptions and function calls, and tool records pair each call with its response.
+    Audio is not recorded. Model latencies count from the student message, tool response
+    or phase start that preceded the response.
+    """
+
+    def __init__(
+        self,
+        log: Optional[RecordingLog] = None,
+        record_results: bool = True,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        ignored_calls: Tuple[str, ...] = (),
+    ):
+        """
+        Args:
+            log: Log to append to; a RecordingLog at DEFAULT_LOG_PATH by default
+            record_results: Also record what each tool returned
+            max_sessions: Sessions whose clocks are kept at once
+            ignored_calls: Function calls left out of the recording, e.g. task_completed,
+                which only live phases have and a replay couldn't call
+        """
+        super().__init__(log, record_results, max_sessions)
+        self.ignored_calls = frozenset(ignored_calls)
+
+    def start(self, session_id: str, problem_id: str, content_hash: Optional[str]) -> None:
+        clock = self._clock(session_id)
+        if not clock.problem_recorded:
+            clock.problem_recorded = True
+            self._append(session_id, {"k": "problem", "p": problem_id, "h": content_hash})
+
+    def phase(self, session_id: str, agent_name: str) -> None:
+        clock = self._clock(session_id)
+        clock.model_started[agent_name] = time.perf_counter()
+        if clock.phase != agent_name:
+            clock.phase = agent_name
+            self._append(session_id, {"k": "phase", "a": agent_name})
+
+    def observe(self, session_id: str, event: Event) -> None:
+        if event.partial or event.content is None or not event.content.parts:
+            return
+        clock = self._clock(session_id)
+        now = time.perf_counter()
+
+        if event.author == "user":
+            text = "".join(part.text or "" for part in event.content.parts if not part.thought).strip()
+            if text:
+                self._append(session_id, {"k": "user", "text": text})
+                if clock.phase is not None:
+                    clock.model_started[clock.phase] = now
+            return
+
+        responses = [r for r in event.get_function_responses() if r.name not in self.ignored_calls]
+        for response in responses:
+            record = {
+                "k": "tool", "a": event.author, "n": response.name,
+                "args": clock.tool_args.pop(response.id, {}),
+                "ms": _ms_since(clock.tools_started.pop(response.id, None)),
+            }
+            if self.record_results:
+                record["r"] = response.response
+            self._append(session_id, record)
+        if responses:
+            clock.model_started[event.author] = now
+            return
+
+        parts = []
+        for part in event.content.parts:
+            call = part.function_call
+            if call is not None:
+                if call.name in self.ignored_calls:
+                    continue
+                parts.append({"function_call": {"name": call.name, "args": call.args or {}}})
+                clock.tools_started[call.id] = now
+                clock.tool_args[call.id] = call.args or {}
+            elif part.text and not part.thought:
+                parts.append({"text": part.text})
+        if parts:
+            started_at = clock.model_started.pop(event.author, None)
+            self._append(session_id, {"k": "model", "a": event.author, "ms": _ms_since(started_at), "parts": parts})
+
+
+_default_live_recorder: Optional[LiveSessionRecorder] = None
+_default_live_recorder_lock = threading.Lock()
+
+
+def get_live_recorder() -> LiveSessionRecorder:
+    """Returns the process-wide LiveSessionRecorder, opening DEFAULT_LOG_PATH on first use."""
+    global _default_live_recorder
+    if _default_live_recorder is None:
+        with _default_live_recorder_lock:
+            if _default_live_recorder is None:
+                from .pipeline import task_completed
+
+                log = RecordingLog()
+                atexit.register(log.close)
+                _default_live_recorder = LiveSessionRecorder(log, ignored_calls=(task_completed.__name__,))
+    return _default_live_recorder
+
+
+def set_live_recorder(recorder: LiveSessionRecorder) -> None:
+    """Replaces the process-wide LiveSessionRecorder, e.g. with one writing to a scratch log."""
+    global _default_live_recorder
+    with _default_live_recorder_lock:
+        _default_live_recorder = recorder
+
+
+def _session_id(context: CallbackContext) -> str:
+    return context._invocation_context.session.id
+
+
+def _ms_since(started_at: Optional[float]) -> Optional[float]:
+    return None if started_at is None else round((time.perf_counter() - started_at) * 1000, 1)
+
+
+@dataclass
+class RecordedPhase:
+    """One agent's share of a recorded session, as a script the stand-in model can replay."""
+
+    agent: str
+    problem_id: Optional[str]
+    turns: List[ScriptedTurn] = field(default_factory=list)
+    tools: List[str] = field(default_factory=list)
+    # Tool durations as recorded, by tool name, in milliseconds
+    recorded_tool_ms: Dict[str, List[float]] = field(default_factory=dict)
+
+
+def load_sessions(path: str) -> Dict[str, List[RecordedPhase]]:
+    """
+    Turns a log into replayable scripts, one list of phases per recorded session.
+
+    Model latencies and the pauses before each student message come from the record
+    timestamps, in seconds at the original speed.
+
+    Raises:
+        ValueError: If the log was written in a format this version doesn't know
+    """
+    sessions: Dict[str, List[RecordedPhase]] = {}
+    problems: Dict[str, str] = {}
+    # Per session: the pending user text and when the previous record happened
+    pending: Dict[str, Tuple[Optional[str], float]] = {}
+    last_t: Dict[str, float] = {}
+
+    for record in read_log(path):
+        session_id, kind, t = record["s"], record["k"], record.get("t") or 0.0
+        if kind == "start":
+            if record.get("v") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported recording format {record.get('v')} in {path}")
+            sessions[session_id] = []
+        elif kind == "problem":
+            problems[session_id] = record["p"]
+        elif kind == "user":
+            pending[session_id] = (record["text"], t - last_t.get(session_id, 0.0))
+        elif kind == "model" and session_id in sessions:
+            phases = sessions[session_id]
+            if not phases or phases[-1].agent != record["a"]:
+                phases.append(RecordedPhase(record["a"], problems.get(session_id)))
+                # A phase that starts without a student message is continued with an empty one
+                if session_id not in pending:
+                    pending[session_id] = (None, 0.0)
+            phase = phases[-1]
+            if session_id in pending:
+                text, think_time = pending.pop(session_id)
+                phase.turns.append(ScriptedTurn(text, think_time=think_time / 1000))
+            phase.turns[-1].responses.append(record["parts"])
+            phase.turns[-1].latencies.append((record.get("ms") or 0.0) / 1000)
+            for part in record["parts"]:
+                name = part.get("function_call", {}).get("name")
+                if name and name not in phase.tools:
+                    phase.tools.append(name)
+        elif kind == "tool" and sessions.get(session_id):
+            phase = sessions[session_id][-1]
+            if record.get("ms") is not None:
+                phase.recorded_tool_ms.setdefault(record["n"], []).append(record["ms"])
+        last_t[session_id] = t
+    return {session_id: phases for session_id, phases in sessions.items() if phases}
+
+
+def build_replay_agent(phase: RecordedPhase, llm: ScriptedLlm) -> BaseAgent:
+    """
+    Rebuilds a recorded phase's agent on the stand-in model, with the tools it called registered.
+
+    Tools are registered as their async variants where the agent module has one, like production.
+
+    Raises:
+        ValueError: If the agent or one of its tools isn't known to this version
+    """
+    target = REPLAY_BUILDERS.get(phase.agent)
+    if target is None:
+        raise ValueError(f"Don't know how to build agent {phase.agent!r} for replay")
+    module_name, builder_name = target.split(":")
+    module = importlib.import_module(module_name)
+    builder: Callable[..., BaseAgent] = getattr(module, builder_name)
+    agent = builder(phase.problem_id, model=llm) if phase.problem_id else builder(model=llm)
+
+    registered = {getattr(tool, "__name__", getattr(tool, "name", None)) for tool in agent.tools}
+    for name in phase.tools:
+        if name in registered:
+            continue
+        tool = getattr(module, f"{name}_async", None) or getattr(module, name, None)
+        if tool is None:
+            raise ValueError(f"Agent {phase.agent!r} has no tool {name!r} to replay")
+        agent.tools.append(tool)
+    return agent
+
+
+def _scaled(turns: List[ScriptedTurn], speed: float) -> List[ScriptedTurn]:
+    # speed 0 replays as fast as possible
+    factor = 0.0 if speed <= 0 else 1 / speed
+    return [
+        ScriptedTurn(
+            turn.user_text,
+            responses=turn.responses,
+            latencies=[latency * factor for latency in turn.latencies],
+            think_time=(turn.think_time or 0.0) * factor,
+        )
+        for turn in turns
+    ]
+
+
+async def replay_session(phases: List[RecordedPhase], speed: float = 0.0) -> Dict[str, List[float]]:
+    """
+    Replays one recorded session against the stand-in model, phase by phase.
+
+    Args:
+        phases: The session, as returned by load_sessions
+        speed: 1 for the original pace, 10 for ten times faster, 0 for no waiting at all
+
+    Returns:
+        Samples in seconds: "turn" for every turn, "tool.<name>" for every tool call
+    """
+    samples: Dict[str, List[float]] = {"turn": []}
+    for phase in phases:
+        llm = ScriptedLlm(model="scripted")
+        agent = build_replay_agent(phase, llm)
+        timers: Dict[str, List[float]] = {}
+        started: Dict[str, Tuple[str, float]] = {}
+
+        def before_tool(tool: Any, args: Dict[str, Any], tool_context: Any) -> None:
+            started[tool_context.function_call_id] = (tool.name, time.perf_counter())
+
+        def after_tool(tool: Any, args: Dict[str, Any], tool_context: Any, tool_response: Any) -> None:
+            name, started_at = started.pop(tool_context.function_call_id, (tool.name, None))
+            if started_at is not None:
+                timers.setdefault(name, []).append(time.perf_counter() - started_at)
+
+        agent.before_tool_callback = before_tool
+        agent.after_tool_callback = after_tool
+        samples["turn"].extend(await run_scripted_session(agent, llm, _scaled(phase.turns, speed)))
+        for name, durations in timers.items():
+            samples.setdefault(f"tool.{name}", []).extend(durations)
+    return samples
+
+
+def replay(
+    path: str,
+    speed: float = 0.0,
+    repeat: int = 1,
+    sessions: Optional[List[str]] = None,
+    allocations: bool = False,
+) -> Dict[str, Any]:
+    """
+    Replays recorded sessions and reports their latencies in the benchmark format.
+
+    Args:
+        path: The recording log
+        speed: Replay pace, see replay_session
+        repeat: Times each session is replayed, for steadier numbers
+        sessions: Ids of the sessions to replay; all by default
+        allocations: Also trace memory allocations (slows the replay down)
+
+    Returns:
+        A report with "results" keyed like the benchmarks ("replay.<session>.turn", ...), the
+        tool durations as recorded ("recorded.<session>.tool.<name>") and, if asked for,
+        peak traced memory per session under "allocations"
+    """
+    from .benchmarks import _stats
+    from .progress import ProgressStore, set_progress_store
+
+    recorded = load_sessions(path)
+    results: Dict[str, Any] = {}
+    peaks: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        store = ProgressStore(db_path=os.path.join(scratch, "progress.sqlite3"))
+        set_progress_store(store)
+        for session_id, phases in recorded.items():
+            if sessions and session_id not in sessions:
+                continue
+            samples: Dict[str, List[float]] = {}
+            peak = 0
+            for _ in range(repeat):
+                if allocations:
+                    tracemalloc.start()
+                for name, values in asyncio.run(replay_session(phases, speed)).items():
+                    samples.setdefault(name, []).extend(values)
+                if allocations:
+                    peak = max(peak, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+            for name, values in samples.items():
+                if values:
+                    results[f"replay.{session_id}.{name}"] = _stats(values)
+            for phase in phases:
+                for name, values in phase.recorded_tool_ms.items():
+                    results[f"recorded.{session_id}.tool.{name}"] = _stats([v / 1000 for v in values])
+            if allocations:
+                peaks[session_id] = {"peak_kb": peak / 1024}
+        store.close()
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "recording": path,
+            "speed": speed,
+            "repeat": repeat,
+        },
+        "results": results,
+        "allocations": peaks,
+    }
+
+
+def compare_allocations(
+    allocations: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float
+) -> List[str]:
+    """Lists sessions whose peak traced memory grew by more than threshold over the baseline."""
+    regressions = []
+    for session_id, current in sorted(allocations.items()):
+        before = baseline.get(session_id, {}).get("peak_kb")
+        if before and current["peak_kb"] / before > 1 + threshold:
+            regressions.append(
+                f"{session_id}: peak {before:.0f} KB -> {current['peak_kb']:.0f} KB ({current['peak_kb'] / before:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .benchmarks import compare
+
+    parser = argparse.ArgumentParser(description="Replay recorded tutoring sessions against the local stand-in model.")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG_PATH, help="Recording log to replay")
+    parser.add_argument("--session", action="append", dest="sessions", help="Session id to replay (repeatable); all by default")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 replays at the recorded pace, 10 ten times faster; 0 (default) doesn't wait")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each session is replayed")
+    parser.add_argument("--allocations", action="store_true", help="Trace peak memory per session (slower)")
+    parser.add_argument("--output", help="Write results as JSON to this file instead of stdout")
+    parser.add_argument("--compare", help="Earlier replay results JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown or memory growth before failing (default 0.2)")
+    args = parser.parse_args(argv)
+
+    report = replay(args.log, args.speed, args.repeat, args.sessions, args.allocations)
+    if not report["results"]:
+        print(f"❌ No replayable sessions in {args.log}", file=sys.stderr)
+        return 1
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        replayed = {name: stats for name, stats in report["results"].items() if name.startswith("replay.")}
+        regressions = compare(replayed, baseline["results"], args.threshold)
+        regressions += compare_allocations(report["allocations"], baseline.get("allocations", {}), args.threshold)
+        for line in regressions:
+            print(f"❌ Regression: {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print("✅ No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import os
+import sys
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from .answers import clear_answer_keys
+from .instruction_cache import get_instruction_cache
+from .problem_store import ProblemStore, get_problem_store
+from .schema import ProblemValidationError
+from .search import reindex_problem
+from .steps import clear_step_cache
+from .utterances import get_utterance_cache
+from .validation import clear_validation_tables
+
+# Set TUTORING_HOT_RELOAD=1 to pick up edited problem files without restarting
+HOT_RELOAD = os.environ.get("TUTORING_HOT_RELOAD", "").lower() in ("1", "true", "yes")
+
+# Editors often save a file in several writes; changes are applied once the file has been quiet this long
+DEFAULT_DEBOUNCE = 0.2
+
+
+def reload_problems(problem_ids: Iterable[str], store: Optional[ProblemStore] = None) -> Dict[str, str]:
+    """
+    Reloads changed problem files and drops the cached artifacts built from their old content.
+
+    Only the rendered instructions, step contents, answer keys, validation tables and utterances of the old content hash
+    are invalidated, and only the changed problem is re-indexed for search; everything
+    cached for other problems stays warm. A file that fails validation is reported and
+    its old content keeps being served.
+
+    Args:
+        problem_ids: Ids of the problems whose files changed
+        store: Store to reload into; the process-wide one by default
+
+    Returns:
+        Dict of problem id -> "reloaded", "unchanged", "removed" or "invalid"
+    """
+    store = store if store is not None else get_problem_store()
+    results = {}
+    for problem_id in problem_ids:
+        try:
+            old_hash, new_hash = store.reload(problem_id)
+        except ProblemValidationError as e:
+            for error in e.errors:
+                print(f"❌ {problem_id}: {error}", file=sys.stderr)
+            results[problem_id] = "invalid"
+            continue
+
+        if old_hash == new_hash:
+            results[problem_id] = "unchanged"
+            continue
+        if old_hash is not None:
+            get_instruction_cache().invalidate(old_hash)
+            clear_step_cache(old_hash)
+            clear_answer_keys(old_hash)
+            clear_validation_tables(old_hash)
+            get_utterance_cache().invalidate(old_hash)
+        reindex_problem(problem_id, store.get(problem_id) if new_hash is not None else None)
+        results[problem_id] = "reloaded" if new_hash is not None else "removed"
+        print(f"🔄 {problem_id} {results[problem_id]}", file=sys.stderr)
+    return results
+
+
+class ProblemReloader(FileSystemEventHandler):
+    """
+    Watches the problem directory and reloads the files that change.
+
+    Events are collected per problem id and applied together after a short quiet
+    period, on the watchdog thread, so sessions never wait on a reload.
+    """
+
+    def __init__(
+        self,
+        store: Optional[ProblemStore] = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        self.store = store if store is not None else get_problem_store()
+        self.debounce = debounce
+        self._changed: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._observer: Optional[Observer] = None
+
+    def start(self) -> "ProblemReloader":
+        self._observer = Observer()
+        self._observer.schedule(self, self.store.data_dir, recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        return self
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self.flush()
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.is_directory or event.event_type not in ("created", "modified", "moved", "deleted"):
+            return
+        paths = [event.src_path]
+        if event.event_type == "moved":
+            paths.append(event.dest_path)
+        problem_ids = [
+            os.path.splitext(os.path.basename(os.fsdecode(path)))[0]
+            for path in paths
+            if os.fsdecode(path).endswith(".json")
+        ]
+        if not problem_ids:
+            return
+
+        with self._lock:
+            self._changed.update(problem_ids)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> Dict[str, str]:
+        """Applies every pending change now."""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            self._timer = None
+        return reload_problems(sorted(changed), self.store) if changed else {}
+
+
+_default_reloader: Optional[ProblemReloader] = None
+_default_reloader_lock = threading.Lock()
+
+
+def watch_problems() -> ProblemReloader:
+    """Starts watching the process-wide ProblemStore's data directory, once per process."""
+    global _default_reloader
+    if _default_reloader is None:
+        with _default_reloader_lock:
+            if _default_reloader is None:
+                _default_reloader = ProblemReloader().start()
+    return _default_reloader
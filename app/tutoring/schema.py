@@ -0,0 +1,247 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class ProblemValidationError(ValueError):
+    """Raised when a problem file does not match the problem schema."""
+
+    def __init__(self, problem_id: str, errors: List[str]):
+        self.problem_id = problem_id
+        self.errors = errors
+        super().__init__(f"Invalid problem {problem_id}: " + "; ".join(errors))
+
+
+@dataclass(frozen=True, slots=True)
+class Visual:
+    content: str
+    label: str
+    type: str
+
+
+@dataclass(frozen=True, slots=True)
+class ConceptualQuestion:
+    question: str
+    goal: Optional[str]
+    before_question: Visual
+    hint: Visual
+    success: Visual
+
+
+@dataclass(frozen=True, slots=True)
+class Step:
+    topic: str
+    description: str
+    questions: Tuple[ConceptualQuestion, ...]
+    notes_description: str
+    updated_expression: str
+    # Precomputed: the question texts, in the order they are asked
+    question_texts: Tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Option:
+    option: Union[str, int, float]
+    is_correct: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Problem:
+    """A validated, read-only problem as loaded by the agents."""
+
+    problem_id: str
+    content_hash: str
+    topic: str
+    title: str
+    is_concept_introduction_enabled: bool
+    intro_voice: str
+    intro_explanation: str
+    intro_visual: Visual
+    question_text: str
+    question_type: str
+    question_image_url: str
+    options: Tuple[Option, ...]
+    steps: Tuple[Step, ...]
+    # Precomputed fields
+    problem_text: str
+    step_count: int
+    final_expression: str
+
+
+def validate_problem(raw: Any) -> List[str]:
+    """
+    Checks raw problem JSON against the problem schema.
+
+    Returns:
+        A list of errors, each prefixed with the JSON path it refers to; empty when valid
+    """
+    errors: List[str] = []
+    if not isinstance(raw, dict):
+        return ["$: expected an object"]
+
+    _require(raw, "topic", str, "$", errors)
+    _require(raw, "title", str, "$", errors)
+    _optional(raw, "problem", str, "$", errors)
+    _optional(raw, "isConceptIntroductionEnabled", bool, "$", errors)
+
+    intro = _require(raw, "introData", dict, "$", errors)
+    if intro is not None:
+        _require(intro, "TopicExplanation", str, "$.introData", errors)
+        _require(intro, "Voice", str, "$.introData", errors)
+        _validate_visual(intro, "Visual", "$.introData", errors)
+
+    question = _require(raw, "questionData", dict, "$", errors)
+    if question is not None:
+        _require(question, "QuestionText", str, "$.questionData", errors)
+        _require(question, "Type", str, "$.questionData", errors)
+        _optional(question, "QuestionImageURL", str, "$.questionData", errors)
+        options = _require(question, "Options", list, "$.questionData", errors)
+        if options is not None:
+            for i, option in enumerate(options):
+                path = f"$.questionData.Options[{i}]"
+                if not isinstance(option, dict):
+                    errors.append(f"{path}: expected an object")
+                    continue
+                _require(option, "Option", (str, int, float), path, errors)
+                _require(option, "IsCorrect", bool, path, errors)
+            if options and not any(isinstance(o, dict) and o.get("IsCorrect") is True for o in options):
+                errors.append("$.questionData.Options: no option is marked IsCorrect")
+
+    steps = _require(raw, "steps", list, "$", errors)
+    if steps is not None and not steps:
+        errors.append("$.steps: expected at least one step")
+    for i, step in enumerate(steps or []):
+        path = f"$.steps[{i}]"
+        if not isinstance(step, dict):
+            errors.append(f"{path}: expected an object")
+            continue
+        _require(step, "Topic", str, path, errors)
+        _require(step, "Description", str, path, errors)
+        notes = _require(step, "Notes", dict, path, errors)
+        if notes is not None:
+            _require(notes, "Description", str, f"{path}.Notes", errors)
+            _require(notes, "UpdatedExpression", str, f"{path}.Notes", errors)
+        questions = _require(step, "ConceptualQuestions", list, path, errors)
+        if questions is not None and not questions:
+            errors.append(f"{path}.ConceptualQuestions: expected at least one question")
+        for j, q in enumerate(questions or []):
+            q_path = f"{path}.ConceptualQuestions[{j}]"
+            if not isinstance(q, dict):
+                errors.append(f"{q_path}: expected an object")
+                continue
+            _require(q, "Question", str, q_path, errors)
+            _optional(q, "Goal", str, q_path, errors)
+            illustration = _require(q, "Illustration", dict, q_path, errors)
+            if illustration is None:
+                continue
+            _validate_visual(illustration, "BeforeQuestion", f"{q_path}.Illustration", errors)
+            feedback = _require(illustration, "Feedback", dict, f"{q_path}.Illustration", errors)
+            if feedback is not None:
+                _validate_visual(feedback, "Hint", f"{q_path}.Illustration.Feedback", errors)
+                _validate_visual(feedback, "Success", f"{q_path}.Illustration.Feedback", errors)
+    return errors
+
+
+def compile_problem(problem_id: str, raw: Any, content_hash: str) -> Problem:
+    """
+    Validates raw problem JSON and compiles it into a Problem.
+
+    Args:
+        problem_id: Id of the problem, i.e. its file name without extension
+        raw: The parsed problem JSON
+        content_hash: Hash of the problem file contents
+
+    Returns:
+        The compiled problem
+
+    Raises:
+        ProblemValidationError: If the JSON doesn't match the schema
+    """
+    errors = validate_problem(raw)
+    if errors:
+        raise ProblemValidationError(problem_id, errors)
+
+    intro = raw['introData']
+    question = raw['questionData']
+    steps = tuple(_compile_step(step) for step in raw['steps'])
+    return Problem(
+        problem_id=problem_id,
+        content_hash=content_hash,
+        topic=_intern(raw['topic']),
+        title=raw['title'],
+        is_concept_introduction_enabled=raw.get('isConceptIntroductionEnabled', True),
+        intro_voice=intro['Voice'],
+        intro_explanation=intro['TopicExplanation'],
+        intro_visual=_compile_visual(intro['Visual']),
+        question_text=question['QuestionText'],
+        question_type=_intern(question['Type']),
+        question_image_url=question.get('QuestionImageURL', ""),
+        options=tuple(Option(option=o['Option'], is_correct=o['IsCorrect']) for o in question['Options']),
+        steps=steps,
+        problem_text=raw.get('problem', question['QuestionText']),
+        step_count=len(steps),
+        final_expression=steps[-1].updated_expression,
+    )
+
+
+def _compile_step(step: Dict[str, Any]) -> Step:
+    questions = tuple(
+        ConceptualQuestion(
+            question=q['Question'],
+            goal=q.get('Goal'),
+            before_question=_compile_visual(q['Illustration']['BeforeQuestion']),
+            hint=_compile_visual(q['Illustration']['Feedback']['Hint']),
+            success=_compile_visual(q['Illustration']['Feedback']['Success']),
+        )
+        for q in step['ConceptualQuestions']
+    )
+    return Step(
+        topic=step['Topic'],
+        description=step['Description'],
+        questions=questions,
+        notes_description=step['Notes']['Description'],
+        updated_expression=step['Notes']['UpdatedExpression'],
+        question_texts=tuple(q.question for q in questions),
+    )
+
+
+def _compile_visual(visual: Dict[str, Any]) -> Visual:
+    # Labels and types repeat across thousands of questions, so share one copy of each
+    return Visual(content=visual['Content'], label=_intern(visual['Label']), type=_intern(visual['Type']))
+
+
+def _intern(value: str) -> str:
+    return sys.intern(value) if len(value) <= 64 else value
+
+
+def _require(obj: Dict[str, Any], key: str, types: Any, path: str, errors: List[str]) -> Any:
+    if key not in obj:
+        errors.append(f"{path}.{key}: missing required field")
+        return None
+    return _check_type(obj[key], key, types, path, errors)
+
+
+def _optional(obj: Dict[str, Any], key: str, types: Any, path: str, errors: List[str]) -> Any:
+    if key not in obj:
+        return None
+    return _check_type(obj[key], key, types, path, errors)
+
+
+def _check_type(value: Any, key: str, types: Any, path: str, errors: List[str]) -> Any:
+    # bool is an int subclass, so it must never satisfy a numeric field
+    if not isinstance(value, types) or (isinstance(value, bool) and bool not in _as_tuple(types)):
+        expected = " or ".join(t.__name__ for t in _as_tuple(types))
+        errors.append(f"{path}.{key}: expected {expected}, got {type(value).__name__}")
+        return None
+    return value
+
+
+def _as_tuple(types: Any) -> Tuple[type, ...]:
+    return types if isinstance(types, tuple) else (types,)
+
+
+def _validate_visual(obj: Dict[str, Any], key: str, path: str, errors: List[str]) -> None:
+    visual = _require(obj, key, dict, path, errors)
+    if visual is not None:
+        for field_name in ("Content", "Label", "Type"):
+            _require(visual, field_name, str, f"{path}.{key}", errors)
@@ -0,0 +1,234 @@
+import heapq
+import math
+import re
+import sys
+import threading
+from collections import Counter
+from itertools import islice
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .problem_store import ProblemStore, get_problem_store
+from .schema import Problem, ProblemValidationError
+
+# How much a match in each part of a problem counts towards its score
+FIELD_WEIGHTS = {
+    "topic": 3.0,
+    "title": 3.0,
+    "step_topic": 2.0,
+    "question": 1.0,
+    "explanation": 1.0,
+}
+
+# Terms in more than this share of problems only re-rank matches found through rarer terms
+COMMON_TERM_RATIO = 0.5
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to what which with".split()
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into lowercase alphanumeric terms, dropping stopwords."""
+    return [term for term in _TOKEN.findall(text.lower()) if term not in STOPWORDS]
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """One matching problem, best first."""
+
+    problem_id: str
+    score: float
+    topic: str
+    title: str
+
+
+class ProblemIndex:
+    """
+    In-process inverted index over the problem bank.
+
+    Each term maps to the problems containing it and a weight that favours matches in
+    the topic and title over the question text. Queries only touch the postings of
+    their own terms, and terms shared by most problems only re-rank the candidates of
+    rarer ones. A query of one common term walks its postings in weight order, kept per
+    term until the term's postings change. Either way a lookup stays well under a
+    millisecond as the bank grows; only queries made of several common terms score
+    every problem they match. Problems can be added, replaced and removed one at a time.
+    """
+
+    def __init__(self, problems: Iterable[Problem] = ()):
+        # term -> problem id -> weight
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # problem id -> terms it was indexed under, so it can be removed again
+        self._terms: Dict[str, Set[str]] = {}
+        self._topics: Dict[str, Set[str]] = {}
+        self._info: Dict[str, SearchResult] = {}
+        # term -> its postings sorted by weight, built on demand for queries of common terms only
+        self._ranked: Dict[str, List[Tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+        for problem in problems:
+            self.add(problem)
+
+    def add(self, problem: Problem) -> None:
+        """Indexes a problem, replacing any earlier version with the same id."""
+        weights: Counter = Counter()
+        fields = {
+            "topic": [problem.topic],
+            "title": [problem.title],
+            "step_topic": [step.topic for step in problem.steps],
+            "question": [problem.question_text],
+            "explanation": [problem.intro_explanation],
+        }
+        for field, texts in fields.items():
+            for text in texts:
+                for term in tokenize(text):
+                    weights[term] += FIELD_WEIGHTS[field]
+
+        with self._lock:
+            self._remove(problem.problem_id)
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[problem.problem_id] = weight
+                self._ranked.pop(term, None)
+            self._terms[problem.problem_id] = set(weights)
+            self._topics.setdefault(problem.topic.lower(), set()).add(problem.problem_id)
+            self._info[problem.problem_id] = SearchResult(problem.problem_id, 0.0, problem.topic, problem.title)
+
+    def remove(self, problem_id: str) -> None:
+        with self._lock:
+            self._remove(problem_id)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        topic: Optional[str] = None,
+        exclude: Iterable[str] = (),
+    ) -> List[SearchResult]:
+        """
+        Finds the problems that best match a free-text query.
+
+        Args:
+            query: Words to look for in topics, titles, step topics and question texts
+            limit: Maximum number of results
+            topic: Only return problems with exactly this topic (case-insensitive)
+            exclude: Problem ids to leave out, e.g. the ones the student has already done
+
+        Returns:
+            Matching problems, highest score first
+        """
+        excluded = set(exclude)
+        scores: Dict[str, float] = {}
+        with self._lock:
+            allowed = self._topics.get(topic.lower(), set()) if topic is not None else None
+            total = len(self._terms)
+            terms = sorted((term for term in set(tokenize(query)) if term in self._postings),
+                           key=lambda term: len(self._postings[term]))
+            if len(terms) == 1 and len(self._postings[terms[0]]) > total * COMMON_TERM_RATIO:
+                candidates = (
+                    (problem_id, weight * math.log(1 + total / len(self._postings[terms[0]])))
+                    for weight, problem_id in self._ranked_postings(terms[0])
+                    if problem_id not in excluded and (allowed is None or problem_id in allowed)
+                )
+                return [self._result(problem_id, score) for problem_id, score in islice(candidates, limit)]
+
+            # Rarest terms first, so common ones find candidates to re-rank
+            for postings in (self._postings[term] for term in terms):
+                # Rare terms say more about a problem than ones every problem shares
+                idf = math.log(1 + total / len(postings))
+                if scores and len(postings) > total * COMMON_TERM_RATIO:
+                    for problem_id in scores:
+                        scores[problem_id] += postings.get(problem_id, 0.0) * idf
+                    continue
+                for problem_id, weight in postings.items():
+                    if problem_id in excluded or (allowed is not None and problem_id not in allowed):
+                        continue
+                    scores[problem_id] = scores.get(problem_id, 0.0) + weight * idf
+
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [self._result(problem_id, score) for problem_id, score in ranked]
+
+    def related(self, problem: Problem, limit: int = 5, exclude: Iterable[str] = ()) -> List[SearchResult]:
+        """Finds other problems on the same topic and steps, e.g. to pick what to practise next."""
+        query = " ".join([problem.topic, problem.title, *(step.topic for step in problem.steps)])
+        return self.search(query, limit=limit, exclude={problem.problem_id, *exclude})
+
+    def __contains__(self, problem_id: str) -> bool:
+        return problem_id in self._terms
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def _ranked_postings(self, term: str) -> List[Tuple[float, str]]:
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = sorted(((weight, problem_id) for problem_id, weight in self._postings[term].items()),
+                            key=lambda entry: (-entry[0], entry[1]))
+            self._ranked[term] = ranked
+        return ranked
+
+    def _result(self, problem_id: str, score: float) -> SearchResult:
+        info = self._info[problem_id]
+        return SearchResult(problem_id, score, info.topic, info.title)
+
+    def _remove(self, problem_id: str) -> None:
+        for term in self._terms.pop(problem_id, ()):
+            postings = self._postings[term]
+            del postings[problem_id]
+            self._ranked.pop(term, None)
+            if not postings:
+                del self._postings[term]
+        info = self._info.pop(problem_id, None)
+        if info is not None:
+            self._topics[info.topic.lower()].discard(problem_id)
+
+
+def build_index(store: Optional[ProblemStore] = None) -> ProblemIndex:
+    """
+    Indexes every problem in a store (the process-wide one by default).
+
+    A problem whose file doesn't match the schema is reported and left out, so one bad
+    file doesn't stop the search for every other problem.
+    """
+    store = store if store is not None else get_problem_store()
+    return ProblemIndex(_valid_problems(store))
+
+
+def _valid_problems(store: ProblemStore) -> Iterable[Problem]:
+    for problem_id in store.problem_ids():
+        try:
+            yield store.get(problem_id)
+        except ProblemValidationError as e:
+            for error in e.errors:
+                print(f"❌ {problem_id}: {error}, not indexed", file=sys.stderr)
+
+
+_default_index: Optional[ProblemIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_problem_index() -> ProblemIndex:
+    """Returns the process-wide ProblemIndex, indexing the problem bank on first use."""
+    global _default_index
+    if _default_index is None:
+        with _default_index_lock:
+            if _default_index is None:
+                _default_index = build_index()
+    return _default_index
+
+
+def reindex_problem(problem_id: str, problem: Optional[Problem]) -> None:
+    """
+    Updates the process-wide index after a problem changed, if the index has been built.
+
+    Args:
+        problem_id: Id of the changed problem
+        problem: Its new version, or None if it was removed
+    """
+    if _default_index is None:
+        return
+    if problem is None:
+        _default_index.remove(problem_id)
+    else:
+        _default_index.add(problem)
@@ -0,0 +1,56 @@
+from typing import Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import ToolContext
+
+from .problem_store import get_problem_store
+from .schema import Problem
+
+# Session state key holding the id of the problem being tutored
+PROBLEM_ID_STATE_KEY = "problem_id"
+
+# Session state key holding the content hash of the problem version the session started on
+PROBLEM_HASH_STATE_KEY = "problem_content_hash"
+
+# Session state key holding what a resumed session had already done: completed steps and latest expression
+RESUMED_PROGRESS_STATE_KEY = "resumed_progress"
+
+
+def bind_problem(problem_id: str) -> Callable[[CallbackContext], None]:
+    """
+    Builds a before_agent_callback that records which problem the session is tutoring.
+
+    Tools read the id back through problem_for, so one process can serve many
+    sessions on different problems at once. The content hash is pinned the first
+    time a session sees the problem, so a reload of the problem file doesn't change
+    it under a session that has already started.
+    """
+    def _bind_problem(callback_context: CallbackContext) -> None:
+        state = callback_context.state
+        if state.get(PROBLEM_ID_STATE_KEY) != problem_id or PROBLEM_HASH_STATE_KEY not in state:
+            state[PROBLEM_ID_STATE_KEY] = problem_id
+            state[PROBLEM_HASH_STATE_KEY] = get_problem_store().content_hash(problem_id)
+        return None
+
+    return _bind_problem
+
+
+def problem_id_for(tool_context: Optional[ToolContext], default_problem_id: str) -> str:
+    """Returns the problem id bound to the tool's session, or the default outside a session."""
+    if tool_context is None:
+        return default_problem_id
+    return tool_context.state.get(PROBLEM_ID_STATE_KEY, default_problem_id)
+
+
+def problem_for(tool_context: Optional[ToolContext], default_problem_id: str) -> Problem:
+    """Returns the version of the problem the tool's session started on."""
+    problem_id = problem_id_for(tool_context, default_problem_id)
+    content_hash = tool_context.state.get(PROBLEM_HASH_STATE_KEY) if tool_context is not None else None
+    return get_problem_store().get_version(problem_id, content_hash)
+
+
+def session_id_for(tool_context: Optional[ToolContext]) -> Optional[str]:
+    """Returns the id of the session a tool is running in, or None outside a session."""
+    if tool_context is None:
+        return None
+    return tool_context._invocation_context.session.id
@@ -0,0 +1,89 @@
+import copy
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import LRUCache
+
+from .schema import Problem, Visual
+from .validation import get_validation_table
+
+DEFAULT_MAX_STEPS = 4096
+
+# Compact prompts leave the per-step content out of the instruction; agents fetch it with get_step
+COMPACT_PROMPTS = os.environ.get("TUTORING_COMPACT_PROMPTS", "").lower() in ("1", "true", "yes")
+
+_step_cache: LRUCache = LRUCache(maxsize=DEFAULT_MAX_STEPS)
+_step_cache_lock = threading.Lock()
+
+
+def get_step_content(problem: Problem, step_number: int) -> Dict[str, Any]:
+    """
+    Returns everything an agent needs to teach one step, cached by problem content.
+
+    Args:
+        problem: The compiled problem, usually from session.problem_for
+        step_number: The step to fetch (1-based)
+
+    Returns:
+        Dict with the step's topic, questions, illustrations and notes, or an error.
+        Each call gets its own copy, so callers may modify it.
+    """
+    # Checked before the cache: 1.0 and True hash like 1 and would hit step 1's entry
+    if not get_validation_table(problem).is_valid_step(step_number):
+        return {"success": False, "message": f"Invalid step number: {step_number}. Valid range: 1-{problem.step_count}"}
+
+    key: Tuple[str, int] = (problem.content_hash, step_number)
+    with _step_cache_lock:
+        content = _step_cache.get(key)
+    if content is not None:
+        return copy.deepcopy(content)
+
+    step = problem.steps[step_number - 1]
+    content = {
+        "success": True,
+        "step_number": step_number,
+        "total_steps": problem.step_count,
+        "topic": step.topic,
+        "description": step.description,
+        "questions": [
+            {
+                "question_index": index,
+                "question": q.question,
+                "goal": q.goal,
+                "before_question": _visual(q.before_question),
+                "hint": _visual(q.hint),
+                "success": _visual(q.success),
+            }
+            for index, q in enumerate(step.questions)
+        ],
+        "notes": {
+            "description": step.notes_description,
+            "updated_expression": step.updated_expression,
+        },
+    }
+    with _step_cache_lock:
+        _step_cache[key] = content
+    return copy.deepcopy(content)
+
+
+def _visual(visual: Visual) -> Dict[str, str]:
+    return {"Content": visual.content, "Label": visual.label, "Type": visual.type}
+
+
+def clear_step_cache(content_hash: Optional[str] = None) -> int:
+    """
+    Drops cached steps for one problem content hash, or all of them.
+
+    Returns:
+        Number of entries removed
+    """
+    with _step_cache_lock:
+        if content_hash is None:
+            removed = len(_step_cache)
+            _step_cache.clear()
+            return removed
+        stale = [key for key in _step_cache if key[0] == content_hash]
+        for key in stale:
+            del _step_cache[key]
+        return len(stale)
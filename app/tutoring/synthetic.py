@@ -0,0 +1,69 @@
+import json
+from typing import Any, Dict
+
+from .bundle import content_hash
+from .schema import Problem, compile_problem
+
+
+def synthetic_problem_data(step_count: int, questions_per_step: int = 2) -> Dict[str, Any]:
+    """
+    Generates raw problem JSON of any size, shaped like the files in data/.
+
+    Used by the benchmarks and load tests to measure how costs grow with step count.
+    """
+    def visual(content: str, label: str) -> Dict[str, str]:
+        return {"Content": content, "Label": label, "Type": "text"}
+
+    steps = []
+    for i in range(1, step_count + 1):
+        steps.append({
+            "Topic": f"Step {i} - Simplify part {i}",
+            "Description": f"Work out part {i} of the expression.",
+            "ConceptualQuestions": [
+                {
+                    "Goal": f"Understand part {i}.{j}",
+                    "Illustration": {
+                        "BeforeQuestion": visual(f"Look at part {i}. What comes next?", "Hint about what to do next."),
+                        "Feedback": {
+                            "Hint": visual(f"Think about part {i} again.", "Further hint if needed."),
+                            "Success": visual(f"Great, part {i}.{j} is done!", "Positive reinforcement."),
+                        },
+                    },
+                    "Question": f"What is the result of part {i}.{j}?",
+                }
+                for j in range(1, questions_per_step + 1)
+            ],
+            "Notes": {
+                "Description": f"Simplified part {i}.",
+                "UpdatedExpression": f"{step_count - i + 1} + {i}",
+            },
+        })
+
+    return {
+        "topic": "Maths",
+        "title": f"Synthetic {step_count}-step problem",
+        "isConceptIntroductionEnabled": True,
+        "introData": {
+            "TopicExplanation": "A generated problem used for benchmarks.",
+            "Visual": visual("🧮", "A calculator."),
+            "Voice": "Welcome! Let's work through a long problem together.",
+        },
+        "questionData": {
+            "QuestionText": " + ".join(str(i) for i in range(1, step_count + 2)),
+            "Type": "Multiple Choice",
+            "QuestionImageURL": "",
+            "Options": [
+                {"Option": step_count + 1, "IsCorrect": True},
+                {"Option": step_count, "IsCorrect": False},
+            ],
+        },
+        "steps": steps,
+    }
+
+
+def synthetic_problem(step_count: int, questions_per_step: int = 2) -> Problem:
+    """Compiles a synthetic problem with id "synthetic-<step_count>"."""
+    data = synthetic_problem_data(step_count, questions_per_step)
+    return compile_problem(
+        f"synthetic-{step_count}", data, content_hash(json.dumps(data, sort_keys=True).encode())
+    )
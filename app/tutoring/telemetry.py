@@ -0,0 +1,147 @@
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from opentelemetry import metrics, trace
+
+from .session import problem_id_for, session_id_for
+
+# Fraction of sessions whose spans are kept; metrics are always recorded
+DEFAULT_SAMPLE_RATIO = float(os.environ.get("TUTORING_TRACE_SAMPLE_RATIO", "0.1"))
+
+tracer = trace.get_tracer("tutoring")
+meter = metrics.get_meter("tutoring")
+
+tool_duration = meter.create_histogram(
+    "tutoring.tool.duration", unit="ms", description="Time spent inside one tool call"
+)
+phase_duration = meter.create_histogram(
+    "tutoring.phase.duration", unit="ms", description="Time one tutoring phase was active"
+)
+session_duration = meter.create_histogram(
+    "tutoring.session.duration", unit="ms", description="Time from the first to the last phase of a session"
+)
+
+
+def configure_telemetry(
+    span_exporter: Any = None,
+    metric_exporter: Any = None,
+    sample_ratio: float = DEFAULT_SAMPLE_RATIO,
+    metric_interval_ms: int = 60000,
+) -> None:
+    """
+    Installs the process-wide tracer and meter providers.
+
+    Spans go through a BatchSpanProcessor and metrics through a periodic reader, so
+    exporting happens on background threads and never inside a tool call. Only call
+    this once per process, before serving sessions; without it every span and metric
+    is a no-op.
+
+    Args:
+        span_exporter: Where sampled spans go, e.g. CloudTraceSpanExporter()
+        metric_exporter: Where metrics go; metrics are not exported if omitted
+        sample_ratio: Fraction of traces to keep (parent-based, so a session is kept or dropped whole)
+        metric_interval_ms: How often metrics are exported
+    """
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    tracer_provider = TracerProvider(sampler=ParentBased(TraceIdRatioBased(sample_ratio)))
+    if span_exporter is not None:
+        tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(tracer_provider)
+
+    readers = []
+    if metric_exporter is not None:
+        readers.append(PeriodicExportingMetricReader(metric_exporter, export_interval_millis=metric_interval_ms))
+    metrics.set_meter_provider(MeterProvider(metric_readers=readers))
+
+
+def configure_in_memory_telemetry(sample_ratio: float = 1.0) -> Tuple[Any, Any]:
+    """
+    Installs providers that keep everything in memory, for tests and benchmarks.
+
+    Returns:
+        (InMemorySpanExporter, InMemoryMetricReader)
+    """
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    span_exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider(sampler=ParentBased(TraceIdRatioBased(sample_ratio)))
+    tracer_provider.add_span_processor(SimpleSpanProcessor(span_exporter))
+    trace.set_tracer_provider(tracer_provider)
+
+    metric_reader = InMemoryMetricReader()
+    metrics.set_meter_provider(MeterProvider(metric_readers=[metric_reader]))
+    return span_exporter, metric_reader
+
+
+def tool_event(name: str, **attributes: Any) -> None:
+    """Adds an event to the current tool span; free when the span isn't sampled."""
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.add_event(name, {k: v for k, v in attributes.items() if v is not None})
+
+
+def instrument_tool(phase: str, default_problem_id: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Wraps a tool in a span and records its latency in the tutoring.tool.duration histogram.
+
+    The wrapper keeps the tool's name, docstring and signature, so ADK builds the
+    same function declaration for it.
+
+    Args:
+        phase: Name of the agent the tool belongs to, e.g. "stepTutor"
+        default_problem_id: Problem reported when the tool runs outside a session
+    """
+    def decorate(func: Callable) -> Callable:
+        span_name = f"tool {func.__name__}"
+        metric_attributes = {"tool": func.__name__, "phase": phase}
+
+        def start_span(kwargs: Dict[str, Any]):
+            tool_context = kwargs.get("tool_context")
+            attributes = {"tutoring.tool": func.__name__, "tutoring.phase": phase}
+            session_id = session_id_for(tool_context)
+            if session_id is not None:
+                attributes["tutoring.session_id"] = session_id
+            if default_problem_id is not None:
+                attributes["tutoring.problem_id"] = problem_id_for(tool_context, default_problem_id)
+            return tracer.start_as_current_span(span_name, attributes=attributes)
+
+        def finish(span: Any, started_at: float, result: Any) -> None:
+            tool_duration.record((time.perf_counter() - started_at) * 1000, metric_attributes)
+            if span.is_recording() and isinstance(result, dict) and "success" in result:
+                span.set_attribute("tutoring.success", bool(result["success"]))
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                started_at = time.perf_counter()
+                with start_span(kwargs) as span:
+                    result = await func(*args, **kwargs)
+                    finish(span, started_at, result)
+                    return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started_at = time.perf_counter()
+            with start_span(kwargs) as span:
+                result = func(*args, **kwargs)
+                finish(span, started_at, result)
+                return result
+
+        return wrapper
+
+    return decorate
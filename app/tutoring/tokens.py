@@ -0,0 +1,90 @@
+import argparse
+import importlib
+import json
+import math
+from typing import Any, Callable, Dict, List, Optional
+
+from .problem_store import get_problem_store
+
+# Agents that can render their instruction in both full and compact mode
+PROMPT_MODE_AGENTS = ["step_tutor_agent", "brain_stormer_agent"]
+
+# Gemini averages roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, offline token estimate for a prompt."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def exact_token_counter(model: str = "gemini-2.0-flash") -> Callable[[str], int]:
+    """
+    Returns a counter that asks the Gemini API for exact token counts.
+
+    Needs the usual google-genai credentials (GOOGLE_API_KEY or Vertex AI settings).
+    """
+    from google import genai
+
+    client = genai.Client()
+
+    def count(text: str) -> int:
+        return client.models.count_tokens(model=model, contents=text).total_tokens
+
+    return count
+
+
+def compare_prompt_modes(
+    problem_ids: Optional[List[str]] = None,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+) -> List[Dict[str, Any]]:
+    """
+    Measures the instruction size of every agent in full and compact prompt mode.
+
+    Args:
+        problem_ids: Problems to measure, every problem in the bank by default
+        count_tokens: Token counter, the offline estimate by default
+
+    Returns:
+        One row per (agent, problem) with step count and token counts of both modes
+    """
+    store = get_problem_store()
+    rows = []
+    for module_name in PROMPT_MODE_AGENTS:
+        agent_module = importlib.import_module(f"{module_name}.agent")
+        for problem_id in problem_ids or store.problem_ids():
+            problem = store.get(problem_id)
+            full = count_tokens(agent_module.render_instruction(problem))
+            compact = count_tokens(agent_module.render_instruction(problem, compact=True))
+            rows.append({
+                "agent": module_name,
+                "problem_id": problem_id,
+                "steps": problem.step_count,
+                "full_tokens": full,
+                "compact_tokens": compact,
+                "saved_tokens": full - compact,
+            })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare instruction token counts of full and compact prompts.")
+    parser.add_argument("problem_ids", nargs="*", help="Problems to measure (default: all)")
+    parser.add_argument("--exact", action="store_true", help="Count tokens with the Gemini API instead of estimating")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args(argv)
+
+    counter = exact_token_counter() if args.exact else estimate_tokens
+    rows = compare_prompt_modes(args.problem_ids or None, counter)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    for row in rows:
+        print(
+            f"{row['agent']:<22} {row['problem_id']:<12} steps={row['steps']:<3} "
+            f"full={row['full_tokens']:<6} compact={row['compact_tokens']:<6} saved={row['saved_tokens']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .telemetry import tool_event
+
+# Threads tool bodies run on; tools beyond this many wait for a free thread instead of piling up
+DEFAULT_MAX_WORKERS = int(os.environ.get("TUTORING_TOOL_WORKERS", "8"))
+# Seconds a tool may take before the model is told it timed out
+DEFAULT_TOOL_TIMEOUT = float(os.environ.get("TUTORING_TOOL_TIMEOUT", "5"))
+
+
+class ToolRuntime:
+    """
+    Runs synchronous tool bodies that block on I/O on a bounded thread pool, off the event loop.
+
+    The event loop also carries the live audio stream, so a tool that waits on SQLite
+    or the network would stall every session on it. Tools that only compute (validation,
+    publishing UI events, cached lookups) stay on the loop: they take microseconds, and
+    a hop through the pool costs more than it saves. Context variables (the current
+    span, pinned problems) are carried into the worker thread.
+
+    A timed-out call is abandoned, not killed: its thread keeps running until the tool
+    returns, which is why the pool is bounded.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, default_timeout: float = DEFAULT_TOOL_TIMEOUT):
+        self.default_timeout = default_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.timeouts = 0
+        self.in_flight = 0
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Runs func(*args, **kwargs) on the pool and waits for it.
+
+        Raises:
+            asyncio.TimeoutError: If it takes longer than timeout (or the runtime's default)
+        """
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, call)
+        future.add_done_callback(self._done)
+        try:
+            return await asyncio.wait_for(future, timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "timeouts": self.timeouts, "in_flight": self.in_flight}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _done(self, _: Any) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+_default_runtime: Optional[ToolRuntime] = None
+_default_runtime_lock = threading.Lock()
+
+
+def get_tool_runtime() -> ToolRuntime:
+    """Returns the process-wide ToolRuntime shared by every async tool."""
+    global _default_runtime
+    if _default_runtime is None:
+        with _default_runtime_lock:
+            if _default_runtime is None:
+                _default_runtime = ToolRuntime()
+    return _default_runtime
+
+
+def async_tool(func: Callable[..., Any], timeout: Optional[float] = None) -> Callable[..., Awaitable[Any]]:
+    """
+    Returns an async variant of a synchronous, blocking tool that runs it on the shared ToolRuntime.
+
+    Only wrap tools whose body does SQLite or network I/O; register pure-CPU tools as they are.
+
+    The variant keeps the tool's name, docstring and signature, so ADK declares it to
+    the model exactly like the original. A call that times out returns a failure the
+    model can react to instead of raising.
+
+    Args:
+        func: The synchronous tool
+        timeout: Seconds before giving up; the runtime's default if omitted
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        runtime = get_tool_runtime()
+        try:
+            return await runtime.run(func, *args, timeout=timeout, **kwargs)
+        except asyncio.TimeoutError:
+            limit = timeout or runtime.default_timeout
+            tool_event("timeout", tool=func.__name__, timeout_s=limit)
+            return {"success": False, "message": f"{func.__name__} timed out after {limit:g}s"}
+
+    return wrapper
@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cachetools import LRUCache, TTLCache
+from google.genai import types
+
+# Utterances live next to the problem bank unless TUTORING_UTTERANCE_DB says otherwise
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.environ.get(
+    "TUTORING_UTTERANCE_DB",
+    os.path.join(os.path.dirname(os.path.dirname(current_dir)), "utterances.sqlite3"),
+)
+
+DEFAULT_MAX_UTTERANCES = 1024
+# Seconds a miss is remembered; another process may record the utterance meanwhile
+DEFAULT_MISS_TTL = 30.0
+
+# Every phase prompt asks the model to speak English
+DEFAULT_LANGUAGE = "en"
+
+# Phases that speak one monologue built only from the problem, so any session can replay it.
+# questionReader is left out: it asks whether to read the question and waits for the answer.
+CACHEABLE_PHASES = ("greeter", "introGiver", "closer")
+
+# What the precompute command says to start each phase
+PRECOMPUTE_MESSAGE = "Hello!"
+# The phases' own live models only work over the Live API, so precompute runs them on a text model
+DEFAULT_PRECOMPUTE_MODEL = os.environ.get("TUTORING_PRECOMPUTE_MODEL", "gemini-2.5-flash")
+
+# (agent name, problem content hash, language)
+UtteranceKey = Tuple[str, str, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS utterances (
+    agent TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    language TEXT NOT NULL,
+    text TEXT NOT NULL,
+    audio BLOB,
+    audio_mime_type TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (agent, content_hash, language)
+);
+"""
+
+@dataclass(frozen=True)
+class Utterance:
+    """What one phase said: its text and, from a live session, the audio it spoke."""
+
+    text: str
+    audio: Optional[bytes] = None
+    audio_mime_type: Optional[str] = None
+
+    def to_content(self) -> types.Content:
+        """Returns the utterance as a model turn, audio first so playback can start at once."""
+        parts = []
+        if self.audio:
+            parts.append(types.Part(inline_data=types.Blob(mime_type=self.audio_mime_type, data=self.audio)))
+        parts.append(types.Part(text=self.text))
+        return types.Content(role="model", parts=parts)
+
+    @classmethod
+    def from_events(cls, events: Iterable[Any], ignored_calls: Tuple[str, ...] = ()) -> Optional["Utterance"]:
+        """
+        Builds an utterance from the events one phase produced.
+
+        Text comes from complete (non-partial) text parts, which in a live session carry
+        the output transcription once the turn is over. Audio chunks are joined in order.
+
+        Args:
+            events: Events authored by the phase agent
+            ignored_calls: Function calls that don't change what the student sees, e.g. task_completed
+
+        Returns:
+            The utterance, or None if the phase said nothing or called a tool that a replay would skip
+        """
+        texts: List[str] = []
+        audio = bytearray()
+        audio_mime_type = None
+        for event in events:
+            for call in event.get_function_calls():
+                if call.name not in ignored_calls:
+                    return None
+            if event.content is None or not event.content.parts:
+                continue
+            for part in event.content.parts:
+                if part.inline_data is not None and (part.inline_data.mime_type or "").startswith("audio/"):
+                    audio_mime_type = audio_mime_type or part.inline_data.mime_type
+                    audio.extend(part.inline_data.data or b"")
+                elif part.text and not part.thought and not event.partial:
+                    texts.append(part.text)
+
+        text = "".join(texts).strip()
+        if not text:
+            return None
+        return cls(text=text, audio=bytes(audio) or None, audio_mime_type=audio_mime_type)
+
+
+class UtteranceCache:
+    """
+    Stores what the near-static phases said, keyed by agent, problem content hash and language.
+
+    The greeter, introGiver and closer say the same thing to every student working on
+    a problem, so once one session (or the precompute command) has heard a phase, later
+    sessions replay it without calling the model. Entries are persisted to SQLite and
+    kept in an in-memory LRU; editing a problem changes its content hash, so stale
+    entries are never served. A miss is remembered for miss_ttl seconds only, so a
+    cold phase doesn't hit SQLite every session, yet an utterance recorded by another
+    process is picked up soon after.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        max_utterances: int = DEFAULT_MAX_UTTERANCES,
+        miss_ttl: float = DEFAULT_MISS_TTL,
+    ):
+        self.db_path = db_path
+        self._cache: LRUCache = LRUCache(maxsize=max_utterances)
+        # Keys known to be missing from the database, each forgotten after miss_ttl
+        self._missing: TTLCache = TTLCache(maxsize=max_utterances, ttl=miss_ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def get(self, key: UtteranceKey) -> Optional[Utterance]:
+        """
+        Returns the cached utterance for key, or None if no session has recorded it yet.
+
+        Args:
+            key: (agent name, problem content hash, language)
+        """
+        with self._lock:
+            utterance = self._cache.get(key)
+            known_missing = utterance is None and key in self._missing
+        if utterance is None and not known_missing:
+            utterance = self._load(key)
+            with self._lock:
+                if utterance is None:
+                    self._missing[key] = True
+                else:
+                    self._cache[key] = utterance
+
+        with self._lock:
+            if utterance is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return utterance
+
+    def put(self, key: UtteranceKey, utterance: Utterance) -> None:
+        """Stores an utterance, replacing any earlier one for the same key."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO utterances "
+                "(agent, content_hash, language, text, audio, audio_mime_type, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, utterance.text, utterance.audio, utterance.audio_mime_type, time.time()),
+            )
+        with self._lock:
+            self._cache[key] = utterance
+            self._missing.pop(key, None)
+
+    def invalidate(self, content_hash: Optional[str] = None) -> int:
+        """
+        Drops utterances for one problem content hash, or all of them, from memory and disk.
+
+        Returns:
+            Number of stored utterances removed
+        """
+        with self._connect() as conn:
+            if content_hash is None:
+                removed = conn.execute("DELETE FROM utterances").rowcount
+            else:
+                removed = conn.execute(
+                    "DELETE FROM utterances WHERE content_hash = ?", (content_hash,)
+                ).rowcount
+        with self._lock:
+            if content_hash is None:
+                self._cache.clear()
+                self._missing.clear()
+            else:
+                for key in [key for key in self._cache if key[1] == content_hash]:
+                    del self._cache[key]
+                for key in [key for key in self._missing if key[1] == content_hash]:
+                    del self._missing[key]
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, key: UtteranceKey) -> Optional[Utterance]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text, audio, audio_mime_type FROM utterances "
+                "WHERE agent = ? AND content_hash = ? AND language = ?",
+                key,
+            ).fetchone()
+        if row is None:
+            return None
+        return Utterance(text=row[0], audio=row[1], audio_mime_type=row[2])
+
+
+_default_cache: Optional[UtteranceCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_utterance_cache() -> UtteranceCache:
+    """Returns the process-wide UtteranceCache, creating the database on first use."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = UtteranceCache()
+    return _default_cache
+
+
+def set_utterance_cache(cache: UtteranceCache) -> None:
+    """Replaces the process-wide UtteranceCache, e.g. with one on a scratch database."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
+
+
+def utterance_key(agent_name: str, problem_id: str, language: str = DEFAULT_LANGUAGE) -> UtteranceKey:
+    """Returns the cache key of what agent_name says for the current content of a problem."""
+    from .problem_store import get_problem_store
+
+    return (agent_name, get_problem_store().content_hash(problem_id), language)
+
+
+async def precompute(
+    problem_ids: Optional[List[str]] = None,
+    language: str = DEFAULT_LANGUAGE,
+    model: Any = None,
+    force: bool = False,
+    cache: Optional[UtteranceCache] = None,
+    concurrency: int = 4,
+) -> Dict[str, int]:
+    """
+    Runs every cacheable phase once per problem and stores what it said.
+
+    Phases run on run_async, so what they said is stored as text only. Text sessions
+    replay it; live sessions skip it and store what they hear instead, audio included.
+
+    Args:
+        problem_ids: Problems to warm; every problem in the store by default
+        language: Language the utterances are stored under
+        model: Model name or instance passed to the phase builders; must not be a live-only model.
+            Each agent's own model by default
+        force: Regenerate utterances that are already cached
+        cache: Cache to fill; the process-wide one by default
+        concurrency: How many phases talk to the model at once
+
+    Returns:
+        Counts of "generated", "cached" (skipped) and "failed" phases
+    """
+    from google.adk.runners import InMemoryRunner
+
+    from tutoring_pipeline_agent.agent import tutoring_phases
+
+    from .pipeline import task_completed
+    from .problem_store import get_problem_store
+
+    cache = cache or get_utterance_cache()
+    problem_ids = problem_ids or get_problem_store().problem_ids()
+    counts = {"generated": 0, "cached": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(problem_id: str, phase_name: str, build: Any) -> None:
+        key = utterance_key(phase_name, problem_id, language)
+        if not force and cache.get(key) is not None:
+            counts["cached"] += 1
+            return
+        async with semaphore:
+            agent = build(problem_id) if model is None else build(problem_id, model=model)
+            runner = InMemoryRunner(agent=agent, app_name="tutoring")
+            session = await runner.session_service.create_session(app_name=runner.app_name, user_id="precompute")
+            message = types.Content(role="user", parts=[types.Part(text=PRECOMPUTE_MESSAGE)])
+            events = [
+                event
+                async for event in runner.run_async(user_id="precompute", session_id=session.id, new_message=message)
+                if event.author == agent.name
+            ]
+        utterance = Utterance.from_events(events, ignored_calls=(task_completed.__name__,))
+        if utterance is None:
+            counts["failed"] += 1
+            print(f"❌ {problem_id}/{phase_name}: the model said nothing that can be replayed", file=sys.stderr)
+            return
+        await asyncio.to_thread(cache.put, key, utterance)
+        counts["generated"] += 1
+
+    await asyncio.gather(*(
+        warm(problem_id, phase_name, build)
+        for problem_id in problem_ids
+        for phase_name, build in tutoring_phases(problem_id)
+        if phase_name in CACHEABLE_PHASES
+    ))
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate what the near-static phases say for the problem bank.")
+    parser.add_argument("--problem", action="append", dest="problems", help="Problem id to warm (repeatable); all by default")
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE, help="Language the utterances are stored under")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Utterance database to fill")
+    parser.add_argument("--model", default=DEFAULT_PRECOMPUTE_MODEL, help=f"Text model the phases run on (default {DEFAULT_PRECOMPUTE_MODEL})")
+    parser.add_argument("--force", action="store_true", help="Regenerate utterances that are already cached")
+    parser.add_argument("--concurrency", type=int, default=4, help="Phases generated at once")
+    args = parser.parse_args(argv)
+
+    cache = UtteranceCache(db_path=args.db)
+    counts = asyncio.run(precompute(
+        args.problems, language=args.language, model=args.model, force=args.force, cache=cache,
+        concurrency=args.concurrency,
+    ))
+    print(f"✅ Generated {counts['generated']} utterances, {counts['cached']} already cached")
+    if counts["failed"]:
+        print(f"❌ {counts['failed']} phase(s) produced nothing to cache")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
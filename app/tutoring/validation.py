@@ -0,0 +1,153 @@
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from .schema import Problem
+
+DEFAULT_MAX_TABLES = 4096
+
+# Feedback and discovery types each tool accepts
+STEP_FEEDBACK_TYPES: FrozenSet[str] = frozenset({"hint", "success", "illustration"})
+BRAINSTORM_FEEDBACK_TYPES: FrozenSet[str] = frozenset(
+    {"celebration", "discovery", "progress", "breakthrough", "debate", "comparison", "synthesis"}
+)
+DISCOVERY_TYPES: FrozenSet[str] = frozenset({
+    "initial_observation", "part_identified", "calculation_done",
+    "pattern_found", "breakthrough", "debate_point",
+    "approach_comparison", "synthesis",
+})
+
+STEP_UPDATE_FIELDS = ("stepNumber", "description", "updatedExpression")
+
+
+@dataclass(frozen=True)
+class ValidationTable:
+    """Everything needed to validate tool arguments against one problem, built once per content hash."""
+
+    step_count: int
+    valid_steps: FrozenSet[int]
+    # Indexed by step number, whitespace removed; index 0 is unused
+    expected_expressions: Tuple[Optional[str], ...]
+
+    def is_valid_step(self, step_number: Any) -> bool:
+        # Hashing a float or a bool into valid_steps would accept 2.0 or True; step numbers are ints
+        return type(step_number) is int and step_number in self.valid_steps
+
+
+@dataclass(frozen=True)
+class StepUpdateError:
+    """Why one entry of an update_notes batch was rejected."""
+
+    index: int
+    step_number: Any
+    code: str
+    message: str
+
+
+@dataclass(frozen=True)
+class StepUpdateBatch:
+    """The outcome of validating one update_notes call."""
+
+    # Accepted updates, one per step number, in step order
+    steps: List[Dict[str, Any]]
+    errors: List[StepUpdateError]
+    # Entries dropped because a later entry in the same call updated the same step
+    duplicates: int
+    # Accepted step numbers whose updatedExpression differs from the problem's notes
+    unexpected_expressions: List[int]
+
+    def error_dicts(self) -> List[Dict[str, Any]]:
+        return [asdict(error) for error in self.errors]
+
+
+def build_validation_table(problem: Problem) -> ValidationTable:
+    return ValidationTable(
+        step_count=problem.step_count,
+        valid_steps=frozenset(range(1, problem.step_count + 1)),
+        expected_expressions=(None,) + tuple(_squash(step.updated_expression) for step in problem.steps),
+    )
+
+
+def _squash(expression: str) -> str:
+    return "".join(expression.split())
+
+
+_tables: LRUCache = LRUCache(maxsize=DEFAULT_MAX_TABLES)
+_tables_lock = threading.Lock()
+
+
+def get_validation_table(problem: Problem) -> ValidationTable:
+    """Returns the problem's ValidationTable, built once per content hash."""
+    with _tables_lock:
+        table = _tables.get(problem.content_hash)
+    if table is None:
+        table = build_validation_table(problem)
+        with _tables_lock:
+            _tables[problem.content_hash] = table
+    return table
+
+
+def clear_validation_tables(content_hash: Optional[str] = None) -> int:
+    """
+    Drops the validation tables of one problem content hash, or all of them.
+
+    Returns:
+        Number of entries removed
+    """
+    with _tables_lock:
+        if content_hash is None:
+            removed = len(_tables)
+            _tables.clear()
+            return removed
+        return 1 if _tables.pop(content_hash, None) is not None else 0
+
+
+def validate_step_updates(problem: Problem, steps: List[Dict[str, Any]]) -> StepUpdateBatch:
+    """
+    Validates a whole update_notes batch in one pass.
+
+    An entry is rejected if it isn't an object, misses a field or names a step the
+    problem doesn't have. When several entries update the same step, the last one wins,
+    so a student racing through steps costs one update per step however often the model
+    repeats itself. Accepted updates come back in step order.
+
+    Args:
+        problem: The problem the session is tutoring
+        steps: The update_notes argument, each entry with stepNumber, description, updatedExpression
+
+    Returns:
+        The accepted updates and a structured error per rejected entry
+    """
+    table = get_validation_table(problem)
+    errors: List[StepUpdateError] = []
+    latest: Dict[int, Dict[str, Any]] = {}
+    duplicates = 0
+
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            errors.append(StepUpdateError(index, None, "invalid_entry", "expected an object"))
+            continue
+        step_number = step.get("stepNumber")
+        missing = [name for name in STEP_UPDATE_FIELDS if not step.get(name)]
+        if missing:
+            errors.append(StepUpdateError(index, step_number, "missing_fields", f"missing {', '.join(missing)}"))
+            continue
+        if not table.is_valid_step(step_number):
+            errors.append(StepUpdateError(
+                index, step_number, "invalid_step_number",
+                f"Invalid step number: {step_number}. Valid range: 1-{table.step_count}",
+            ))
+            continue
+        if step_number in latest:
+            duplicates += 1
+        latest[step_number] = step
+
+    accepted = [latest[n] for n in sorted(latest)]
+    expected = table.expected_expressions
+    unexpected = [
+        step["stepNumber"] for step in accepted
+        if _squash(str(step["updatedExpression"])) != expected[step["stepNumber"]]
+    ]
+    return StepUpdateBatch(accepted, errors, duplicates, unexpected)
@@ -0,0 +1,232 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+from .telemetry import meter
+
+# Client-side search is used when these are set; see GoogleCustomSearchBackend
+SEARCH_API_KEY = os.environ.get("GOOGLE_SEARCH_API_KEY")
+SEARCH_ENGINE_ID = os.environ.get("GOOGLE_SEARCH_ENGINE_ID")
+
+DEFAULT_TTL = float(os.environ.get("TUTORING_SEARCH_TTL", "600"))
+DEFAULT_MAX_QUERIES = 2048
+DEFAULT_NUM_RESULTS = 5
+
+# One search result: {"title": ..., "link": ..., "snippet": ...}
+SearchResults = List[Dict[str, str]]
+
+search_requests = meter.create_counter(
+    "tutoring.search.requests",
+    description="Search tool queries by how they were answered: hit, miss, coalesced or coalesced_error",
+)
+
+_SPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[^\w]+|[^\w]+$")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Returns the cache key of a query: case, repeated whitespace and leading or trailing
+    punctuation don't change what the search returns.
+    """
+    return _EDGE_PUNCTUATION.sub("", _SPACE.sub(" ", query.lower())).strip()
+
+
+class SearchBackend:
+    """Where uncached queries go."""
+
+    async def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> SearchResults:
+        raise NotImplementedError
+
+
+class GoogleCustomSearchBackend(SearchBackend):
+    """Google Programmable Search (Custom Search JSON API) over a shared HTTP client."""
+
+    URL = "https://www.googleapis.com/customsearch/v1"
+
+    def __init__(self, api_key: str, engine_id: str, timeout: float = 5.0):
+        import httpx
+
+        self.api_key = api_key
+        self.engine_id = engine_id
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> SearchResults:
+        response = await self._client.get(
+            self.URL, params={"key": self.api_key, "cx": self.engine_id, "q": query, "num": num_results}
+        )
+        response.raise_for_status()
+        return [
+            {"title": item.get("title", ""), "link": item.get("link", ""), "snippet": item.get("snippet", "")}
+            for item in response.json().get("items", [])
+        ]
+
+
+class StaticSearchBackend(SearchBackend):
+    """
+    Local stand-in backend for tests and benchmarks.
+
+    Answers from a fixed table of normalized queries, optionally after a delay that
+    simulates network latency, and counts how many queries actually reached it.
+    """
+
+    def __init__(self, results: Optional[Dict[str, SearchResults]] = None, latency: float = 0.0):
+        self.results = {normalize_query(q): r for q, r in (results or {}).items()}
+        self.latency = latency
+        self.calls = 0
+
+    async def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> SearchResults:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        results = self.results.get(normalize_query(query))
+        if results is None:
+            results = [{"title": query, "link": f"https://example.com/search?q={query}", "snippet": ""}]
+        return results[:num_results]
+
+
+class SearchCache:
+    """
+    TTL/LRU cache with single-flight in front of a search backend.
+
+    Queries are keyed by their normalized text and result count. An uncached query
+    goes to the backend in a task of its own, and every caller, the first included,
+    waits on it through shield(). Identical queries from other sessions join the
+    task instead of sending their own, and a caller that is cancelled leaves it
+    running for the rest. Failures are passed to every waiter but never cached.
+
+    Every lookup gets its own copy of the results, so a caller that edits them
+    doesn't change what later hits return.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        ttl: float = DEFAULT_TTL,
+        max_queries: int = DEFAULT_MAX_QUERIES,
+    ):
+        self.backend = backend
+        self._cache: TTLCache = TTLCache(maxsize=max_queries, ttl=ttl, timer=time.monotonic)
+        self._in_flight: Dict[Tuple[str, int], "asyncio.Task[SearchResults]"] = {}
+        self.hits = 0
+        self.misses = 0
+        # Lookups that joined a query in flight and got its results
+        self.coalesced = 0
+        # Backend failures, counted once per query however many lookups were waiting on it
+        self.errors = 0
+        # Lookups that joined a query in flight which then failed
+        self.coalesced_errors = 0
+
+    async def search(self, query: str, num_results: int = DEFAULT_NUM_RESULTS) -> SearchResults:
+        """
+        Returns the results for a query, from the cache when possible.
+
+        Raises:
+            Whatever the backend raised, for the query that went to it and every query coalesced with it
+        """
+        key = (normalize_query(query), num_results)
+        results = self._cache.get(key)
+        if results is not None:
+            self._count("hit")
+            return _copy_results(results)
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self._count("miss")
+            task = asyncio.create_task(self._fetch(key, query, num_results))
+            task.add_done_callback(_retrieve_exception)
+            self._in_flight[key] = task
+            return _copy_results(await asyncio.shield(task))
+
+        try:
+            results = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._count("coalesced_error")
+            raise
+        self._count("coalesced")
+        return _copy_results(results)
+
+    async def _fetch(self, key: Tuple[str, int], query: str, num_results: int) -> SearchResults:
+        try:
+            results = await self.backend.search(query, num_results)
+        except Exception:
+            self.errors += 1
+            raise
+        else:
+            # The backend may hand out lists it keeps itself, as StaticSearchBackend does
+            results = _copy_results(results)
+            self._cache[key] = results
+            return results
+        finally:
+            del self._in_flight[key]
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced + self.coalesced_errors
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "coalesced_errors": self.coalesced_errors,
+            "size": len(self._cache),
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
+
+    def _count(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        elif result == "miss":
+            self.misses += 1
+        elif result == "coalesced":
+            self.coalesced += 1
+        else:
+            self.coalesced_errors += 1
+        search_requests.add(1, {"result": result})
+
+
+def _copy_results(results: SearchResults) -> SearchResults:
+    return [dict(result) for result in results]
+
+
+def _retrieve_exception(task: "asyncio.Task[Any]") -> None:
+    # A query whose callers were all cancelled would otherwise log "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+def search_configured() -> bool:
+    """Whether a client-side search backend is configured, so the search tool can be cached."""
+    return bool(SEARCH_API_KEY and SEARCH_ENGINE_ID)
+
+
+_default_cache: Optional[SearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Returns the process-wide SearchCache over the configured backend."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                if not search_configured():
+                    raise RuntimeError("Set GOOGLE_SEARCH_API_KEY and GOOGLE_SEARCH_ENGINE_ID to use client-side search")
+                _default_cache = SearchCache(GoogleCustomSearchBackend(SEARCH_API_KEY, SEARCH_ENGINE_ID))
+    return _default_cache
+
+
+def set_search_cache(cache: SearchCache) -> None:
+    """Replaces the process-wide SearchCache, e.g. with one over a StaticSearchBackend."""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
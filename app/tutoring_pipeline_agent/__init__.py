@@ -0,0 +1 @@
+from . import agent
\ No newline at end of file
@@ -0,0 +1,54 @@
+from typing import Callable, List, Tuple
+from google.adk.agents import BaseAgent
+
+from closer_agent.agent import build_closer
+from greeter_agent.agent import build_greeter
+from intro_giver_agent.agent import build_intro_giver
+from question_reader_agent.agent import build_question_reader
+from step_tutor_agent.agent import build_step_tutor
+from tutoring.pipeline import TutoringPipeline
+from tutoring.problem_store import get_problem_store
+from tutoring.recording import RECORD_SESSIONS, get_live_recorder
+from tutoring.reload import HOT_RELOAD, watch_problems
+
+# Problem tutored by the module-level root_agent
+DEFAULT_PROBLEM_ID = "hard3"
+
+def tutoring_phases(problem_id: str) -> List[Tuple[str, Callable[[str], BaseAgent]]]:
+    """
+    Returns the ordered phases of a tutoring session for one problem.
+
+    Mirrors the old handoff chain: greeter -> introGiver -> questionReader -> stepTutor -> closer,
+    skipping introGiver when the problem has concept introduction disabled.
+    """
+    problem = get_problem_store().get(problem_id)
+    phases = [("greeter", build_greeter)]
+    if problem.is_concept_introduction_enabled:
+        phases.append(("introGiver", build_intro_giver))
+    phases.append(("questionReader", build_question_reader))
+    phases.append(("stepTutor", build_step_tutor))
+    phases.append(("closer", build_closer))
+    return phases
+
+def build_tutoring_pipeline(problem_id: str = DEFAULT_PROBLEM_ID) -> TutoringPipeline:
+    """
+    Builds the full tutoring session for one problem as a single pipeline agent.
+
+    Args:
+        problem_id: Id of the problem in the shared ProblemStore
+
+    Returns:
+        A pipeline that runs every phase over one live session
+    """
+    return TutoringPipeline(
+        name="tutoringPipeline",
+        description="Runs the whole tutoring session: greeting, introduction, question, step-by-step tutoring and closing.",
+        problem_id=problem_id,
+        phases=tutoring_phases(problem_id),
+        recorder=get_live_recorder() if RECORD_SESSIONS else None,
+    )
+
+if HOT_RELOAD:
+    watch_problems()
+
+root_agent = build_tutoring_pipeline()